@@ -0,0 +1,504 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for a DCNM 11.5 or NDFC 12.0 server implementing the
+endpoints used by dcnm_lan_fabric.api.v11_5 and v12_0. Inventory,
+POAP and template sizes and the per-request latency are configurable.
+Plain HTTP only; point the SDK at it with a host of http://HOST:PORT.
+
+    python benchmarks/mock_dcnm.py --version 11.5 --switches 1000
+"""
+
+import re
+import json
+import time
+import base64
+import hashlib
+import argparse
+import threading
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+DCNM_PREFIX = '/rest'
+NDFC_PREFIX = '/appcenter/cisco/ndfc/api/v1'
+
+
+class mock_state:
+    def __init__(self, version='11.5(1)', switches=100, fabrics=4, poap=10,
+                 templates=100, parameters=20, latency=0.0, paging=True):
+        """
+        Initialize the server data with the following information:
+          - version: version reported, 11.x serves the DCNM API, 12.x NDFC
+          - switches: switches in the inventory, spread over fabrics
+          - poap: switches waiting in POAP per fabric
+          - templates, parameters: template count and parameters each
+          - latency: seconds added to every request
+          - paging: honor offset/limit query parameters on list endpoints
+        """
+
+        self.version = version
+        self.latency = latency
+        self.paging = paging
+
+        self.fabrics = [f'fabric-{x}' for x in range(fabrics)]
+        self.switches = [
+            switch_record(x, self.fabrics[x % fabrics])
+            for x in range(switches)
+        ]
+        self._switch_count = switches
+        self._poap = poap
+        self.poap = self._poap_devices()
+        self.templates = [
+            template_record(x, parameters) for x in range(templates)
+        ]
+        self.templates_etag = '"{0}"'.format(hashlib.sha1(
+            json.dumps(self.templates).encode()
+        ).hexdigest())
+
+        self.tokens = set()
+        self.lock = threading.Lock()
+        self.requests = dict()
+
+    def _poap_devices(self):
+        return {
+            fabric: {
+                f'POAP{idx:02d}{x:05d}': poap_record(x)
+                for x in range(self._poap)
+            }
+            for idx, fabric in enumerate(self.fabrics)
+        }
+
+    @property
+    def ndfc(self):
+        return not self.version.startswith('11')
+
+    def count(self, endpoint):
+        with self.lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+
+    def reset(self):
+        """
+        Clear the request counters, put registered switches back in POAP and
+        forget discovered switches
+        """
+        with self.lock:
+            self.requests = dict()
+            del self.switches[self._switch_count:]
+            self.poap = self._poap_devices()
+
+    def total(self):
+        with self.lock:
+            return sum(self.requests.values())
+
+
+def switch_record(idx, fabric):
+    """
+    Inventory record with roughly the attributes DCNM returns
+    """
+
+    return {
+        'serialNumber': f'SAL{idx:07d}',
+        'logicalName': f'leaf-{idx}',
+        'ipAddress': f'10.{idx // 65536 % 256}.{idx // 256 % 256}.{idx % 256}',
+        'fabricName': fabric,
+        'switchRole': 'spine' if idx % 16 == 0 else 'leaf',
+        'model': 'N9K-C93180YC-EX',
+        'release': '9.3(8)',
+        'status': 'ok',
+        'mode': 'Normal',
+        'switchDbID': 1000 + idx,
+        'swUUID': f'DCNM-UUID-{idx:08d}',
+        'vendor': 'Cisco',
+        'systemMode': 'Normal',
+        'managable': True,
+        'health': 98,
+        'upTime': '31 days, 2:10:07',
+        'vpcDomain': idx // 2,
+        'vpcPeer': f'leaf-{idx ^ 1}',
+        'hostName': f'leaf-{idx}',
+        'domain': 'example.com',
+        'licenseDetail': 'N9K-LAN1K9 valid',
+        'ports': 54,
+        'memoryUsage': '43%',
+        'cpuUsage': '7%',
+        'contact': 'noc@example.com',
+        'location': f'rack-{idx // 40}',
+    }
+
+
+def poap_record(idx):
+    return {
+        'model': 'N9K-C93180YC-EX',
+        'version': '9.3(8)',
+        'data': json.dumps({
+            'gateway': f'192.168.{idx // 256 % 256}.1/24',
+            'modulesModel': ['N9K-C93180YC-EX']
+        })
+    }
+
+
+def template_record(idx, parameters):
+    return {
+        'name': f'template_{idx:05d}',
+        'description': f'Benchmark template {idx}',
+        'supportedPlatforms': 'N9K',
+        'templateType': 'POLICY',
+        'templateSubType': 'DEVICE',
+        'contentType': 'TEMPLATE_CLI',
+        'content': 'interface ethernet1/1\n  description $$DESC$$\n' * 50,
+        'parameters': [
+            {
+                'name': f'PARAM_{x}',
+                'description': f'Parameter {x}',
+                'parameterType': 'integer' if x % 3 == 0 else 'string',
+                'metaProperties': {
+                    'defaultValue': str(x),
+                    'min': '0',
+                    'max': '4094',
+                } if x % 3 == 0 else {'defaultValue': f'value{x}'},
+                'annotations': {
+                    'IsMandatory': 'true' if x % 5 == 0 else 'false',
+                    'Description': f'Parameter {x} of template {idx}',
+                },
+            }
+            for x in range(parameters)
+        ],
+    }
+
+
+class handler(BaseHTTPRequestHandler):
+    # Set by serve()
+    state: mock_state = None
+
+    protocol_version = 'HTTP/1.1'
+
+    # Avoid the delayed ACK stall of separately written headers and body
+    disable_nagle_algorithm = True
+    wbufsize = -1
+
+    def log_message(self, *args):
+        pass
+
+    # Helpers
+    def _send(self, code, body=None, headers=None):
+        data = b'' if body is None else json.dumps(body).encode()
+
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self):
+        return json.loads(self._raw) if self._raw else None
+
+    def _authorized(self):
+        if self.state.ndfc:
+            cookie = self.headers.get('Cookie', '')
+            return any(
+                f'AuthCookie={token}' in cookie for token in self.state.tokens
+            )
+
+        return self.headers.get('Dcnm-Token') in self.state.tokens
+
+    def _dispatch(self, method):
+        state = self.state
+        if state.latency:
+            time.sleep(state.latency)
+
+        # Always drain the body so the connection can be reused
+        length = int(self.headers.get('Content-Length', 0))
+        self._raw = self.rfile.read(length) if length else b''
+
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+
+        for route_method, pattern, func, auth in ROUTES:
+            if route_method != method:
+                continue
+
+            match = re.fullmatch(pattern, url.path)
+            if match is None:
+                continue
+
+            state.count(f'{method} {pattern}')
+
+            if auth and not self._authorized():
+                return self._send(401, {'message': 'Unauthorized'})
+
+            return func(self, query, *match.groups())
+
+        state.count(f'{method} unknown')
+        self._send(404, {'message': f'{url.path} not found'})
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_PUT(self):
+        self._dispatch('PUT')
+
+    # Shared endpoints
+    def _login(self, query):
+        token = hashlib.sha1(str(time.time()).encode()).hexdigest()
+        self.state.tokens.add(token)
+
+        if self.state.ndfc:
+            claims = json.dumps({'exp': int(time.time()) + 3600}).encode()
+            jwt = 'eyJhbGciOiJIUzI1NiJ9.{0}.{1}'.format(
+                base64.urlsafe_b64encode(claims).decode().rstrip('='), token
+            )
+            return self._send(
+                200, {'jwttoken': jwt},
+                {'Set-Cookie': f'AuthCookie={token}; Path=/'}
+            )
+
+        return self._send(200, {'Dcnm-Token': token})
+
+    def _version(self, query):
+        if self.state.ndfc:
+            return self._send(404)
+        return self._send(200, {'Dcnm-Version': self.state.version})
+
+    def _about(self, query):
+        if not self.state.ndfc:
+            return self._send(404)
+        return self._send(200, {'version': self.state.version})
+
+    def _logout(self, query):
+        return self._send(200)
+
+    def _fabrics(self, query, name=None):
+        if name is None:
+            return self._send(
+                200, [{'fabricName': x} for x in self.state.fabrics]
+            )
+        if name not in self.state.fabrics:
+            return self._send(404)
+        return self._send(200, {'fabricName': name})
+
+    def _page(self, records, query):
+        if not self.state.paging or 'limit' not in query:
+            return records
+
+        offset = int(query.get('offset', ['0'])[0])
+        return records[offset:offset + int(query['limit'][0])]
+
+    def _inventory(self, query):
+        return self._send(200, self._page(self.state.switches, query))
+
+    def _fabric_inventory(self, query, name):
+        if name not in self.state.fabrics:
+            return self._send(404)
+
+        return self._send(200, [
+            x for x in self.state.switches if x['fabricName'] == name
+        ])
+
+    def _poap(self, query, name):
+        if name not in self.state.fabrics:
+            return self._send(404)
+
+        return self._send(200, [
+            dict(data, serialNumber=serial)
+            for serial, data in self.state.poap[name].items()
+        ])
+
+    def _poap_register(self, query, name):
+        body = self._body() or []
+
+        with self.state.lock:
+            for sw in body:
+                self.state.poap[name].pop(sw.get('serialNumber'), None)
+
+        return self._send(200, {'status': 'Success'})
+
+    def _reachability_record(self, ip, password):
+        # Every seventh address does not answer, a password of "bad" fails
+        known = {x['ipAddress']: x for x in self.state.switches}
+        idx = int(ip.rsplit('.', 1)[-1])
+        reachable = idx % 7 != 0
+
+        record = {
+            'ipaddr': ip,
+            'sysName': f'disc-{ip.replace(".", "-")}',
+            'serialNumber': 'DSC' + hashlib.sha1(ip.encode()).hexdigest()[:8],
+            'platform': 'N9K-C93180YC-EX',
+            'version': '9.3(8)',
+            'deviceIndex': f'disc({ip})',
+            'vdcId': 0,
+            'vdcMac': None,
+            'reachable': reachable,
+            'auth': reachable and password != 'bad',
+            'known': ip in known,
+            'valid': True,
+            'selectable': reachable and ip not in known,
+            'statusReason': 'manageable' if reachable else 'timeout',
+        }
+        if ip in known:
+            record['sysName'] = known[ip]['logicalName']
+            record['serialNumber'] = known[ip]['serialNumber']
+            record['statusReason'] = 'already managed'
+
+        return record
+
+    def _reachability(self, query, name):
+        if name not in self.state.fabrics:
+            return self._send(404)
+
+        body = self._body() or {}
+        seeds = [x for x in body.get('seedIP', '').split(',') if x]
+
+        with self.state.lock:
+            records = [
+                self._reachability_record(ip, body.get('password'))
+                for ip in seeds
+            ]
+
+        return self._send(200, records)
+
+    def _discover(self, query, name):
+        if name not in self.state.fabrics:
+            return self._send(404)
+
+        body = self._body() or {}
+
+        with self.state.lock:
+            known = {x['ipAddress'] for x in self.state.switches}
+            for sw in body.get('switches', []):
+                if sw['ipaddr'] in known:
+                    continue
+                record = switch_record(len(self.state.switches), name)
+                record.update({
+                    'serialNumber': sw['serialNumber'],
+                    'logicalName': sw['sysName'],
+                    'hostName': sw['sysName'],
+                    'ipAddress': sw['ipaddr'],
+                    'status': 'discovering',
+                })
+                self.state.switches.append(record)
+                known.add(sw['ipaddr'])
+
+        return self._send(200, {'status': 'Success'})
+
+    def _roles(self, query):
+        body = self._body() or []
+        serials = [x['serialNumber'] for x in body]
+        return self._send(200, {'successList': ','.join(serials)})
+
+    def _templates(self, query):
+        if self.headers.get('If-None-Match') == self.state.templates_etag:
+            return self._send(304)
+
+        templates = self.state.templates
+        name = query.get('filterStr', [''])[0].replace('name=', '')
+        if name:
+            templates = [x for x in templates if name in x['name']]
+
+        return self._send(
+            200, self._page(templates, query),
+            {'ETag': self.state.templates_etag}
+        )
+
+    def _template(self, query, name):
+        for tmpl in self.state.templates:
+            if tmpl['name'] == name:
+                return self._send(200, tmpl)
+        return self._send(404)
+
+
+_FABRIC = r'([^/]+)'
+
+# method, path pattern, handler, authentication required
+ROUTES = [
+    # DCNM 11.5
+    ('GET', f'{DCNM_PREFIX}/dcnm-version', handler._version, False),
+    ('POST', f'{DCNM_PREFIX}/logon', handler._login, False),
+    ('POST', f'{DCNM_PREFIX}/logout', handler._logout, True),
+    ('GET', f'{DCNM_PREFIX}/control/fabrics', handler._fabrics, True),
+    ('GET', f'{DCNM_PREFIX}/control/fabrics/{_FABRIC}', handler._fabrics,
+     True),
+    ('GET', f'{DCNM_PREFIX}/control/fabrics/{_FABRIC}/inventory',
+     handler._fabric_inventory, True),
+    ('GET', f'{DCNM_PREFIX}/control/fabrics/{_FABRIC}/inventory/poap',
+     handler._poap, True),
+    ('POST', f'{DCNM_PREFIX}/control/fabrics/{_FABRIC}/inventory/poap',
+     handler._poap_register, True),
+    ('POST', f'{DCNM_PREFIX}/control/fabrics/{_FABRIC}/inventory/test-reachability',  # noqa:E501
+     handler._reachability, True),
+    ('POST', f'{DCNM_PREFIX}/control/fabrics/{_FABRIC}/inventory/discover',
+     handler._discover, True),
+    ('POST', f'{DCNM_PREFIX}/control/switches/roles', handler._roles, True),
+    ('GET', f'{DCNM_PREFIX}/inventory/switches', handler._inventory, True),
+
+    # NDFC 12.0
+    ('GET', '/appcenter/cisco/ndfc/api/about/version', handler._about, False),
+    ('POST', '/login', handler._login, False),
+    ('GET', f'{NDFC_PREFIX}/lan-fabric/rest/inventory/allswitches',
+     handler._inventory, True),
+    ('GET', f'{NDFC_PREFIX}/lan-fabric/rest/control/fabrics/{_FABRIC}/inventory/switchesByFabric',  # noqa:E501
+     handler._fabric_inventory, True),
+    ('POST', f'{NDFC_PREFIX}/lan-fabric/rest/control/fabrics/{_FABRIC}/inventory/test-reachability',  # noqa:E501
+     handler._reachability, True),
+    ('POST', f'{NDFC_PREFIX}/lan-fabric/rest/control/fabrics/{_FABRIC}/inventory/discover',  # noqa:E501
+     handler._discover, True),
+    ('GET', f'{NDFC_PREFIX}/configtemplate/rest/config/templates',
+     handler._templates, True),
+    ('GET', f'{NDFC_PREFIX}/configtemplate/rest/config/templates/([^/?]+)',
+     handler._template, True),
+]
+
+
+def serve(state, host='127.0.0.1', port=0):
+    """
+    Start a server for state on a background thread. Returns the server,
+    its URL is http://{host}:{server.server_address[1]}
+    """
+
+    request_handler = type('mock_handler', (handler,), {'state': state})
+
+    server = ThreadingHTTPServer((host, port), request_handler)
+    server.daemon_threads = True
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--version', default='11.5(1)')
+    parser.add_argument('--switches', type=int, default=100)
+    parser.add_argument('--fabrics', type=int, default=4)
+    parser.add_argument('--poap', type=int, default=10)
+    parser.add_argument('--templates', type=int, default=100)
+    parser.add_argument('--parameters', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='seconds added to every request')
+    parser.add_argument('--no_paging', dest='paging', action='store_false',
+                        help='ignore offset/limit on list endpoints')
+    args = parser.parse_args()
+
+    state = mock_state(
+        args.version, args.switches, args.fabrics, args.poap,
+        args.templates, args.parameters, args.latency, args.paging
+    )
+    server = serve(state, args.host, args.port)
+
+    print(f'Serving {args.version} on http://{args.host}:{args.port}')
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Benchmark the SDK actions and CLI commands against the local stand-in
+server in mock_dcnm.py at several inventory/template scales. For every
+scenario the wall time, the number of requests the server received and
+the peak memory are reported.
+
+Peak memory of SDK scenarios is the tracemalloc peak of an additional
+traced call, so tracing does not inflate the wall time; CLI scenarios
+run in a child process and report its maximum RSS.
+
+    python benchmarks/run.py --scales 100,1000,10000 --latency 0.005
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import ipaddress
+import statistics
+import subprocess
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+from mock_dcnm import mock_state, serve                        # noqa: E402
+from dcnm_lan_fabric.server import session                     # noqa: E402
+from dcnm_lan_fabric.server.capabilities import capability_cache  # noqa: E402,E501
+from dcnm_lan_fabric.actions import core                       # noqa: E402
+from dcnm_lan_fabric.sdk.template import template              # noqa: E402
+
+
+USER = 'admin'
+PASSWORD = 'benchmark'
+
+# Runs a CLI script in a child process and reports its maximum RSS
+CLI_DRIVER = """
+import atexit, resource, runpy, sys
+atexit.register(lambda: sys.stderr.write(
+    'BENCH_MAXRSS %d\\n' % resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+))
+sys.argv = sys.argv[1:]
+runpy.run_path(sys.argv[0], run_name='__main__')
+"""
+
+
+def connect(url, version):
+    # Forget what previous runs discovered so every run pays the same way
+    capability_cache._memory.clear()
+    return session(url, USER, PASSWORD, secure=False, version=version)
+
+
+# SDK scenarios: func(url, version, state) -> None
+def sdk_switch_list(url, version, state):
+    core.get_switch_list(connect(url, version), None)
+
+
+def sdk_switch_list_fabric(url, version, state):
+    core.get_switch_list(connect(url, version), state.fabrics[0])
+
+
+def sdk_poap_register(url, version, state, batch_size=1, workers=1):
+    fabric = state.fabrics[0]
+    switches = [
+        core.switch_info(serial, f'poap-{serial}', '192.168.0.10', 'admin',
+                         'password', 'leaf')
+        for serial in state.poap[fabric]
+    ]
+
+    core.poap_register_switch(
+        connect(url, version), fabric, switches,
+        batch_size=batch_size, workers=workers
+    )
+
+
+def sdk_poap_register_batched(url, version, state):
+    sdk_poap_register(url, version, state, batch_size=25, workers=4)
+
+
+def sdk_discover(url, version, state):
+    # One address per POAP device, so the count follows the scale
+    count = max(1, len(state.poap[state.fabrics[0]]))
+    first = ipaddress.ip_address('192.168.0.1')
+    last = first + count - 1
+
+    core.discover_switches(
+        connect(url, version), state.fabrics[0], [f'{first}-{last}'],
+        'admin', 'password', probe_size=16, batch_size=25, workers=4
+    )
+
+
+def sdk_template_list(url, version, state):
+    api = connect(url, version).api()
+    template.get_all_templates(api, None, keep_raw=False)
+
+
+def sdk_template_get(url, version, state):
+    api = connect(url, version).api()
+    template.get_template(api, state.templates[0]['name'])
+
+
+# CLI scenarios: func(url, version, state) -> argv
+def cli_switch_show(url, version, state):
+    return [
+        os.path.join(REPO_DIR, 'bin', 'dcnmctl.py'), '--dcnm_host', url,
+        '--dcnm_user', USER, '--dcnm_pass', PASSWORD, 'switch', 'show'
+    ]
+
+
+def cli_switch_add_poap(url, version, state):
+    fabric = state.fabrics[0]
+    serial = next(iter(state.poap[fabric]))
+
+    return [
+        os.path.join(REPO_DIR, 'bin', 'dcnmctl.py'), '--dcnm_host', url,
+        '--dcnm_user', USER, '--dcnm_pass', PASSWORD, 'switch', 'add', 'poap',
+        fabric, serial, 'poap-switch', '192.168.0.10', '--sw_user', 'admin',
+        '--sw_pass', 'password'
+    ]
+
+
+def cli_template_list(url, version, state):
+    return [
+        os.path.join(REPO_DIR, 'bin', 'ndfcctl'), '--host', url, '--user',
+        USER, '--password', PASSWORD, '--version', version, '--no-tls',
+        'template', 'list'
+    ]
+
+
+# name, kind, function, versions it applies to
+SCENARIOS = [
+    ('switch_list', 'sdk', sdk_switch_list, ('11.5', '12.0')),
+    ('switch_list_fabric', 'sdk', sdk_switch_list_fabric, ('11.5', '12.0')),
+    ('poap_register', 'sdk', sdk_poap_register, ('11.5',)),
+    ('poap_register_batched', 'sdk', sdk_poap_register_batched, ('11.5',)),
+    ('discover', 'sdk', sdk_discover, ('11.5', '12.0')),
+    ('template_list', 'sdk', sdk_template_list, ('12.0',)),
+    ('template_get', 'sdk', sdk_template_get, ('12.0',)),
+    ('dcnmctl switch show', 'cli', cli_switch_show, ('11.5',)),
+    ('dcnmctl switch add poap', 'cli', cli_switch_add_poap, ('11.5',)),
+    ('ndfcctl template list', 'cli', cli_template_list, ('12.0',)),
+]
+
+
+def run_sdk(func, url, version, state):
+    state.reset()
+    start = time.perf_counter()
+    func(url, version, state)
+    elapsed = time.perf_counter() - start
+    requests = state.total()
+
+    state.reset()
+    tracemalloc.start()
+    try:
+        func(url, version, state)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return elapsed, requests, peak
+
+
+def run_cli(func, url, version, state):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [REPO_DIR] + [x for x in env.get('PYTHONPATH', '').split(os.pathsep)
+                      if x]
+    )
+
+    state.reset()
+    argv = [sys.executable, '-c', CLI_DRIVER] + func(url, version, state)
+
+    start = time.perf_counter()
+    proc = subprocess.run(argv, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+
+    peak = 0
+    for line in proc.stderr.splitlines():
+        if line.startswith('BENCH_MAXRSS'):
+            # ru_maxrss is KiB on Linux, bytes on macOS
+            peak = int(line.split()[1])
+            if sys.platform != 'darwin':
+                peak *= 1024
+
+    if proc.returncode != 0:
+        raise Exception(f'{argv[3:]} failed: {proc.stderr.strip()}')
+
+    return elapsed, state.total(), peak
+
+
+def benchmark(scale, version, latency, repeat, only):
+    state = mock_state(
+        version=version,
+        switches=scale,
+        poap=max(1, scale // 10),
+        templates=max(10, scale // 10),
+        latency=latency
+    )
+    server = serve(state)
+    url = f'http://127.0.0.1:{server.server_address[1]}'
+
+    results = []
+    try:
+        for name, kind, func, versions in SCENARIOS:
+            if version not in versions or (only and name not in only):
+                continue
+
+            runner = run_sdk if kind == 'sdk' else run_cli
+            runs = []
+
+            for _ in range(repeat):
+                runs.append(runner(func, url, version, state))
+
+            results.append({
+                'scenario': name,
+                'kind': kind,
+                'version': version,
+                'scale': scale,
+                'wall_ms': statistics.median(x[0] for x in runs) * 1000,
+                'requests': statistics.median(x[1] for x in runs),
+                'peak_mib': max(x[2] for x in runs) / (1024 * 1024),
+            })
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--scales', default='100,1000,10000',
+                        help='comma separated switch counts')
+    parser.add_argument('--versions', default='11.5,12.0')
+    parser.add_argument('--latency', type=float, default=0.005,
+                        help='seconds added by the server to every request')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='runs per scenario, the median is reported')
+    parser.add_argument('--only', default='',
+                        help='comma separated scenario names to run')
+    parser.add_argument('--json', dest='json_fname', default=None,
+                        help='also write the results to this file')
+    args = parser.parse_args()
+
+    only = [x for x in args.only.split(',') if x]
+
+    results = []
+    for version in args.versions.split(','):
+        for scale in [int(x) for x in args.scales.split(',')]:
+            results += benchmark(
+                scale, version, args.latency, args.repeat, only
+            )
+
+    print(f"{'Scenario':28}{'Version':>8}{'Scale':>8}{'Wall ms':>11}"
+          f"{'Requests':>10}{'Peak MiB':>10}")
+    for x in results:
+        print(f"{x['scenario']:28}{x['version']:>8}{x['scale']:>8}"
+              f"{x['wall_ms']:>11.1f}{x['requests']:>10.0f}"
+              f"{x['peak_mib']:>10.1f}")
+
+    if args.json_fname:
+        with open(args.json_fname, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
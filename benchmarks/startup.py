@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Import-time budget check for bin/dcnmctl.py. Scripts shell out to dcnmctl
+in tight loops, so --help and argument parsing must not load requests,
+urllib3, typer or the server modules, and the start up overhead over a
+bare interpreter must stay within budget. Exits 1 if a check fails.
+
+    python benchmarks/startup.py --budget_ms 150 --repeat 10
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+DCNMCTL = os.path.join(REPO_DIR, 'bin', 'dcnmctl.py')
+
+# Runs a CLI script and reports the modules it loaded
+CLI_DRIVER = """
+import atexit, runpy, sys
+atexit.register(lambda: sys.stderr.write(
+    'BENCH_MODULES %s\\n' % ','.join(sorted(sys.modules))
+))
+sys.argv = sys.argv[1:]
+runpy.run_path(sys.argv[0], run_name='__main__')
+"""
+
+# Modules that must not be loaded by the command lines below
+HEAVY = ['requests', 'urllib3', 'typer', 'dcnm_lan_fabric.server',
+         'dcnm_lan_fabric.api', 'dcnm_lan_fabric.actions']
+
+# argv, modules that must not be loaded
+COMMANDS = [
+    (['--help'], HEAVY),
+    (['switch', '--help'], ['typer', 'requests', 'urllib3',
+                            'dcnm_lan_fabric.server']),
+    (['template', '--help'], ['dcnm_lan_fabric.server', 'requests']),
+]
+
+
+def environment():
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [REPO_DIR] + [x for x in env.get('PYTHONPATH', '').split(os.pathsep)
+                      if x]
+    )
+    return env
+
+
+def wall(argv, env, repeat):
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(argv, env=env, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL)
+        runs.append(time.perf_counter() - start)
+    return statistics.median(runs)
+
+
+def loaded(argv, env):
+    proc = subprocess.run(
+        [sys.executable, '-c', CLI_DRIVER, DCNMCTL] + argv, env=env,
+        capture_output=True, text=True
+    )
+
+    for line in proc.stderr.splitlines():
+        if line.startswith('BENCH_MODULES'):
+            return set(line.split(' ', 1)[1].split(','))
+
+    raise Exception(f'{argv} failed: {proc.stderr.strip()}')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--budget_ms', type=float, default=150,
+                        help='allowed overhead over a bare interpreter')
+    parser.add_argument('--repeat', type=int, default=10,
+                        help='runs per command, the median is reported')
+    args = parser.parse_args()
+
+    env = environment()
+    baseline = wall([sys.executable, '-c', 'pass'], env, args.repeat)
+
+    failed = False
+    print(f"{'Command':32}{'Wall ms':>10}{'Overhead ms':>13}  Result")
+
+    for argv, forbidden in COMMANDS:
+        elapsed = wall([sys.executable, DCNMCTL] + argv, env, args.repeat)
+        overhead = (elapsed - baseline) * 1000
+
+        modules = loaded(argv, env)
+        heavy = [
+            x for x in forbidden
+            if any(m == x or m.startswith(x + '.') for m in modules)
+        ]
+
+        problems = []
+        if overhead > args.budget_ms:
+            problems.append(f'over {args.budget_ms:.0f} ms budget')
+        if heavy:
+            problems.append(f"loaded {', '.join(heavy)}")
+
+        failed = failed or bool(problems)
+        print(f"{' '.join(argv):32}{elapsed * 1000:>10.1f}{overhead:>13.1f}"
+              f"  {'; '.join(problems) or 'ok'}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,22 @@
 #!/usr/bin/env python3
 
-import sys
 import click
 
-from dcnm_lan_fabric.cli.switch import switch
+from dcnm_lan_fabric.cli.lazy import lazy_group
 
+# Subcommands are imported when invoked, with the short help shown by --help
+SUBCOMMANDS = {
+    'switch': ('dcnm_lan_fabric.cli.switch:switch',
+               'Manage switches in a fabric'),
+    'template': ('dcnm_lan_fabric.cli.template.actions:resource',
+                 'List and inspect NDFC templates'),
+    'agent': ('dcnm_lan_fabric.cli.agent:agent_group',
+              'Manage the agent keeping warm sessions'),
+}
 
-@click.group(invoke_without_command=True)
+
+@click.group(cls=lazy_group, lazy_subcommands=SUBCOMMANDS,
+             invoke_without_command=True)
 @click.option('--dcnm_host', 'dcnm_host', envvar='DCNM_HOST',
               help='IP or FQDN of DCNM server'
               )
@@ -20,8 +30,66 @@ from dcnm_lan_fabric.cli.switch import switch
               is_flag=True, default=True,
               help='flag used to request TLS validation, defaults to True'
               )
+@click.option('--dcnm_version', 'dcnm_version', envvar='DCNM_VERSION',
+              default=None,
+              help='DCNM/NDFC version, e.g. 12.1.2e, probed if not set'
+              )
+@click.option('--token_cache', 'token_cache', envvar='DCNM_TOKEN_CACHE',
+              default=None,
+              help='file used to share auth tokens across invocations'
+              )
+@click.option('--capability_cache', 'capability_cache',
+              envvar='DCNM_CAPABILITY_CACHE', default=None,
+              help='file used to share server version discovery results'
+              )
+@click.option('--pool_size', 'pool_size', envvar='DCNM_POOL_SIZE',
+              type=int, default=10,
+              help='connections kept open to the DCNM server'
+              )
+@click.option('--retries', 'retries', envvar='DCNM_RETRIES',
+              type=int, default=3,
+              help='retries for idempotent requests on transient errors'
+              )
+@click.option('--timeout', 'timeout', envvar='DCNM_TIMEOUT',
+              type=float, default=120,
+              help='seconds to wait for a DCNM server response'
+              )
+@click.option('--rate', 'rate', envvar='DCNM_RATE', type=float, default=None,
+              help='cap on requests per second sent to the DCNM server'
+              )
+@click.option('--template_cache', 'template_cache_dir',
+              envvar='DCNM_TEMPLATE_CACHE', default=None,
+              help='directory used to cache NDFC templates'
+              )
+@click.option('--template_ttl', 'template_ttl', envvar='DCNM_TEMPLATE_TTL',
+              type=int, default=300,
+              help='seconds cached templates are used before revalidation'
+              )
+@click.option('--fleet', 'fleet', envvar='DCNM_FLEET', default=None,
+              help='file defining controllers queried in parallel'
+              )
+@click.option('--agent/--no_agent', 'agent', envvar='DCNM_AGENT',
+              default=False,
+              help='send requests through the agent if it is running, '
+                   'off by default'
+              )
+@click.option('--agent_socket', 'agent_socket', envvar='DCNM_AGENT_SOCKET',
+              default=None,
+              help='Unix socket of the agent, per user default if not set'
+              )
+@click.option('--profile', 'profile', envvar='DCNM_PROFILE', is_flag=True,
+              default=False,
+              help='print per endpoint latency, bytes and retries on exit'
+              )
+@click.option('--profile_trace', 'profile_trace', envvar='DCNM_PROFILE_TRACE',
+              default=None,
+              help='file receiving every request/decode event as JSON lines'
+              )
 @click.pass_context
-def dcnmctl(ctx, dcnm_host, dcnm_user, dcnm_pass, dcnm_verify):
+def dcnmctl(ctx, dcnm_host, dcnm_user, dcnm_pass, dcnm_verify, dcnm_version,
+            token_cache, capability_cache, pool_size, retries, timeout,
+            rate, template_cache_dir, template_ttl, fleet, agent,
+            agent_socket, profile, profile_trace):
     """ A CLI interface to the DCNM API """
 
     ctx.ensure_object(dict)
@@ -30,9 +98,30 @@ def dcnmctl(ctx, dcnm_host, dcnm_user, dcnm_pass, dcnm_verify):
     ctx.obj['dcnm_user'] = dcnm_user
     ctx.obj['dcnm_pass'] = dcnm_pass
     ctx.obj['dcnm_verify'] = dcnm_verify
+    ctx.obj['dcnm_version'] = dcnm_version
+    ctx.obj['token_cache'] = token_cache
+    ctx.obj['capability_cache'] = capability_cache
+    ctx.obj['fleet'] = fleet
+    ctx.obj['agent'] = agent
+    ctx.obj['agent_socket'] = agent_socket
+    ctx.obj['transport_opts'] = dict(
+        pool_size=pool_size, retries=retries, timeout=(10, timeout),
+        rate=rate
+    )
+
+    if template_cache_dir:
+        from dcnm_lan_fabric.sdk.template.cache import template_cache
+
+        ctx.obj['template_cache'] = template_cache(
+            template_cache_dir, template_ttl
+        )
+
+    if profile or profile_trace:
+        from dcnm_lan_fabric.instrument import profiler
+
+        prof = profiler().start()
+        ctx.call_on_close(lambda: prof.report(profile_trace, profile))
 
-# Bolt on all the sub-commands
-dcnmctl.add_command(switch, name='switch')
 
 if __name__ == '__main__':
     dcnmctl(obj={})
@@ -2,14 +2,28 @@
 
 import os
 import json
+import time
+import ipaddress
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import wait, FIRST_COMPLETED
+
+from dcnm_lan_fabric.sdk.inventory.inventory import inventory_store
 
 
 class switch_info:
-    def __init__(self, serial, name, ip, user, password, role):
+    __slots__ = (
+        'serialNumber', 'name', 'mgmt_ip', 'user', 'password', 'role', 'extra'
+    )
+
+    def __init__(self, serial, name, ip, user, password, role, **extra):
         """
         username and password are the discovery username and passwords.
         Assumption is that the 'bare' password will also use the
         discovery password
+
+        Any additional attributes, e.g. from extra keys in the switch file,
+        are kept in extra, readable as attributes and included in asdict()
         """
         self.serialNumber = serial
         self.name = name
@@ -17,9 +31,17 @@ class switch_info:
         self.user = user
         self.password = password
         self.role = role
+        self.extra = extra
+
+    def __getattr__(self, name):
+        # Only called for names that are not slots
+        if name != 'extra' and name in self.extra:
+            return self.extra[name]
+        raise AttributeError(name)
 
     def asdict(self):
-        return {
+        d = dict(self.extra)
+        d.update({
             "serialNumber": self.serialNumber,
             "hostname": self.name,
             "ipAddress": self.mgmt_ip,
@@ -27,7 +49,8 @@ class switch_info:
             "discoveryUsername": self.user,
             "discoveryPassword": self.password,
             "switchRole": self.role
-        }
+        })
+        return d
 
     def json(self):
         return json.dumps(self.asdict())
@@ -37,68 +60,212 @@ class switch_info:
           self.name, self.serialNumber, self.mgmt_ip, self.user, self.password
         )
 
+    @classmethod
+    def fromdict(cls, data):
+        """
+        Build from a switch file entry, keys other than the ones mapped to
+        the named attributes are kept as extra attributes
+        """
+        extra = {k: v for k, v in data.items() if k not in _SWITCH_FILE_KEYS}
+
+        return cls(
+            data['serialNumber'],
+            data['hostname'],
+            data['ipAddress'],
+            data['discoveryUsername'],
+            data['discoveryPassword'],
+            data['switchRole'],
+            **extra
+        )
+
+
+# Switch file keys mapped to the named switch_info attributes
+_SWITCH_FILE_KEYS = (
+    'serialNumber', 'hostname', 'ipAddress', 'discoveryUsername',
+    'discoveryPassword', 'switchRole', 'password'
+)
+
 
 class NoPoapSwitches(Exception):
     pass
 
 
+class switch_file:
+    # Parsed files by path, reused while mtime and size are unchanged
+    _memo = dict()
+    _memo_lock = threading.Lock()
+
+    def __init__(self, data):
+        """
+        Parsed switch file, a dict of fabric name to list of switch entries.
+        switch_info objects and the hostname/serial indexes of a fabric
+        are built on first access to that fabric.
+        """
+        self._data = data
+        self._lock = threading.Lock()
+        self._switches = dict()
+        self._by_name = dict()
+        self._by_serial = dict()
+
+    def __str__(self):
+        return f"dcnm/ndfc.switch_file {len(self._data)} fabrics"
+
+    @classmethod
+    def load(cls, sw_fname):
+        """
+        Parse sw_fname, or return the previous result if the file has not
+        changed since (same mtime and size)
+        """
+        try:
+            st = os.stat(sw_fname)
+        except OSError:
+            raise Exception('Switch file {0} missing'.format(sw_fname))
+
+        key = os.path.abspath(sw_fname)
+        stamp = (st.st_mtime_ns, st.st_size)
+
+        with cls._memo_lock:
+            memo = cls._memo.get(key)
+        if memo is not None and memo[0] == stamp:
+            return memo[1]
+
+        with open(sw_fname, 'r') as f:
+            loaded = cls(json.load(f))
+
+        with cls._memo_lock:
+            cls._memo[key] = (stamp, loaded)
+
+        return loaded
+
+    def fabrics(self):
+        return list(self._data.keys())
+
+    def _fabric(self, fabric_name):
+        if fabric_name not in self._data:
+            raise Exception('Fabric {0} missing'.format(fabric_name))
+
+        with self._lock:
+            if fabric_name not in self._switches:
+                switches = [
+                    switch_info.fromdict(x) for x in self._data[fabric_name]
+                ]
+
+                self._switches[fabric_name] = switches
+                self._by_name[fabric_name] = {x.name: x for x in switches}
+                self._by_serial[fabric_name] = {
+                    x.serialNumber: x for x in switches
+                }
+
+        return self._switches[fabric_name]
+
+    def switches(self, fabric_name=None):
+        """
+        switch_info objects of the fabric, or of every fabric
+        """
+        if fabric_name is not None:
+            return list(self._fabric(fabric_name))
+
+        return [x for fab in self._data for x in self._fabric(fab)]
+
+    def by_name(self, name, fabric_name):
+        self._fabric(fabric_name)
+        return self._by_name[fabric_name].get(name)
+
+    def by_serial(self, serial, fabric_name):
+        self._fabric(fabric_name)
+        return self._by_serial[fabric_name].get(serial)
+
+
 def switch_data(sw_fname, fabric_name=False, switch_name=False):
     """
     Read all the switch data via JSON and return the data for
     the specified fabric and, optionally, the given switch
-    """
 
-    # Load switch data from JSON file
-    if not os.path.exists(sw_fname):
-        raise Exception('Switch file {0} missing'.format(sw_fname))
+    The parsed file is reused until it changes on disk, so the returned
+    switch_info objects are shared between calls.
+    """
 
-    with open(sw_fname, 'r') as f:
-        data = json.load(f)
+    data = switch_file.load(sw_fname)
 
     # Do I need to limit switch data to a given fabric
     if fabric_name is not False:
-        if fabric_name not in data:
-            raise Exception('Fabric {0} missing'.format(fabric_name))
-
         fabrics = [fabric_name]
     else:
-        fabrics = data.keys()
+        fabrics = data.fabrics()
 
     switches = []
     for fab_name in fabrics:
-        fabric_switches = data[fab_name]
-
-        # Pretty intense list comprehension
-        switches += [
-            switch_info(
-                x['serialNumber'],
-                x['hostname'],
-                x['ipAddress'],
-                x['discoveryUsername'],
-                x['discoveryPassword'],
-                x['switchRole']
-            )
-            for x in fabric_switches
-            if (
-                switch_name is False or x['hostname'] == switch_name
-            )
-        ]
+        if switch_name is False:
+            switches += data.switches(fab_name)
+            continue
+
+        sw = data.by_name(switch_name, fab_name)
+        if sw is not None:
+            switches.append(sw)
 
     return switches
 
 
-def poap_register_switch(conn, fabric_name, switch):
+def _chunks(items, size):
     """
-    poap_register_switch(conn, switch):
-        conn - dcnm_lan.server.session.session
+    Split a list into consecutive chunks of at most size entries
+    """
+
+    size = max(1, int(size))
+    return [items[idx:idx + size] for idx in range(0, len(items), size)]
 
+
+def _register_chunk(api, fabric_name, chunk):
+    """
+    Post one chunk of merged POAP configs and return the status for each
+    hostname. The controller reports a single status per request, so every
+    hostname of the chunk gets the chunk's status.
+    """
+
+    json_data = json.dumps(chunk)
+
+    # Send updated switches to config
+    results = api.create_bootstrap_devices(fabric_name, json_data)
+
+    if isinstance(results, dict) and 'status' in results:
+        status = results['status']
+    else:
+        status = 'No output returned on success'
+
+    return {sw['hostname']: status for sw in chunk}
+
+
+def poap_register_switch(conn, fabric_name, switch, batch_size=1, workers=1,
+                         retries=0, devices=None, store=None):
+    """
+    poap_register_switch(conn, fabric_name, switch):
+        conn - dcnm_lan.server.session.session
+        fabric_name - fabric the POAP switches are registered into
+        switch - iterable of switch_info objects
+        batch_size - number of switches posted per request
+        workers - number of chunks posted concurrently
+        retries - number of additional attempts for chunks that failed
+        devices - POAP devices as returned by get_bootstrap_devices, if
+                  the caller already has them, fetched otherwise
+        store - optional sdk.inventory.inventory.inventory_store, the
+                fabric is marked stale in it once switches are registered
+
+    Defaults post one switch at a time, serially. The bootstrap endpoint
+    accepts an array so larger batch sizes cut down on round trips. The
+    status is per chunk, every hostname posted together reports the same
+    one. Only the switches of chunks that failed are retried, and only
+    while still waiting in POAP: a failed post may have registered some of
+    them and the bootstrap endpoint is not idempotent, so the POAP list is
+    read again before each retry. Hostnames that still fail after all
+    attempts report the last error as their status.
     """
 
     # Current connections API model/version
     api = conn.api()
 
     # Get list of switches in POAP status
-    devices = api.get_bootstrap_devices(fabric_name)
+    if devices is None:
+        devices = api.get_bootstrap_devices(fabric_name)
 
     # Merge data from POAP devices and configuration from user
     configs = []
@@ -113,23 +280,457 @@ def poap_register_switch(conn, fabric_name, switch):
     if len(configs) == 0:
         raise NoPoapSwitches()
 
-    # Okay, loop over each device and post it
-    output = {}
-    for sw in configs:
-        json_data = json.dumps([sw])
+    # Seed output so hostnames report in the order they were requested
+    output = {sw['hostname']: None for sw in configs}
+    pending = _chunks(configs, batch_size)
+    attempts = max(0, int(retries)) + 1
+
+    for attempt in range(attempts):
+        failed = []
+
+        with ThreadPoolExecutor(max_workers=max(1, int(workers))) as pool:
+            futures = {
+                pool.submit(_register_chunk, api, fabric_name, chunk): chunk
+                for chunk in pending
+            }
+
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    output.update(future.result())
+                except Exception as err:
+                    failed.append(chunk)
+                    for sw in chunk:
+                        output[sw['hostname']] = f'Failed: {err}'
+
+        if len(failed) == 0 or attempt == attempts - 1:
+            break
+
+        # Re-post only the switches the failed attempts did not register.
+        # Without the POAP list a retry could register switches twice.
+        try:
+            devices = api.get_bootstrap_devices(fabric_name)
+        except Exception:
+            break
+
+        remaining = []
+        for sw in [sw for chunk in failed for sw in chunk]:
+            if sw['serialNumber'] in devices:
+                remaining.append(sw)
+            else:
+                output[sw['hostname']] += ' (no longer in POAP, not retried)'
+
+        if len(remaining) == 0:
+            break
+
+        pending = _chunks(remaining, batch_size)
+
+    if store is not None:
+        store.invalidate(fabric_name)
+
+    return output
+
+
+def poap_watch(conn, fabric_name, switch, interval=5, max_interval=60,
+               backoff=2.0, timeout=None, batch_size=25, workers=4,
+               retries=1, store=None):
+    """
+    poap_watch(conn, fabric_name, switch):
+        conn - dcnm_lan.server.session.session
+        fabric_name - fabric the POAP switches are registered into
+        switch - iterable of switch_info objects to register
+        interval, max_interval - seconds between polls of the POAP list;
+                  the delay grows by backoff while the list is unchanged,
+                  up to max_interval, and is reset when it changes
+        timeout - seconds after which to give up, None to wait for all
+        batch_size, workers, retries, store - see poap_register_switch
+
+    Generator polling the POAP devices of the fabric. Every poll is
+    compared with the previous one and the requested switches that are
+    waiting in POAP are registered right away, in batches. Yields a dict
+    per poll:
+        {
+            'appeared': serial numbers new in the POAP list,
+            'gone': serial numbers no longer in the POAP list,
+            'registered': poap_register_switch output, hostname to status,
+            'pending': serial numbers not registered yet,
+            'error': poll error, or None,
+            'delay': seconds until the next poll
+        }
+    Ends once every switch is registered or the timeout expires. Switches
+    that failed to register stay pending and are tried again on the next
+    poll.
+    """
+
+    # Current connections API model/version
+    api = conn.api()
+
+    wanted = {sw.serialNumber: sw for sw in switch}
+    pending = set(wanted)
 
-        # Send updated switches to config
-        results = api.create_bootstrap_devices(fabric_name, json_data)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    previous = dict()
+    delay = interval
 
-        if 'status' in results:
-            output[sw['hostname']] = results['status']
+    while pending:
+        event = {
+            'appeared': [], 'gone': [], 'registered': dict(), 'error': None
+        }
+
+        try:
+            devices = api.get_bootstrap_devices(fabric_name)
+        except Exception as err:
+            devices = None
+            event['error'] = err
+
+        if devices is not None:
+            event['appeared'] = sorted(set(devices) - set(previous))
+            event['gone'] = sorted(set(previous) - set(devices))
+
+            ready = [wanted[x] for x in sorted(pending & set(devices))]
+            if ready:
+                results = poap_register_switch(
+                    conn, fabric_name, ready, batch_size=batch_size,
+                    workers=workers, retries=retries, devices=devices,
+                    store=store
+                )
+                event['registered'] = results
+
+                for sw in ready:
+                    # Output is keyed by the hostname of the merged config
+                    d = sw.asdict()
+                    d.update(devices[sw.serialNumber])
+
+                    status = results.get(d['hostname'])
+                    if status is not None and \
+                            not str(status).startswith('Failed'):
+                        pending.discard(sw.serialNumber)
+
+            changed = event['appeared'] or event['gone']
+            previous = devices
         else:
-            output[sw['hostname']] = 'No output returned on success'
+            changed = False
 
-    return output
+        # Poll quickly while switches come and go, back off when idle
+        if changed:
+            delay = interval
+        else:
+            delay = min(max_interval, delay * backoff)
+
+        if deadline is not None:
+            delay = max(0, min(delay, deadline - time.monotonic()))
+
+        event['pending'] = sorted(pending)
+        event['delay'] = delay if pending else 0
+        yield event
+
+        if not pending:
+            return
+        if deadline is not None and time.monotonic() >= deadline:
+            return
+
+        time.sleep(delay)
+
+
+def expand_targets(targets, limit=4096):
+    """
+    expand_targets(targets, limit):
+        targets - iterable of IP addresses, CIDR ranges (10.1.1.0/28) or
+                  first-last ranges (10.1.1.10-10.1.1.20)
+        limit - most addresses accepted
+
+    Return the unique host addresses of targets, in the order given.
+    Network and broadcast addresses of CIDR ranges are left out.
+    """
+
+    ips = dict()
+
+    for target in targets:
+        target = target.strip()
+        if not target:
+            continue
+
+        try:
+            if '/' in target:
+                net = ipaddress.ip_network(target, strict=False)
+                size = net.num_addresses
+                hosts = net if size <= 2 else net.hosts()
+            elif '-' in target:
+                first, last = [
+                    ipaddress.ip_address(x.strip())
+                    for x in target.split('-', 1)
+                ]
+                size = int(last) - int(first) + 1
+                if size < 1:
+                    raise ValueError('range ends before it starts')
+                hosts = (first + x for x in range(size))
+            else:
+                size = 1
+                hosts = [ipaddress.ip_address(target)]
+        except ValueError as err:
+            raise Exception(f'Invalid address {target}: {err}')
+
+        if len(ips) + size > limit:
+            raise Exception(
+                f'More than {limit} addresses to discover, at {target}'
+            )
+
+        for ip in hosts:
+            ips[str(ip)] = None
+
+    return list(ips)
+
+
+def _reachability_chunk(api, fabric_name, seeds, credentials):
+    """
+    Check one chunk of seed IPs and return the switch records found
+    """
 
+    body = dict(credentials, seedIP=','.join(seeds))
+    results = api.test_reachability(fabric_name, json.dumps(body))
+
+    return results if isinstance(results, list) else []
+
+
+def _discover_chunk(api, fabric_name, records, credentials):
+    """
+    Submit one chunk of reachable switch records to the fabric
+    """
+
+    body = dict(
+        credentials,
+        seedIP=','.join(x['ipaddr'] for x in records),
+        switches=records
+    )
+
+    return api.discover_switches(fabric_name, json.dumps(body))
+
+
+def _discover_status(record):
+    """
+    Reason a test_reachability record can not be discovered, or None for
+    switches that can be, or are known already
+    """
+
+    if not record.get('reachable'):
+        return 'Unreachable'
+    if not record.get('auth'):
+        return 'Authentication failed'
+    if record.get('known'):
+        return None
+    if record.get('selectable') is False:
+        return record.get('statusReason') or 'Not selectable'
+
+    return None
+
+
+def discover_switches(conn, fabric_name, targets, username, password,
+                      preserve_config=True, max_hops=0, probe_size=16,
+                      batch_size=25, workers=4, retries=0, limit=4096,
+                      store=None):
+    """
+    discover_switches(conn, fabric_name, targets, username, password):
+        conn - dcnm_lan.server.session.session
+        fabric_name - fabric the switches are added to
+        targets - management IPs or ranges, see expand_targets
+        username, password - switch credentials
+        preserve_config - keep the switch configs, erased if False
+        max_hops - neighbor hops discovered beyond the seed IPs
+        probe_size - number of IPs checked per reachability request
+        batch_size - number of switches submitted per discover request
+        workers - number of requests running concurrently
+        retries - number of additional attempts for requests that failed
+        limit - most addresses accepted from targets
+        store - optional sdk.inventory.inventory.inventory_store. Addresses
+                of switches it holds are reported known without checking
+                them, and the fabric is marked stale after discovery.
+
+    Reachability and credential checks run concurrently; reachable
+    switches are submitted to the controller batch_size at a time as soon
+    as enough of them have been checked, while the remaining checks are
+    still running. Returns a report keyed by management IP:
+        {
+            'discovered': [ip, ...],
+            'known': [ip, ...] already in the controller,
+            'failed': {ip: reason, ...},
+            'switches': {ip: test_reachability record, ...},
+            'requests': number of requests posted
+        }
+    """
+
+    # Current connections API model/version
+    api = conn.api()
+
+    ips = expand_targets(targets, limit)
+
+    credentials = {
+        'username': username,
+        'password': password,
+        'snmpV3AuthProtocol': 0,
+        'maxHops': max_hops,
+        'cdpSecondTimeout': 5,
+        'preserveConfig': preserve_config,
+        'platform': None,
+    }
+
+    report = {
+        'discovered': [],
+        'known': [],
+        'failed': dict(),
+        'switches': dict(),
+        'requests': 0
+    }
+
+    if len(ips) == 0:
+        return report
+
+    # Switches the controller already manages need no reachability check
+    if store is not None:
+        store.ensure()
+
+        unknown = []
+        for ip in ips:
+            record = store.by_ip(ip)
+            if record is None:
+                unknown.append(ip)
+                continue
+
+            report['known'].append(ip)
+            report['switches'][ip] = {
+                'ipaddr': ip,
+                'sysName': record.get('logicalName'),
+                'serialNumber': record.get('serialNumber'),
+                'known': True,
+            }
+        ips_checked = unknown
+    else:
+        ips_checked = ips
+
+    batch_size = max(1, int(batch_size))
+    checked = set()
+    ready = []
+
+    with ThreadPoolExecutor(max_workers=max(1, int(workers))) as pool:
+        futures = dict()
+
+        def submit(kind, chunk, attempt=0):
+            func = _reachability_chunk if kind == 'probe' else _discover_chunk
+            future = pool.submit(func, api, fabric_name, chunk, credentials)
+            futures[future] = (kind, chunk, attempt)
+            report['requests'] += 1
+
+        for chunk in _chunks(ips_checked, probe_size):
+            submit('probe', chunk)
+
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                kind, chunk, attempt = futures.pop(future)
+
+                try:
+                    results = future.result()
+                except Exception as err:
+                    if attempt < retries:
+                        submit(kind, chunk, attempt + 1)
+                        continue
+
+                    for x in chunk:
+                        ip = x if kind == 'probe' else x['ipaddr']
+                        report['failed'][ip] = f'Failed: {err}'
+                    continue
+
+                if kind == 'discover':
+                    report['discovered'] += [x['ipaddr'] for x in chunk]
+                    continue
+
+                for record in results:
+                    ip = record.get('ipaddr')
+                    if ip is None or ip in checked:
+                        continue
+                    checked.add(ip)
+                    report['switches'][ip] = record
+
+                    status = _discover_status(record)
+                    if status is not None:
+                        report['failed'][ip] = status
+                    elif record.get('known'):
+                        report['known'].append(ip)
+                    else:
+                        ready.append(record)
+
+                for ip in chunk:
+                    if ip not in checked:
+                        report['failed'][ip] = 'No reachability result'
+
+            # Submit full batches right away, the remainder once all the
+            # reachability checks are done
+            probing = any(x[0] == 'probe' for x in futures.values())
+            while len(ready) >= batch_size or (ready and not probing):
+                submit('discover', ready[:batch_size])
+                ready = ready[batch_size:]
+
+    if store is not None and report['discovered']:
+        store.invalidate(fabric_name)
+
+    # Report in the order the addresses were given, neighbors last
+    order = {ip: idx for idx, ip in enumerate(ips)}
+
+    def key(ip):
+        return order.get(ip, len(order))
+
+    report['discovered'].sort(key=key)
+    report['known'].sort(key=key)
+    report['failed'] = {
+        ip: report['failed'][ip] for ip in sorted(report['failed'], key=key)
+    }
+
+    return report
+
+
+def _role_chunk(api, chunk):
+    """
+    Post one chunk of role assignments and return the serial numbers the
+    server did not report in its successList
+    """
+
+    results = api.set_switch_roles(json.dumps(chunk))
+
+    succeeded = set()
+    if isinstance(results, dict) and results.get('successList'):
+        succeeded = {
+            x.strip() for x in results['successList'].split(',') if x.strip()
+        }
+
+    return [x['serialNumber'] for x in chunk
+            if x['serialNumber'] not in succeeded]
+
+
+def assign_switch_role(conn, fabric_name, switch_role, switch,
+                       batch_size=None, workers=1, retries=0, store=None):
+    """
+    assign_switch_role(conn, fabric_name, switch_role, switch):
+        conn - dcnm_lan.server.session.session
+        fabric_name - fabric of the switches
+        switch_role - role to assign, or None/"" to use each switch's role
+        switch - iterable of switch_info objects
+        batch_size - number of switches posted per request, default all
+        workers - number of chunks posted concurrently
+        retries - number of additional attempts for failed serials
+        store - optional sdk.inventory.inventory.inventory_store, the
+                fabric is marked stale in it once roles changed
+
+    Serial numbers missing from a chunk's successList, or belonging to a
+    chunk whose request failed, are regrouped into chunks and retried.
+    Returns a report:
+        {
+            'success': [serialNumber, ...],
+            'failed': {serialNumber: reason, ...},
+            'roles': {serialNumber: role, ...},
+            'requests': number of requests posted
+        }
+    """
 
-def assign_switch_role(conn, fabric_name, switch_role, switch):
     # Current connections API model/version
     api = conn.api()
 
@@ -146,18 +747,186 @@ def assign_switch_role(conn, fabric_name, switch_role, switch):
 
         body.append(role)
 
-    results = api.set_switch_roles(json.dumps(body))
+    report = {
+        'success': [],
+        'failed': dict(),
+        'roles': {x['serialNumber']: x['role'] for x in body},
+        'requests': 0
+    }
+
+    if len(body) == 0:
+        return report
+
+    pending = _chunks(body, batch_size or len(body))
+
+    for attempt in range(max(0, int(retries)) + 1):
+        failed = dict()
+
+        with ThreadPoolExecutor(max_workers=max(1, int(workers))) as pool:
+            futures = {
+                pool.submit(_role_chunk, api, chunk): chunk
+                for chunk in pending
+            }
+
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    for serial in future.result():
+                        failed[serial] = 'Not in successList'
+                except Exception as err:
+                    for x in chunk:
+                        failed[x['serialNumber']] = f'Failed: {err}'
+
+        report['requests'] += len(pending)
+
+        if len(failed) == 0:
+            break
+
+        # Regroup the failed serials, keeping the requested order
+        retry = [x for x in body if x['serialNumber'] in failed]
+        pending = _chunks(retry, batch_size or len(retry))
+
+    report['failed'] = failed
+    report['success'] = [
+        x['serialNumber'] for x in body if x['serialNumber'] not in failed
+    ]
+
+    if store is not None and report['success']:
+        store.invalidate(fabric_name)
 
-    if 'successList' in results:
-        return results['successList'].split(',')
+    return report
 
-    return []
 
+def inventory_switches(conn, fabric_name, names=None, role=None, store=None):
+    """
+    inventory_switches(conn, fabric_name, names, role):
+        conn - dcnm_lan.server.session.session
+        fabric_name - fabric the switches belong to
+        names - optional iterable of switch names to keep
+        role - optional current switch role to keep
+        store - optional sdk.inventory.inventory.inventory_store to answer
+                from, loaded on first use
+
+    switch_info objects for the switches of fabric_name in the inventory
+    matching the filters. Credentials are not part of the inventory and
+    are left as None.
+    """
+
+    if store is None:
+        store = inventory_store(conn.api())
+
+    store.ensure(fabric_name)
+
+    if role:
+        records = [
+            x for x in store.role(role) if x.get('fabricName') == fabric_name
+        ]
+    else:
+        records = store.fabric(fabric_name)
+
+    if names is not None:
+        names = set(names)
+        records = [x for x in records if x.get('logicalName') in names]
+
+    return [
+        switch_info(
+            x['serialNumber'], x.get('logicalName'), x.get('ipAddress'),
+            None, None, x.get('switchRole', x.get('role'))
+        )
+        for x in sorted(records, key=lambda x: x.get('logicalName') or '')
+    ]
+
+
+# Inventory fields reported by get_switch_list
+SWITCH_LIST_FIELDS = ['logicalName', 'ipAddress', 'fabricName']
+
+
+def _fabric_switch_list(api, fabric_name):
+    """
+    Switches of one fabric using the fabric-scoped inventory endpoint, or
+    None if the API version does not provide one. A fabric the server does
+    not know is reported as missing.
+    """
+
+    if not hasattr(api, 'get_fabric_inventory'):
+        return None
+
+    # Imported here, requests is only loaded once a request is made
+    from requests.exceptions import HTTPError
+
+    try:
+        devices = api.get_fabric_inventory(
+            fabric_name, fields=SWITCH_LIST_FIELDS
+        )
+
+        return [
+            {
+                'name': sw['logicalName'],
+                'ip': sw['ipAddress'],
+                'fabric': sw.get('fabricName', fabric_name)
+            }
+            for sw in devices
+        ]
+    except HTTPError as err:
+        if err.response is not None and err.response.status_code == 404:
+            raise Exception('Fabric {0} missing'.format(fabric_name))
+        raise
+
+
+def get_switch_list(conn, fabric_name, workers=4, store=None):
+    """
+    get_switch_list(conn, fabric_name):
+        conn - dcnm_lan.server.session.session
+        fabric_name - None for all switches, a fabric name, or a list of
+                      fabric names queried concurrently
+        store - optional sdk.inventory.inventory.inventory_store to answer
+                from, loaded on first use
+
+    Fabrics are queried with the fabric-scoped inventory endpoint where
+    the API version supports it. Otherwise the full inventory is fetched
+    once and filtered.
+    """
+
+    if fabric_name is None:
+        fabrics = None
+    elif isinstance(fabric_name, str):
+        fabrics = [fabric_name]
+    else:
+        fabrics = list(fabric_name)
+
+    if store is not None:
+        if fabrics is None:
+            store.ensure()
+            devices = list(store)
+        else:
+            devices = []
+            for fabric in fabrics:
+                store.ensure(fabric)
+                devices += store.fabric(fabric)
+
+        # Server order, as without a store
+        return [
+            {
+                'name': sw.get('logicalName'),
+                'ip': sw.get('ipAddress'),
+                'fabric': sw.get('fabricName')
+            }
+            for sw in devices
+        ]
 
-def get_switch_list(conn, fabric_name):
     api = conn.api()
 
-    devices = api.get_switch_inventory()
+    if fabrics is not None:
+        with ThreadPoolExecutor(max_workers=max(1, int(workers))) as pool:
+            scoped = list(pool.map(
+                lambda fabric: _fabric_switch_list(api, fabric), fabrics
+            ))
+
+        if all(x is not None for x in scoped):
+            return [sw for switches in scoped for sw in switches]
+
+    # Stream the inventory, keeping only the fields we report
+    devices = api.get_switch_inventory(fields=SWITCH_LIST_FIELDS)
 
     switches = [
         {
@@ -167,8 +936,58 @@ def get_switch_list(conn, fabric_name):
         }
         for sw in devices
         if (
-            fabric_name is None or sw['fabricName'] == fabric_name
+            fabrics is None or sw['fabricName'] in fabrics
         )
     ]
 
     return switches
+
+
+def iter_switch_list(conn, fabric_name=None, page_size=500, prefetch=0):
+    """
+    iter_switch_list(conn, fabric_name, page_size, prefetch):
+        conn - dcnm_lan.server.session.session
+        fabric_name - None for all switches, a fabric name or a list of
+                      fabric names
+        page_size - switches per inventory page
+        prefetch - inventory pages fetched ahead concurrently
+
+    Generator yielding the same records as get_switch_list, in inventory
+    order, as they arrive. Fabrics are read with the fabric-scoped
+    inventory endpoint where available, otherwise from the paginated
+    inventory, so callers can stop early without reading everything.
+    """
+
+    if fabric_name is None:
+        fabrics = None
+    elif isinstance(fabric_name, str):
+        fabrics = [fabric_name]
+    else:
+        fabrics = list(fabric_name)
+
+    api = conn.api()
+
+    if fabrics is not None:
+        remaining = []
+        for fabric in fabrics:
+            switches = _fabric_switch_list(api, fabric)
+            if switches is None:
+                remaining.append(fabric)
+                continue
+            yield from switches
+
+        if len(remaining) == 0:
+            return
+        fabrics = remaining
+
+    devices = api.iter_switch_inventory(
+        fields=SWITCH_LIST_FIELDS, page_size=page_size, prefetch=prefetch
+    )
+
+    for sw in devices:
+        if fabrics is None or sw['fabricName'] in fabrics:
+            yield {
+                'name': sw['logicalName'],
+                'ip': sw['ipAddress'],
+                'fabric': sw['fabricName']
+            }
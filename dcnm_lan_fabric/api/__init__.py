@@ -5,3 +5,4 @@ from .v11_5 import api as v11_5                       # noqa: F401
 from .v11_5 import authenticate as dcnm_authenticate  # noqa: F401
 from .v12_0 import api as v12_0                       # noqa: F401
 from .v12_0 import authenticate as ndfc_authenticate  # noqa: F401
+from .cache import response_cache                     # noqa: F401
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+asyncio variants of the API classes. Each method has the same name and
+arguments as its blocking counterpart and returns a coroutine, e.g.
+
+    api = await conn.api()
+    templates = await api.get_templates()
+
+Calls run the blocking method on the async_session's worker pool, under
+its concurrency limit, so auth and transport handling are shared with
+the synchronous session. Generators such as get_templates(fields=...) are
+drained into a list on the pool. The iter_* methods, get_pages and
+get_stream return async iterators instead, fetching records on the pool:
+
+    async for sw in api.iter_switch_inventory(page_size=500):
+        ...
+
+Helpers doing no I/O, e.g. templates_url, stay plain methods.
+"""
+
+import inspect
+from itertools import islice
+
+from .lan_fabric import api as _core
+from .v11_5 import api as _v11_5
+from .v12_0 import api as _v12_0
+
+
+class api:
+    # Blocking API class this class mirrors
+    _sync = _core
+
+    # Methods doing no I/O, returned as is
+    _plain = ('templates_url', 'template_url', 'page_url', 'use_cache')
+
+    # Generator methods served as async iterators, besides iter_*
+    _streams = ('get_stream', 'get_pages')
+
+    # Records taken from a generator per trip to the worker pool
+    chunk_size = 100
+
+    def __init__(self, conn, sync_api=None):
+        """
+        conn - dcnm_lan_fabric.server.aio.async_session
+        sync_api - blocking API object to wrap, built if not provided
+        """
+
+        self._conn = conn
+
+        if sync_api is None:
+            sync_api = self._sync(conn.session)
+        self._api = sync_api
+
+    def __str__(self):
+        return f"dcnm/ndfc.aio.{type(self).__name__} {self._conn}"
+
+    def __getattr__(self, name):
+        """
+        Any public method of the blocking API becomes a coroutine function,
+        generator methods return async iterators
+        """
+
+        attr = getattr(self._api, name)
+        if name.startswith('_') or not callable(attr) or name in self._plain:
+            return attr
+
+        if name.startswith('iter_') or name in self._streams:
+            def method(*args, **kwargs):
+                return self._iterate(attr, *args, **kwargs)
+        else:
+            async def method(*args, **kwargs):
+                return await self._conn.run(_call, attr, *args, **kwargs)
+
+        method.__name__ = name
+        method.__doc__ = attr.__doc__
+
+        return method
+
+    async def _iterate(self, func, *args, **kwargs):
+        """
+        Async generator over the records of a blocking generator method,
+        taken chunk_size at a time on the worker pool so no request runs
+        on the event loop
+        """
+
+        records = await self._conn.run(func, *args, **kwargs)
+
+        try:
+            while True:
+                chunk = await self._conn.run(
+                    _take, records, self.chunk_size
+                )
+                if not chunk:
+                    return
+
+                for record in chunk:
+                    yield record
+        finally:
+            # Releases the streamed response of an unfinished generator
+            await self._conn.run(_close, records)
+
+
+def _call(func, *args, **kwargs):
+    result = func(*args, **kwargs)
+
+    # Drain generators on the worker, never on the event loop
+    if inspect.isgenerator(result):
+        return list(result)
+
+    return result
+
+
+def _take(records, count):
+    return list(islice(records, count))
+
+
+def _close(records):
+    try:
+        records.close()
+    except ValueError:
+        # Still running on another worker after a cancellation
+        pass
+
+
+class v11_5(api):
+    _sync = _v11_5
+
+
+class v12_0(api):
+    _sync = _v12_0
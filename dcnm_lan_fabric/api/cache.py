@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+import copy
+import time
+import threading
+from collections import OrderedDict
+
+
+def _path(url):
+    return url.split('?', 1)[0].rstrip('/')
+
+
+def _within(path, prefix):
+    return path == prefix or path.startswith(prefix + '/')
+
+
+def _related(a, b):
+    """
+    True if path a and b are the same resource, or one contains the other
+    """
+
+    return _within(a, b) or _within(b, a)
+
+
+class response_cache:
+    def __init__(self, ttl=30, maxsize=256, ttls=None):
+        """
+        Initialize instance with the following information:
+          - ttl: seconds a GET response is reused, unless overridden
+          - maxsize: entries kept, least recently used are evicted first
+          - ttls: dict of path prefix to ttl, the longest matching prefix
+            wins over the API defaults and ttl. A ttl of 0 disables caching
+            for the prefix.
+
+        Values are copied in and out, so callers may modify what they get.
+        """
+
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.ttls = dict(ttls or {})
+
+        self.hits = 0
+        self.misses = 0
+
+        # Bumped by every invalidation, see store()
+        self.generation = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return f"dcnm/ndfc.response_cache {len(self._entries)} entries, {self.hits} hits, {self.misses} misses"  # noqa:E501
+
+    def __len__(self):
+        return len(self._entries)
+
+    def ttl_for(self, url, defaults=None):
+        """
+        ttl of url: the longest prefix in ttls, then in defaults, else ttl
+        """
+
+        path = _path(url)
+
+        for table in (self.ttls, defaults or {}):
+            matches = [x for x in table if _within(path, _path(x))]
+            if matches:
+                return table[max(matches, key=len)]
+
+        return self.ttl
+
+    def load(self, url):
+        """
+        Copy of the cached response of url, or None
+        """
+
+        with self._lock:
+            entry = self._entries.get(url)
+
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[url]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(url)
+            self.hits += 1
+            value = entry[1]
+
+        return copy.deepcopy(value)
+
+    def store(self, url, value, ttl=None, generation=None):
+        """
+        store(url, value, ttl, generation): cache value for url. If the
+        generation read before the request was sent is given and entries
+        were invalidated since, the value may predate the write and is
+        not stored.
+        """
+
+        ttl = self.ttl if ttl is None else ttl
+        if not ttl or value is None:
+            return
+
+        value = copy.deepcopy(value)
+
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+
+            self._entries[url] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(url)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, url=None, links=()):
+        """
+        invalidate(url, links): drop the entries of url's resource path,
+        the paths containing it or contained by it, and of the linked path
+        prefixes. Everything if url is None.
+        """
+
+        with self._lock:
+            self.generation += 1
+
+            if url is None:
+                self._entries.clear()
+                return
+
+            paths = [_path(url)] + [_path(x) for x in links]
+
+            for key in list(self._entries):
+                if any(_related(_path(key), x) for x in paths):
+                    del self._entries[key]
@@ -1,20 +1,303 @@
 #!/usr/bin/env python3
 
+import copy
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .. import instrument
+from .stream import CHUNK_SIZE, iter_json_array, project
+
+
+class _flight:
+    """
+    A GET in progress, shared by the callers asking for the same URL
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+    def wait(self):
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+
+        # Each caller gets its own copy, the leader keeps the original
+        return copy.deepcopy(self.result)
+
+
 class api:
+    # Default response cache ttls by path prefix, see use_cache()
+    cache_ttls = {}
+
+    # Path prefixes whose cached responses a write to the key prefix
+    # changes, on top of the written path itself and its parents
+    cache_links = {}
+
+    # Query string selecting one page of a list endpoint, see get_pages()
+    page_query = 'offset={offset}&limit={limit}'
+
     def __init__(self, conn):
         self._conn = conn
+        self._cache = None
+
+        # GETs in flight by URL, concurrent identical GETs share one
+        self._flights = dict()
+        self._flights_lock = threading.Lock()
+
+    @property
+    def host(self):
+        """
+        api.host: controller the requests of this API object are sent to
+        """
+
+        return self._conn.host
+
+    def use_cache(self, cache):
+        """
+        api.use_cache(self, cache):
+            answer get() from cache, a response_cache, while fresh. post()
+            and put() invalidate the related entries. None disables it.
+        """
+
+        self._cache = cache
+        return self
+
+    def _invalidate(self, url):
+        path = url.split('?', 1)[0]
+
+        # GETs started before the write must not be joined after it
+        with self._flights_lock:
+            for key in list(self._flights):
+                other = key.split('?', 1)[0]
+                if other == path or other.startswith(path + '/') or \
+                        path.startswith(other + '/'):
+                    del self._flights[key]
+
+        if self._cache is None:
+            return
+
+        links = [
+            x for prefix, targets in self.cache_links.items()
+            if path == prefix or path.startswith(prefix + '/')
+            for x in targets
+        ]
+        self._cache.invalidate(url, links)
+
+    def _json(self, result, url):
+        """
+        api._json(self, result, url):
+            decode a JSON response, timed when instrumentation is enabled
+        """
+
+        if not instrument.enabled():
+            return result.json()
+
+        endpoint = url.split('?', 1)[0]
+        with instrument.measure('decode', endpoint=endpoint,
+                                bytes=len(result.content)):
+            return result.json()
 
     # General REST functions
     def get(self, url):
         """
         api.get(self, url):
-            assumption is that all responses are JSON
+            assumption is that all responses are JSON. Served from the
+            response cache if one is in use and holds a fresh copy.
+            Callers asking for a URL that is already being fetched wait
+            for that request and get a copy of its result, or its error.
         """
 
+        if self._cache is not None:
+            data = self._cache.load(url)
+            if data is not None:
+                return data
+
+        with self._flights_lock:
+            flight = self._flights.get(url)
+            leader = flight is None
+            if leader:
+                flight = self._flights[url] = _flight()
+            else:
+                flight.waiters += 1
+
+        if not leader:
+            instrument.emit('coalesced', endpoint=url.split('?', 1)[0])
+            return flight.wait()
+
+        try:
+            flight.result = self._get(url)
+        except Exception as err:
+            flight.error = err
+            raise
+        finally:
+            with self._flights_lock:
+                if self._flights.get(url) is flight:
+                    del self._flights[url]
+            flight.done.set()
+
+        # The original stays untouched while the waiters copy it
+        if flight.waiters:
+            return copy.deepcopy(flight.result)
+        return flight.result
+
+    def _get(self, url):
+        # A write invalidating the cache while this GET is in flight makes
+        # its response too old to store
+        cache = self._cache
+        generation = cache.generation if cache is not None else None
+
         result = self._conn.get(url)
         result.raise_for_status()
 
-        return result.json()
+        data = self._json(result, url)
+
+        if cache is not None:
+            cache.store(
+                url, data, cache.ttl_for(url, self.cache_ttls), generation
+            )
+
+        return data
+
+    def get_stream(self, url, fields=None):
+        """
+        api.get_stream(self, url, fields):
+            generator decoding a JSON array response one record at a time,
+            each reduced to fields if given. The body is streamed, so memory
+            use does not grow with the size of the response. A fresh
+            response cached by get() is used instead if there is one.
+        """
+
+        if self._cache is not None:
+            data = self._cache.load(url)
+            if isinstance(data, list):
+                for record in data:
+                    yield project(record, fields)
+                return
+
+        result = self._conn.get(url, stream=True)
+
+        try:
+            result.raise_for_status()
+
+            for record in iter_json_array(result.iter_content(CHUNK_SIZE)):
+                yield project(record, fields)
+        finally:
+            result.close()
+
+    def page_url(self, url, index, page_size):
+        """
+        api.page_url(self, url, index, page_size):
+            url of page index (from 0) of a list endpoint, using the
+            page_query of the API class
+        """
+
+        query = self.page_query.format(
+            offset=index * page_size, limit=page_size
+        )
+        return url + ('&' if '?' in url else '?') + query
+
+    def get_pages(self, url, fields=None, page_size=500, prefetch=0):
+        """
+        api.get_pages(self, url, fields, page_size, prefetch):
+            generator over the records of a list endpoint, fetched page by
+            page, each reduced to fields if given. Without prefetch every
+            page is streamed as it arrives; with prefetch, that many pages
+            ahead are fetched concurrently. Iteration stops at the first
+            short page. A server ignoring the page query returns everything
+            on the first page, or the same first page again; its records
+            are yielded once.
+        """
+
+        if prefetch > 0:
+            yield from self._get_pages_ahead(url, fields, page_size, prefetch)
+            return
+
+        first = None
+        index = 0
+        while True:
+            # Raw records, projected records of different pages can match
+            records = self.get_stream(self.page_url(url, index, page_size))
+
+            count = 0
+            for record in records:
+                if count == 0:
+                    if index == 0:
+                        first = record
+                    elif record == first:
+                        records.close()
+                        return
+                count += 1
+                yield project(record, fields)
+
+            if count != page_size:
+                return
+            index += 1
+
+    def _get_pages_ahead(self, url, fields, page_size, prefetch):
+        pool = ThreadPoolExecutor(max_workers=prefetch + 1)
+        pending = deque()
+
+        def fetch(index):
+            return self.get(self.page_url(url, index, page_size))
+
+        try:
+            for index in range(prefetch + 1):
+                pending.append(pool.submit(fetch, index))
+            index = prefetch + 1
+
+            first = None
+            while pending:
+                page = pending.popleft().result()
+
+                if page and first is None:
+                    first = page[0]
+                elif page and page[0] == first:
+                    return
+
+                for record in page:
+                    yield project(record, fields)
+
+                if len(page) != page_size:
+                    return
+
+                pending.append(pool.submit(fetch, index))
+                index += 1
+        finally:
+            for future in pending:
+                future.cancel()
+            pool.shutdown(wait=False)
+
+    def get_revalidate(self, url, validators=None):
+        """
+        api.get_revalidate(self, url, validators):
+            conditional GET using the ETag/Last-Modified validators returned
+            by a previous call. Returns (data, validators), where data is
+            None if the server answered 304 Not Modified.
+        """
+
+        headers = {}
+        if validators:
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+
+        result = self._conn.get(url, headers=headers)
+        if result.status_code == 304:
+            return None, validators
+
+        result.raise_for_status()
+
+        validators = {
+            'etag': result.headers.get('ETag'),
+            'last_modified': result.headers.get('Last-Modified'),
+        }
+
+        return self._json(result, url), validators
 
     def post(self, url, **kwargs):
         """
@@ -22,10 +305,14 @@ class api:
             assumption is that all responses are JSON
         """
 
-        result = self._conn.post(url, **kwargs)
+        try:
+            result = self._conn.post(url, **kwargs)
+        finally:
+            # Even a failed write may have changed the resource
+            self._invalidate(url)
         result.raise_for_status()
 
-        return result.json()
+        return self._json(result, url)
 
     def put(self, url, **kwargs):
         """
@@ -33,7 +320,11 @@ class api:
             assumption is that all responses are JSON
         """
 
-        result = self._conn.put(url, **kwargs)
+        try:
+            result = self._conn.put(url, **kwargs)
+        finally:
+            # Even a failed write may have changed the resource
+            self._invalidate(url)
         result.raise_for_status()
 
-        return result.json()
+        return self._json(result, url)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Incremental decoding of JSON array responses, so large list endpoints
+can be consumed record by record without holding the whole body, or
+every field of every record, in memory.
+"""
+
+import json
+import codecs
+
+
+# Bytes read from the response per iteration
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = ' \t\n\r'
+_DELIMITERS = _WHITESPACE + ',]'
+
+
+def project(record, fields):
+    """
+    project(record, fields): reduce a record to the requested fields. A
+    fields value of None keeps the record as is.
+    """
+
+    if fields is None or not isinstance(record, dict):
+        return record
+
+    return {k: record[k] for k in fields if k in record}
+
+
+def iter_json_array(chunks):
+    """
+    iter_json_array(chunks): yield the elements of a JSON array read from
+    an iterable of bytes chunks, e.g. requests' iter_content(). Only the
+    element being decoded is buffered. A body that is not an array is
+    decoded in full and yielded as a single value.
+    """
+
+    chunks = iter(chunks)
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+
+    buf = ''
+    pos = 0
+    eof = False
+
+    def more():
+        nonlocal buf, pos, eof
+        if eof:
+            return False
+
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            eof = True
+            chunk = b''
+
+        buf = buf[pos:] + utf8.decode(chunk, final=eof)
+        pos = 0
+        return True
+
+    def skip_whitespace():
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buf) or not more():
+                return pos < len(buf)
+
+    # Find the opening bracket
+    if not skip_whitespace():
+        return
+
+    if buf[pos] != '[':
+        while more():
+            pass
+        yield json.loads(buf[pos:])
+        return
+
+    pos += 1
+    need_comma = False
+
+    while True:
+        if not skip_whitespace():
+            raise ValueError('Unterminated JSON array')
+
+        if buf[pos] == ']':
+            return
+
+        if need_comma:
+            if buf[pos] != ',':
+                raise ValueError(f'Expected , in JSON array: {buf[pos:pos + 20]}')  # noqa:E501
+            pos += 1
+            need_comma = False
+            continue
+
+        try:
+            value, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if not more():
+                raise
+            continue
+
+        # A scalar is only complete once a delimiter follows, e.g. 12|3
+        if not eof and not isinstance(value, (dict, list)) and (
+            end == len(buf) or buf[end] not in _DELIMITERS
+        ):
+            more()
+            continue
+
+        yield value
+
+        pos = end
+        need_comma = True
@@ -7,6 +7,13 @@ from .lan_fabric import api as core
 
 
 class api(core):
+    # Registering switches or changing roles changes the inventories
+    cache_links = {
+        '/control/fabrics': ('/inventory/switches',),
+        '/control/switches/roles': ('/inventory/switches',
+                                    '/control/fabrics'),
+    }
+
     def __init__(self, conn):
         core.__init__(self, conn)
 
@@ -45,7 +52,10 @@ class api(core):
         results = self.get(url)
 
         return {
-            device.pop('serialNumber'): device for device in results
+            device['serialNumber']: {
+                k: v for k, v in device.items() if k != 'serialNumber'
+            }
+            for device in results
         }
 
     def create_bootstrap_devices(self, fabric_name, json_data):
@@ -54,6 +64,48 @@ class api(core):
 
         return results
 
+    def test_reachability(self, fabric_name, json_data):
+        """
+        test_reachability(fabric_name, json_data): check the switches at
+        the comma separated seedIP addresses of json_data for reachability
+        with the given credentials. Returns a list with a record per
+        switch found:
+                "ipaddr": "10.60.66.11",
+                "sysName": "leaf-1",
+                "serialNumber": "SAL1927JKHQ",
+                "reachable": true, "auth": true, "known": false,
+                "selectable": true, "statusReason": "manageable"
+          - Status code 404 returned if fabric does not exist.
+        """
+        url = f'/control/fabrics/{fabric_name}/inventory/test-reachability'
+        results = self.post(url, data=json_data)
+
+        return results
+
+    def discover_switches(self, fabric_name, json_data):
+        """
+        discover_switches(fabric_name, json_data): add the switches listed
+        in json_data, as returned by test_reachability, to the fabric.
+        """
+        url = f'/control/fabrics/{fabric_name}/inventory/discover'
+        results = self.post(url, data=json_data)
+
+        return results
+
+    def get_fabric_inventory(self, fabric_name, fields=None):
+        """
+        get_fabric_inventory(fabric_name, fields): list of the switches in
+        the fabric. If fields is given, return a generator streaming the
+        switch records reduced to those fields instead.
+          - Status code 404 returned if fabric does not exist.
+        """
+        url = f'/control/fabrics/{fabric_name}/inventory'
+
+        if fields is not None:
+            return self.get_stream(url, fields)
+
+        return self.get(url)
+
     # Control - Switches
     def set_switch_roles(self, json_data):
         url = '/control/switches/roles'
@@ -62,12 +114,31 @@ class api(core):
         return results
 
     # DCNM - Inventory
-    def get_switch_inventory(self):
+    def get_switch_inventory(self, fields=None):
+        """
+        get_switch_inventory(fields): list of all switches known to DCNM.
+        If fields is given, return a generator streaming the switch records
+        reduced to those fields instead.
+        """
         url = '/inventory/switches'
+
+        if fields is not None:
+            return self.get_stream(url, fields)
+
         results = self.get(url)
 
         return results
 
+    def iter_switch_inventory(self, fields=None, page_size=500, prefetch=0):
+        """
+        iter_switch_inventory(fields, page_size, prefetch): generator over
+        the switches known to DCNM, fetched page_size at a time with
+        prefetch pages fetched ahead concurrently. See get_pages().
+        """
+        url = '/inventory/switches'
+
+        return self.get_pages(url, fields, page_size, prefetch)
+
 
 def authenticate(conn, url, user, password, lifetime=30):
     """
@@ -75,7 +146,8 @@ def authenticate(conn, url, user, password, lifetime=30):
     handle those functions here.
 
     Request: conn, user, password, and lifetime (in seconds)
-    Response: dictionary with attributes to be added to requests.session header
+    Response: token lifetime in seconds, the Dcnm-Token is added to the
+    requests.session headers
     """
 
     body = {
@@ -95,4 +167,4 @@ def authenticate(conn, url, user, password, lifetime=30):
         {'Dcnm-Token': result['Dcnm-Token']}
     )
 
-    return True
+    return lifetime
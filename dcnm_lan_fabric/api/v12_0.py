@@ -1,33 +1,146 @@
 #!/usr/bin/env python3
 
 
+import json
+import time
+import base64
+
 import requests
 
 from .lan_fabric import api as core
 
 
 class api(core):
+    # Templates change far less often than the inventory
+    cache_ttls = {
+        '/configtemplate/rest/config/templates': 300,
+    }
+
+    # Discovering switches changes the inventories
+    cache_links = {
+        '/lan-fabric/rest/control/fabrics': (
+            '/lan-fabric/rest/inventory/allswitches',
+            '/lan-fabric/rest/control/fabrics'
+        ),
+    }
+
     def __init__(self, conn):
         core.__init__(self, conn)
 
+    # LAN Fabric - Inventory
+    def get_switch_inventory(self, fields: list = None):
+        """
+        get_switch_inventory(fields): list of all switches known to NDFC.
+        If fields is given, return a generator streaming the switch records
+        reduced to those fields instead.
+        """
+        url = '/lan-fabric/rest/inventory/allswitches'
+
+        if fields is not None:
+            return self.get_stream(url, fields)
+
+        return self.get(url)
+
+    def iter_switch_inventory(self, fields: list = None,
+                              page_size: int = 500, prefetch: int = 0):
+        """
+        iter_switch_inventory(fields, page_size, prefetch): generator over
+        the switches known to NDFC, fetched page_size at a time with
+        prefetch pages fetched ahead concurrently. See get_pages().
+        """
+        url = '/lan-fabric/rest/inventory/allswitches'
+
+        return self.get_pages(url, fields, page_size, prefetch)
+
+    def get_fabric_inventory(self, fabric_name: str, fields: list = None):
+        """
+        get_fabric_inventory(fabric_name, fields): list of the switches in
+        the fabric. If fields is given, return a generator streaming the
+        switch records reduced to those fields instead.
+        """
+        url = f'/lan-fabric/rest/control/fabrics/{fabric_name}/inventory/switchesByFabric'  # noqa:E501
+
+        if fields is not None:
+            return self.get_stream(url, fields)
+
+        return self.get(url)
+
+    def test_reachability(self, fabric_name: str, json_data: str):
+        """
+        test_reachability(fabric_name, json_data): check the switches at
+        the comma separated seedIP addresses of json_data for reachability
+        with the given credentials. Returns a list with a record per
+        switch found, see v11_5.api.test_reachability().
+        """
+        url = f'/lan-fabric/rest/control/fabrics/{fabric_name}/inventory/test-reachability'  # noqa:E501
+
+        return self.post(url, data=json_data)
+
+    def discover_switches(self, fabric_name: str, json_data: str):
+        """
+        discover_switches(fabric_name, json_data): add the switches listed
+        in json_data, as returned by test_reachability, to the fabric.
+        """
+        url = f'/lan-fabric/rest/control/fabrics/{fabric_name}/inventory/discover'  # noqa:E501
+
+        return self.post(url, data=json_data)
+
     # ConfigTemplate - Templates
-    def get_templates(self, filterStr: str = None):
+    def templates_url(self, filterStr: str = None):
         if filterStr:
             query = f"?filterStr={filterStr}"
         else:
             query = ""
 
-        url = f"/configtemplate/rest/config/templates{query}"
-        return self.get(url)
+        return f"/configtemplate/rest/config/templates{query}"
 
-    def get_template_by_name(self, name: str, populate: bool = True):
+    def template_url(self, name: str, populate: bool = True):
         if populate:
             query = "?populate=true"
         else:
             query = "?populate=false"
 
-        url = f"/configtemplate/rest/config/templates/{name}{query}"
-        return self.get(url)
+        return f"/configtemplate/rest/config/templates/{name}{query}"
+
+    def get_templates(self, filterStr: str = None, fields: list = None):
+        """
+        get_templates(filterStr, fields): list of templates. If fields is
+        given, return a generator streaming the templates reduced to those
+        fields instead.
+        """
+        if fields is not None:
+            return self.get_stream(self.templates_url(filterStr), fields)
+
+        return self.get(self.templates_url(filterStr))
+
+    def iter_templates(self, filterStr: str = None, fields: list = None,
+                       page_size: int = 500, prefetch: int = 0):
+        """
+        iter_templates(filterStr, fields, page_size, prefetch): generator
+        over the templates, fetched page_size at a time with prefetch pages
+        fetched ahead concurrently. See get_pages().
+        """
+        return self.get_pages(
+            self.templates_url(filterStr), fields, page_size, prefetch
+        )
+
+    def get_template_by_name(self, name: str, populate: bool = True):
+        return self.get(self.template_url(name, populate))
+
+
+def token_lifetime(token, default=600):
+    """
+    Seconds until the JWT token expires based on its 'exp' claim. The token
+    is not verified, only decoded. Returns default if no claim is found.
+    """
+
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+        return max(0, float(claims['exp']) - time.time())
+    except (IndexError, KeyError, TypeError, ValueError):
+        return default
 
 
 def authenticate(conn: requests.Session, url, user, password, domain="local"):
@@ -36,7 +149,8 @@ def authenticate(conn: requests.Session, url, user, password, domain="local"):
     handle those functions here.
 
     Request: conn, user, password, and domain ('local' for now)
-    Response: dictionary with attributes to be added to requests.session header
+    Response: token lifetime in seconds, the token cookie is stored in the
+    requests.session cookie jar
     """
 
     body = {
@@ -55,6 +169,6 @@ def authenticate(conn: requests.Session, url, user, password, domain="local"):
 
     # Unlike DCNM 11.5 that required a header to be set, NDFC relies on a
     # cookie that will already be stored within the session. So, simply
-    # return to the calling routine
+    # return the token lifetime to the calling routine
 
-    return True
+    return token_lifetime(result['jwttoken'])
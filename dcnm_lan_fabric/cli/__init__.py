@@ -1,3 +1,20 @@
 #!/usr/bin/env python3
 
-from .switch import switch  # noqa: F401
+import importlib
+
+# Command groups are imported on first access (PEP 562), so the CLI entry
+# points and helpers do not load requests and the server modules up front
+_lazy = {
+    'switch': '.switch',
+}
+
+
+def __getattr__(name):
+    if name not in _lazy:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(_lazy[name], __name__), name)
+
+    # Importing the submodule bound its name here, keep the command instead
+    globals()[name] = value
+    return value
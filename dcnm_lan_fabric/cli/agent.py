@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+This command manages the background agent keeping warm, logged on
+DCNM/NDFC sessions for dcnmctl. While the agent runs, dcnmctl commands
+send their requests through it instead of connecting on every
+invocation.
+
+"""
+
+import os
+import sys
+import time
+import subprocess
+
+import click
+
+import dcnm_lan_fabric
+from dcnm_lan_fabric.server.agent import agent, agent_running
+from dcnm_lan_fabric.server.agent import agent_status, agent_stop
+from dcnm_lan_fabric.server.agent import default_socket_path
+
+
+def socket_path(ctx):
+    return ctx.obj.get('agent_socket') or default_socket_path()
+
+
+# Commands for the agent module
+@click.group(name='agent')
+@click.pass_context
+def agent_group(ctx):
+    pass
+
+
+@click.command()
+@click.option('--idle', 'idle', type=float, default=3600,
+              help='seconds without requests before the agent exits, 0 to '
+                   'run until stopped'
+              )
+@click.option('--foreground', 'foreground', is_flag=True, default=False,
+              help='run in this process instead of in the background'
+              )
+@click.pass_context
+def start(ctx, idle, foreground):
+    """
+    Start the agent on the agent socket
+    """
+
+    path = socket_path(ctx)
+
+    if agent_running(path):
+        print(f'Agent already running on {path}')
+        sys.exit(1)
+
+    if foreground:
+        agent(path, idle or None).serve()
+        return
+
+    # Make sure the agent imports this copy of the package
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [os.path.dirname(os.path.dirname(dcnm_lan_fabric.__file__))]
+        + [x for x in env.get('PYTHONPATH', '').split(os.pathsep) if x]
+    )
+
+    subprocess.Popen(
+        [sys.executable, '-m', 'dcnm_lan_fabric.server.agent',
+         '--socket', path, '--idle', str(idle)],
+        env=env, start_new_session=True, stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+    for _ in range(50):
+        if agent_running(path):
+            print(f'Agent started on {path}')
+            return
+        time.sleep(0.1)
+
+    print(f'Agent did not start on {path}')
+    sys.exit(1)
+
+
+@click.command()
+@click.pass_context
+def stop(ctx):
+    """
+    Stop the agent, its sessions are closed
+    """
+
+    path = socket_path(ctx)
+
+    if not agent_running(path):
+        print(f'No agent running on {path}')
+        sys.exit(1)
+
+    agent_stop(path)
+    print('Agent stopped')
+
+
+@click.command()
+@click.pass_context
+def status(ctx):
+    """
+    Show the agent process and the sessions it holds
+    """
+
+    path = socket_path(ctx)
+
+    if not agent_running(path):
+        print(f'No agent running on {path}')
+        sys.exit(1)
+
+    result = agent_status(path)
+
+    print(f"Agent pid {result['pid']} on {path}, up {result['uptime']:.0f}s, idle {result['idle']:.0f}s")  # noqa:E501
+    for x in result['sessions']:
+        print(f'  {x}')
+
+
+# Build the click group heirarchy
+agent_group.add_command(start)
+agent_group.add_command(stop)
+agent_group.add_command(status)
+
+if __name__ == '__main__':
+    agent_group()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Copyright (c) 2022 Cisco and/or its affiliates.
+
+This software is licensed to you under the terms of the Cisco Sample
+Code License, Version 1.1 (the "License"). You may obtain a copy of the
+License at
+
+               https://developer.cisco.com/docs/licenses
+
+All use of the material herein must be in accordance with the terms of
+the License. All rights not expressly granted by the License are
+reserved. Unless required by applicable law or agreed to separately in
+writing, software distributed under the License is distributed on an "AS
+IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+or implied.
+"""
+
+__author__ = "Dr Timothy E Miller <timmil@cisco.com>"
+__contributors__ = [
+]
+__copyright__ = "Copyright (c) 2022 Cisco and/or its affiliates."
+__license__ = "Cisco Sample Code License, Version 1.1"
+
+
+# Helpers shared by the CLI commands. The server modules pull in requests
+# and urllib3, so they are imported when a connection is made rather than
+# when the CLI starts.
+
+
+def transport(ctx):
+    """
+    transport_config from the context, built from the global options on
+    first use
+    """
+
+    if ctx.obj.get('transport') is None and ctx.obj.get('transport_opts'):
+        from dcnm_lan_fabric.server import transport_config
+        ctx.obj['transport'] = transport_config(**ctx.obj['transport_opts'])
+
+    return ctx.obj.get('transport')
+
+
+def connect(ctx):
+    """
+    Session of the context, ndfcctl provides one, dcnmctl's is created from
+    the context variables on first use. If the agent is enabled and running,
+    the session sends its requests through the agent.
+    """
+
+    if ctx.obj.get('session') is None and ctx.obj.get('agent'):
+        from dcnm_lan_fabric.server.agent import agent_session, agent_running
+
+        if agent_running(ctx.obj.get('agent_socket')):
+            ctx.obj['session'] = agent_session(
+                                               ctx.obj.get('agent_socket'),
+                                               ctx.obj['dcnm_host'],
+                                               ctx.obj['dcnm_user'],
+                                               ctx.obj['dcnm_pass'],
+                                               secure=ctx.obj['dcnm_verify'],
+                                               version=ctx.obj.get(
+                                                   'dcnm_version'
+                                               ),
+                                               token_cache=ctx.obj.get(
+                                                   'token_cache'
+                                               ),
+                                               capability_cache=ctx.obj.get(
+                                                   'capability_cache'
+                                               ),
+                                               transport=ctx.obj.get(
+                                                   'transport_opts'
+                                               )
+                                              )
+
+    if ctx.obj.get('session') is None:
+        from dcnm_lan_fabric.server import session
+
+        ctx.obj['session'] = session(
+                                     ctx.obj['dcnm_host'],
+                                     ctx.obj['dcnm_user'],
+                                     ctx.obj['dcnm_pass'],
+                                     secure=ctx.obj['dcnm_verify'],
+                                     version=ctx.obj.get('dcnm_version'),
+                                     token_cache=ctx.obj.get('token_cache'),
+                                     capability_cache=ctx.obj.get(
+                                         'capability_cache'
+                                     ),
+                                     transport=transport(ctx)
+                                    )
+
+    return ctx.obj['session']
+
+
+def inventory(ctx):
+    """
+    inventory_store of the context, created from its session on first use,
+    so the commands of a run share one copy of the switch inventory
+    """
+
+    if ctx.obj.get('inventory') is None:
+        from dcnm_lan_fabric.sdk.inventory.inventory import inventory_store
+        ctx.obj['inventory'] = inventory_store(connect(ctx).api())
+
+    return ctx.obj['inventory']
+
+
+def connect_fleet(ctx):
+    """
+    Fleet of controller sessions of the context, loaded from the fleet file
+    if only its name is known, or None if no fleet file was given
+    """
+
+    controllers = ctx.obj.get('fleet')
+    if not controllers:
+        return None
+
+    if isinstance(controllers, str):
+        from dcnm_lan_fabric.server import fleet
+
+        controllers = fleet.load(
+                                 controllers,
+                                 secure=ctx.obj['dcnm_verify'],
+                                 token_cache=ctx.obj.get('token_cache'),
+                                 capability_cache=ctx.obj.get(
+                                     'capability_cache'
+                                 ),
+                                 transport=transport(ctx)
+                                )
+        ctx.obj['fleet'] = controllers
+
+    return controllers
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Copyright (c) 2022 Cisco and/or its affiliates.
+
+This software is licensed to you under the terms of the Cisco Sample
+Code License, Version 1.1 (the "License"). You may obtain a copy of the
+License at
+
+               https://developer.cisco.com/docs/licenses
+
+All use of the material herein must be in accordance with the terms of
+the License. All rights not expressly granted by the License are
+reserved. Unless required by applicable law or agreed to separately in
+writing, software distributed under the License is distributed on an "AS
+IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+or implied.
+"""
+
+__author__ = "Dr Timothy E Miller <timmil@cisco.com>"
+__contributors__ = [
+]
+__copyright__ = "Copyright (c) 2022 Cisco and/or its affiliates."
+__license__ = "Cisco Sample Code License, Version 1.1"
+
+
+import importlib
+
+import click
+
+
+class lazy_group(click.Group):
+    def __init__(self, *args, lazy_subcommands=None, **kwargs):
+        """
+        click.Group importing subcommands when they are invoked.
+        lazy_subcommands maps a command name to (import path, short help),
+        e.g. {'switch': ('dcnm_lan_fabric.cli.switch:switch', 'Manage
+        switches')}. The import path may also name a typer.Typer app. The
+        short help is used to list the commands so --help imports nothing.
+        """
+
+        click.Group.__init__(self, *args, **kwargs)
+        self.lazy_subcommands = dict(lazy_subcommands or {})
+
+    def list_commands(self, ctx):
+        return sorted(
+            click.Group.list_commands(self, ctx) + list(self.lazy_subcommands)
+        )
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.lazy_subcommands:
+            return self._load(cmd_name)
+        return click.Group.get_command(self, ctx, cmd_name)
+
+    def _load(self, cmd_name):
+        import_path, short_help = self.lazy_subcommands[cmd_name]
+        module_name, attr = import_path.split(':', 1)
+
+        cmd = getattr(importlib.import_module(module_name), attr)
+
+        # Typer apps are turned into their click command
+        if not isinstance(cmd, click.BaseCommand):
+            import typer.main
+            cmd = typer.main.get_command(cmd)
+
+        if cmd.short_help is None:
+            cmd.short_help = short_help
+
+        # Replace the lazy entry, later lookups are plain click
+        del self.lazy_subcommands[cmd_name]
+        self.add_command(cmd, cmd_name)
+
+        return cmd
+
+    def format_commands(self, ctx, formatter):
+        """
+        List eager commands with their own help, lazy ones with the short
+        help they were registered with
+        """
+
+        rows = []
+        for name in self.list_commands(ctx):
+            if name in self.lazy_subcommands:
+                rows.append((name, self.lazy_subcommands[name][1]))
+                continue
+
+            cmd = click.Group.get_command(self, ctx, name)
+            if cmd is None or cmd.hidden:
+                continue
+            rows.append((name, cmd.get_short_help_str(formatter.width)))
+
+        if rows:
+            with formatter.section('Commands'):
+                formatter.write_dl(rows)
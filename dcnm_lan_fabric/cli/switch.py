@@ -9,14 +9,21 @@ DCNM, environment variables.
 """
 
 import sys
+from itertools import islice
+
 import click
 
-from dcnm_lan_fabric.server import session
+from dcnm_lan_fabric.cli.common import connect, connect_fleet, inventory
 from dcnm_lan_fabric.actions.core import switch_info
 from dcnm_lan_fabric.actions.core import NoPoapSwitches
 from dcnm_lan_fabric.actions.core import poap_register_switch
+from dcnm_lan_fabric.actions.core import poap_watch
+from dcnm_lan_fabric.actions.core import discover_switches
 from dcnm_lan_fabric.actions.core import assign_switch_role
+from dcnm_lan_fabric.actions.core import inventory_switches
+from dcnm_lan_fabric.actions.core import switch_data
 from dcnm_lan_fabric.actions.core import get_switch_list
+from dcnm_lan_fabric.actions.core import iter_switch_list
 
 
 # Commands for the switch module
@@ -36,39 +43,79 @@ def add(ctx):
         Note: this will look for a switch with the specified serial number in POAP phase and set the
         switch hostname, mgmt0 IP address, username, and password to the provided values. 
 
-    dcnmctl [global opts] switch add discover FABRIC SW_MGMT0_IP --sw_user SW_USER --sw_pass SW_PASS
+    dcnmctl [global opts] switch add discover FABRIC SW_MGMT0_IP... --sw_user SW_USER --sw_pass SW_PASS
         Note: unlike the GUI, it's not practical to walk the network via CLI.  So this CLI is essentially a
-        direct add of a single switch given that switch's mgmt0 IP address.
+        direct add of switches given their mgmt0 IP addresses or CIDR ranges of them.
     """  # noqa
     pass
 
 
 @click.command()
-@click.argument('fabric_name', required=False)
+@click.argument('fabric_name', nargs=-1)
+@click.option('--limit', 'limit', type=int, default=0,
+              help='stop after this many switches, printed as they arrive'
+              )
+@click.option('--prefetch', 'prefetch', type=int, default=2,
+              help='inventory pages fetched ahead when --limit is used'
+              )
 @click.pass_context
-def show(ctx, fabric_name=None):
+def show(ctx, fabric_name=(), limit=0, prefetch=2):
     """
-    List switches in DCNM, optionally limited to the specified fabric
+    List switches in DCNM, optionally limited to the specified fabrics
 
-    Usage: switch show [FABRIC]
+    Usage: switch show [FABRIC]... [--limit N]
+
+    With a fleet file, every controller in the fleet is queried in parallel.
+    With --limit, the inventory is read page by page and printing starts
+    with the first page.
     """
 
+    controllers = connect_fleet(ctx)
+    if controllers is not None:
+        results, errors = controllers.run(
+            get_switch_list, list(fabric_name) or None
+        )
+
+        for name, err in errors.items():
+            print(f"{name}: {err}", file=sys.stderr)
+
+        print("Controller\t\tFabric\t\t\tSwitch Name\t\t\tManagement IP")
+        for name, switches in results.items():
+            for sw in switches[:limit or None]:
+                print(f"{name:20}\t{sw['fabric']:20}\t{sw['name']:20}\t{sw['ip']:16}")  # noqa:E501
+
+        if errors:
+            sys.exit(1)
+        return
+
     # Create connection session from the context variables
-    conn = session(
-                   ctx.obj['dcnm_host'],
-                   ctx.obj['dcnm_user'],
-                   ctx.obj['dcnm_pass'],
-                   secure=ctx.obj['dcnm_verify']
-                  )
+    conn = connect(ctx)
+
+    if limit > 0:
+        switches = iter_switch_list(
+            conn, list(fabric_name) or None, page_size=min(limit, 500),
+            prefetch=prefetch
+        )
 
-    switches = get_switch_list(conn, fabric_name)
+        for count, sw in enumerate(islice(switches, limit)):
+            if count == 0:
+                print("Fabric\t\t\tSwitch Name\t\t\tManagement IP")
+            print(f"{sw['fabric']:20}\t{sw['name']:20}\t{sw['ip']:16}",
+                  flush=True)
+
+        switches.close()
+        return
+
+    switches = get_switch_list(
+        conn, list(fabric_name) or None, store=inventory(ctx)
+    )
 
     if len(switches) == 0:
         return
 
     print("Fabric\t\t\tSwitch Name\t\t\tManagement IP")
     for sw in switches:
-        print(f"{sw['fabric']:20}\t{sw['name']:20}\t{sw['ip']:16}")
+        print(f"{sw['fabric']:20}\t{sw['name'] or '':20}\t{sw['ip'] or '':16}")  # noqa:E501
 
 
 # Add switches from POAP
@@ -90,19 +137,16 @@ def poap(ctx, fabric_name, sw_serial, sw_name, sw_ip, sw_user, sw_pass):
     """
 
     # Create connection session from the context variables
-    conn = session(
-                   ctx.obj['dcnm_host'],
-                   ctx.obj['dcnm_user'],
-                   ctx.obj['dcnm_pass'],
-                   secure=ctx.obj['dcnm_verify']
-                  )
+    conn = connect(ctx)
 
     # Create switch data object
     switch_data = switch_info(sw_serial, sw_name, sw_ip, sw_user, sw_pass, "")
 
     # Register the switches that are at POAP stage
     try:
-        results = poap_register_switch(conn, fabric_name, switch_data)
+        results = poap_register_switch(
+            conn, fabric_name, [switch_data], store=inventory(ctx)
+        )
     except NoPoapSwitches:
         print("No switches found")
         sys.exit(1)
@@ -111,9 +155,86 @@ def poap(ctx, fabric_name, sw_serial, sw_name, sw_ip, sw_user, sw_pass):
         print("{0}: {1}".format(x, results[x]))
 
 
+# Register switches from a switch file as they enter POAP
 @click.command()
 @click.argument('fabric_name')
-@click.argument('sw_ip')
+@click.argument('sw_file')
+@click.option('--interval', 'interval', type=float, default=5,
+              help='seconds between polls while switches come and go'
+              )
+@click.option('--max_interval', 'max_interval', type=float, default=60,
+              help='longest delay between polls while nothing changes'
+              )
+@click.option('--timeout', 'timeout', type=float, default=0,
+              help='seconds after which to give up, 0 to wait for all'
+              )
+@click.option('--batch_size', 'batch_size', type=int, default=25,
+              help='switches registered per request'
+              )
+@click.option('--workers', 'workers', type=int, default=4,
+              help='requests posted concurrently'
+              )
+@click.option('--retries', 'retries', type=int, default=1,
+              help='additional attempts for batches that failed'
+              )
+@click.pass_context
+def watch(ctx, fabric_name, sw_file, interval, max_interval, timeout,
+          batch_size, workers, retries):
+    """
+    Watch the POAP list of the fabric and register the switches of the
+    switch file as they appear, until all are registered
+
+    Usage: switch add watch FABRIC SW_FILE
+    """
+
+    switches = switch_data(sw_file, fabric_name)
+    if len(switches) == 0:
+        print(f"No switches for fabric {fabric_name} in {sw_file}")
+        sys.exit(1)
+
+    # Create connection session from the context variables
+    conn = connect(ctx)
+
+    names = {sw.serialNumber: sw.name for sw in switches}
+    print(f"Waiting for {len(switches)} switches in fabric {fabric_name}")
+
+    pending = list(names)
+    try:
+        for event in poap_watch(
+            conn, fabric_name, switches, interval=interval,
+            max_interval=max_interval, timeout=timeout or None,
+            batch_size=batch_size, workers=workers, retries=retries,
+            store=inventory(ctx)
+        ):
+            if event['error'] is not None:
+                print(f"Poll failed: {event['error']}", file=sys.stderr)
+
+            for serial in event['appeared']:
+                if serial in names:
+                    print(f"{names[serial]} ({serial}): in POAP")
+
+            for name, status in event['registered'].items():
+                print(f"{name}: {status}")
+
+            pending = event['pending']
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+
+    if pending:
+        print("Not registered: " + ", ".join(names[x] for x in pending))
+        sys.exit(1)
+
+    print("All switches registered")
+
+
+# Discover switches by management IP
+@click.command()
+@click.argument('fabric_name')
+@click.argument('sw_ip', nargs=-1)
+@click.option('--ip_file', 'ip_file', default=None,
+              help='file with one IP, CIDR or first-last range per line'
+              )
 @click.option('--sw_user', 'sw_user', envvar='SW_USER',
               help='switch credentials username'
               )
@@ -124,72 +245,168 @@ def poap(ctx, fabric_name, sw_serial, sw_name, sw_ip, sw_user, sw_pass):
               is_flag=True, default=False,
               help='If used, switches will have configs erased.'
               )
+@click.option('--yes', 'yes', is_flag=True, default=False,
+              help='do not ask to confirm --cfg_erase'
+              )
+@click.option('--probe_size', 'probe_size', type=int, default=16,
+              help='IPs checked per reachability request'
+              )
+@click.option('--batch_size', 'batch_size', type=int, default=25,
+              help='switches submitted per discover request'
+              )
+@click.option('--workers', 'workers', type=int, default=4,
+              help='requests posted concurrently'
+              )
+@click.option('--retries', 'retries', type=int, default=1,
+              help='additional attempts for requests that failed'
+              )
 @click.pass_context
-def discover(ctx, fabric_name, sw_ip, sw_user, sw_pass, cfg_erase):
+def discover(ctx, fabric_name, sw_ip, ip_file, sw_user, sw_pass, cfg_erase,
+             yes, probe_size, batch_size, workers, retries):
     """
     Add switches to the fabric that have already undergone the basic setup.
-    Requires a switch hostname, mgmt0 IP address, and admin credentials.
+    Requires mgmt0 IP addresses, or ranges of them, and admin credentials.
+
+    Usage: switch add discover FABRIC SW_IP...
+
+    SW_IP is an IP address, a CIDR range (10.1.1.0/28) or a first-last
+    range (10.1.1.10-10.1.1.20). Reachability and credentials are checked
+    concurrently and the reachable switches are added in batches.
     """
 
-    # Create connection session from the context variables
-    conn = session(
-                   ctx.obj['dcnm_host'],
-                   ctx.obj['dcnm_user'],
-                   ctx.obj['dcnm_pass'],
-                   secure=ctx.obj['dcnm_verify']
-                  )
+    targets = list(sw_ip)
+    if ip_file:
+        with open(ip_file) as f:
+            targets += [
+                x.split('#', 1)[0].strip() for x in f
+                if x.split('#', 1)[0].strip()
+            ]
+
+    if not targets:
+        print('Specify switch IPs or --ip_file')
+        sys.exit(1)
 
     # If flag enabled, confirm configuration replacement
-    if cfg_erase:
-        print(f'You will erase configs on {sw_ip} in fabric {fabric_name}')
-        print('Confirm [y/N]')
-        # Do input check here
+    if cfg_erase and not yes:
+        click.confirm(
+            f'You will erase configs on {", ".join(targets)} in fabric '
+            f'{fabric_name}. Continue?', abort=True
+        )
 
-    # This functionality not implemented yet
-    pass
+    # Create connection session from the context variables
+    conn = connect(ctx)
+
+    try:
+        results = discover_switches(
+            conn, fabric_name, targets, sw_user, sw_pass,
+            preserve_config=not cfg_erase, probe_size=probe_size,
+            batch_size=batch_size, workers=workers, retries=retries,
+            store=inventory(ctx)
+        )
+    except Exception as err:
+        print(err)
+        sys.exit(1)
+
+    def name(ip):
+        record = results['switches'].get(ip, {})
+        return f"{ip} ({record['sysName']})" if record.get('sysName') else ip
+
+    for ip in results['discovered']:
+        print(f"{name(ip)}: discovered")
+    for ip in results['known']:
+        print(f"{name(ip)}: already in the controller")
+    for ip, reason in results['failed'].items():
+        print(f"{name(ip)}: {reason}")
+
+    if results['failed']:
+        sys.exit(1)
 
 
 # Set switch role
 @click.command()
 @click.argument('fabric_name')
-@click.argument('sw_name')
+@click.argument('sw_name', nargs=-1)
 @click.argument('sw_role')
-@click.option('--sw_user', 'sw_user', envvar='SW_USER',
-              help='switch credentials username'
+@click.option('--sw_file', 'sw_file', envvar='SW_FILE', default=None,
+              help='switch file to take the switches of FABRIC from'
               )
-@click.option('--sw_pass', 'sw_pass', envvar='SW_PASS',
-              help='switch credentials password'
+@click.option('--from_role', 'from_role', default=None,
+              help='only switches currently holding this role'
+              )
+@click.option('--batch_size', 'batch_size', type=int, default=100,
+              help='switches assigned per request'
+              )
+@click.option('--workers', 'workers', type=int, default=4,
+              help='requests posted concurrently'
+              )
+@click.option('--retries', 'retries', type=int, default=1,
+              help='additional attempts for switches that failed'
               )
 @click.pass_context
-def role(ctx, fabric_name, sw_name, sw_role, sw_user, sw_pass):
+def role(ctx, fabric_name, sw_name, sw_role, sw_file, from_role, batch_size,
+         workers, retries):
     """
     Assign the desired role to the specified switches.
 
-    Usage: switch role FABRIC SWITCH_NAME SWITCH_ROLE
+    Usage: switch role FABRIC [SWITCH_NAME]... SWITCH_ROLE
+
+    Switches are looked up by name in the inventory, or in the switch file
+    given with --sw_file. --from_role selects the switches of FABRIC
+    currently holding that role. With --sw_file, a SWITCH_ROLE of "-"
+    assigns each switch the role from the file.
     """
 
+    if not sw_name and not from_role and not sw_file:
+        print('Specify switch names, --from_role or --sw_file')
+        sys.exit(1)
+
     # Create connection session from the context variables
-    conn = session(
-                   ctx.obj['dcnm_host'],
-                   ctx.obj['dcnm_user'],
-                   ctx.obj['dcnm_pass'],
-                   secure=ctx.obj['dcnm_verify']
-                  )
+    conn = connect(ctx)
+
+    names = list(sw_name) or None
+
+    if sw_file:
+        switches = [
+            sw for sw in switch_data(sw_file, fabric_name)
+            if (names is None or sw.name in names)
+            and (not from_role or sw.role == from_role)
+        ]
+    else:
+        switches = inventory_switches(
+            conn, fabric_name, names, from_role, store=inventory(ctx)
+        )
+
+    if names is not None:
+        found = {sw.name for sw in switches}
+        for name in names:
+            if name not in found:
+                print(f'{name}: not found in fabric {fabric_name}')
+
+    if len(switches) == 0:
+        print("No switches found")
+        sys.exit(1)
 
     # Set the role of the switches
-    results = assign_switch_role(conn, fabric_name, sw_role, sw_name)
+    results = assign_switch_role(
+        conn, fabric_name, None if sw_role == '-' else sw_role, switches,
+        batch_size=batch_size, workers=workers, retries=retries,
+        store=inventory(ctx)
+    )
 
-    # output = {
-    #     sw.name: switch_role if switch_role else sw.role
-    #     for sw in switches if sw.serialNumber in results
-    # }
+    for sw in switches:
+        serial = sw.serialNumber
+        if serial in results['failed']:
+            print(f"{sw.name}: {results['failed'][serial]}")
+        else:
+            print(f"{sw.name}: {results['roles'][serial]} assignment success")
 
-    # for name, role in output.items():
-    #     print(f'{name}: {role} assignment success')
+    if results['failed']:
+        sys.exit(1)
 
 
 # Build the click group heirarchy
 add.add_command(poap)
+add.add_command(watch)
 add.add_command(discover)
 
 switch.add_command(show)
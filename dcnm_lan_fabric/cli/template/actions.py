@@ -23,19 +23,21 @@ __copyright__ = "Copyright (c) 2022 Cisco and/or its affiliates."
 __license__ = "Cisco Sample Code License, Version 1.1"
 
 
+import json
 from typing import List
+from itertools import islice
 
 import typer
 
-from dcnm_lan_fabric.server import session
+from dcnm_lan_fabric.cli.common import connect, connect_fleet
 from dcnm_lan_fabric.sdk.template import template
 
-resource = typer.Typer()
+resource = typer.Typer(no_args_is_help=True)
 
 
 @resource.command()
 def show(ctx: typer.Context):
-    print(ctx.obj['session'])
+    print(connect(ctx))
     return
 
 
@@ -43,7 +45,13 @@ def show(ctx: typer.Context):
 def list(
     ctx: typer.Context,
     filter: str = typer.Option(None, help="Template Name Search Filter"),
-    detail: bool = typer.Option(False, help="Detailed Template View")
+    detail: bool = typer.Option(False, help="Detailed Template View"),
+    limit: int = typer.Option(
+        0, help="Stop after this many templates, printed as they arrive"
+    ),
+    prefetch: int = typer.Option(
+        2, help="Template pages fetched ahead when --limit is used"
+    )
 ):
     """
     List some or all of the templates in NDFC. Without args, list of all
@@ -52,21 +60,59 @@ def list(
 
     If detail option set, provide template details. (Option is local to CLI and
     not specific to the API)
-    """
 
-    # Grab session from context and login
-    connection: session = ctx.obj['session']
-    connection.logon()
+    With limit set, templates are listed in server order, page by page, and
+    printing starts with the first page.
 
-    # Get the corresponding API for the server
-    api = connection.api()
+    With a fleet file, every controller in the fleet is queried in parallel.
+    """
 
     # For "filter by name", we need to add attr to the filter string
     if filter:
         filter = f"name={filter}"
 
+    controllers = connect_fleet(ctx)
+    if controllers is not None:
+        results, errors = controllers.run(
+            lambda conn: template.get_all_templates(
+                conn.api(), filter, ctx.obj.get('template_cache'),
+                keep_raw=False
+            )
+        )
+
+        for name, err in errors.items():
+            typer.echo(f"{name}: {err}", err=True)
+
+        for name, list_of_templates in results.items():
+            for tmpl in list_of_templates[:limit or None]:
+                output = tmpl.summary() if detail else tmpl.name
+                typer.echo(f"{name}: {output}")
+
+        if errors:
+            raise typer.Exit(1)
+        return
+
+    # Grab session from context, login happens on first request
+    connection = connect(ctx)
+
+    # Get the corresponding API for the server
+    api = connection.api()
+
+    if limit > 0:
+        templates = template.iter_all_templates(
+            api, filter, page_size=min(limit, 500), prefetch=prefetch
+        )
+
+        for tmpl in islice(templates, limit):
+            typer.echo(tmpl.summary() if detail else tmpl.name)
+
+        templates.close()
+        return
+
     # Fetch list of template objects
-    list_of_templates: List[template.template] = template.get_all_templates(api, filter)  # noqa: E501
+    list_of_templates: List[template.template] = template.get_all_templates(
+        api, filter, ctx.obj.get('template_cache'), keep_raw=False
+    )
 
     for tmpl in list_of_templates:
         if detail:
@@ -91,14 +137,15 @@ def get(
       - full is an API option to populate the metadata attributes
     """
 
-    # Grab session from context and login
-    connection: session = ctx.obj['session']
-    connection.logon()
+    # Grab session from context, login happens on first request
+    connection = connect(ctx)
 
     # Get the corresponding API for the server
     api = connection.api()
 
-    tmpl_data = template.get_template(api, name, full)
+    tmpl_data = template.get_template(
+        api, name, full, ctx.obj.get('template_cache')
+    )
 
     if nvpairs:
         pairs = tmpl_data.nvpairs(verbose)
@@ -127,3 +174,71 @@ def get(
         typer.echo(tmpl_data.verbose())
     else:
         typer.echo(tmpl_data.brief())
+
+
+def load_nvpairs(fname: str):
+    """
+    nvPairs dicts from a JSON file holding a list of them, a single one or
+    one per line. Policy payloads are reduced to their nvPairs attribute.
+    """
+
+    with open(fname) as f:
+        text = f.read()
+
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = [json.loads(x) for x in text.splitlines() if x.strip()]
+
+    if isinstance(data, dict):
+        data = [data]
+
+    return [
+        x['nvPairs'] if isinstance(x, dict) and
+        isinstance(x.get('nvPairs'), dict) else x
+        for x in data
+    ]
+
+
+@resource.command(no_args_is_help=True)
+def validate(
+    ctx: typer.Context,
+    name: str = typer.Argument(..., help="Exact name of template"),
+    fname: str = typer.Argument(..., help="JSON file of nvPairs dicts"),
+    strict: bool = typer.Option(
+        True, help="Parameters not in the template are errors"
+    )
+):
+    """
+    Check nvPairs payloads against the parameters of a template locally,
+    without sending them to NDFC. The file holds a JSON list of nvPairs
+    dicts, a single one, or one per line.
+    """
+
+    try:
+        payloads = load_nvpairs(fname)
+    except (OSError, ValueError) as err:
+        typer.echo(f"{fname}: {err}", err=True)
+        raise typer.Exit(1)
+
+    # Grab session from context, login happens on first request
+    connection = connect(ctx)
+
+    # Get the corresponding API for the server
+    api = connection.api()
+
+    schema = template.get_template_schema(
+        api, name, ctx.obj.get('template_cache')
+    )
+
+    invalid = schema.validate(payloads, strict)
+    for idx, errors in invalid.items():
+        for error in errors:
+            typer.echo(f"payload {idx}: {error}")
+
+    typer.echo(
+        f"{len(payloads) - len(invalid)} of {len(payloads)} payloads valid"
+    )
+
+    if invalid:
+        raise typer.Exit(1)
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Copyright (c) 2022 Cisco and/or its affiliates.
+
+This software is licensed to you under the terms of the Cisco Sample
+Code License, Version 1.1 (the "License"). You may obtain a copy of the
+License at
+
+               https://developer.cisco.com/docs/licenses
+
+All use of the material herein must be in accordance with the terms of
+the License. All rights not expressly granted by the License are
+reserved. Unless required by applicable law or agreed to separately in
+writing, software distributed under the License is distributed on an "AS
+IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+or implied.
+"""
+
+__author__ = "Dr Timothy E Miller <timmil@cisco.com>"
+__contributors__ = [
+]
+__copyright__ = "Copyright (c) 2022 Cisco and/or its affiliates."
+__license__ = "Cisco Sample Code License, Version 1.1"
+
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+# Hot path instrumentation. The SDK emits events, plain dicts, for:
+#   - auth: logon to the server, or a token restored from the token cache
+#   - version: version/capability discovery
+#   - request: every session request (method, endpoint, status, bytes,
+#     retries)
+#   - decode: JSON decoding of a response
+#   - build: construction of SDK objects, e.g. template objects
+#   - validate: local validation of nvPairs payloads against a template
+#
+# Every event has kind and time (epoch seconds) keys, timed events also
+# elapsed (seconds). Callers subscribe a callback to receive them; with no
+# subscribers the hooks cost a single check.
+
+_subscribers = list()
+_lock = threading.Lock()
+
+
+def subscribe(callback):
+    """
+    subscribe(callback): call callback(event) for every event emitted
+    """
+
+    global _subscribers
+    with _lock:
+        _subscribers = _subscribers + [callback]
+    return callback
+
+
+def unsubscribe(callback):
+    global _subscribers
+    with _lock:
+        _subscribers = [x for x in _subscribers if x is not callback]
+
+
+def enabled():
+    return len(_subscribers) > 0
+
+
+def emit(kind, **fields):
+    """
+    emit(kind, **fields): deliver an event to the subscribers
+    """
+
+    subscribers = _subscribers
+    if not subscribers:
+        return
+
+    event = {'kind': kind, 'time': time.time()}
+    event.update(fields)
+
+    for callback in subscribers:
+        callback(event)
+
+
+@contextmanager
+def measure(kind, **fields):
+    """
+    Context manager emitting a kind event with the elapsed time of the
+    block. The yielded dict can be updated with more fields.
+    """
+
+    if not _subscribers:
+        yield fields
+        return
+
+    start = time.perf_counter()
+    try:
+        yield fields
+    finally:
+        fields['elapsed'] = time.perf_counter() - start
+        emit(kind, **fields)
+
+
+class profiler:
+    def __init__(self):
+        """
+        Collect events while started, for a summary or a trace file
+        """
+
+        self.events = list()
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _record(self, event):
+        with self._lock:
+            self.events.append(event)
+
+    def start(self):
+        subscribe(self._record)
+        return self
+
+    def stop(self):
+        unsubscribe(self._record)
+
+    def summary(self):
+        """
+        Table of event count, latency, bytes and retries per kind and
+        endpoint, slowest total first
+        """
+
+        rows = dict()
+        for event in self.events:
+            key = (event['kind'], event.get('endpoint', ''))
+            row = rows.setdefault(key, {
+                'count': 0, 'total': 0.0, 'max': 0.0, 'bytes': 0,
+                'retries': 0, 'status': dict()
+            })
+
+            elapsed = event.get('elapsed', 0.0)
+            row['count'] += 1
+            row['total'] += elapsed
+            row['max'] = max(row['max'], elapsed)
+            row['bytes'] += event.get('bytes') or 0
+            row['retries'] += event.get('retries') or 0
+
+            if 'status' in event:
+                status = str(event['status'])
+                row['status'][status] = row['status'].get(status, 0) + 1
+
+        output = [
+            f"{'Kind':8} {'Endpoint':50} {'Count':>6} {'Total ms':>10} "
+            f"{'Avg ms':>8} {'Max ms':>8} {'Bytes':>10} {'Retries':>7} Status"
+        ]
+
+        for (kind, endpoint), row in sorted(
+            rows.items(), key=lambda x: -x[1]['total']
+        ):
+            status = ','.join(f'{k}:{v}' for k, v in row['status'].items())
+            output.append(
+                f"{kind:8} {endpoint[-50:]:50} {row['count']:>6} "
+                f"{row['total'] * 1000:>10.1f} "
+                f"{row['total'] * 1000 / row['count']:>8.1f} "
+                f"{row['max'] * 1000:>8.1f} {row['bytes']:>10} "
+                f"{row['retries']:>7} {status}"
+            )
+
+        return "\n".join(output)
+
+    def write_trace(self, fname):
+        """
+        Write the events, one JSON object per line, to fname
+        """
+
+        with open(fname, 'w') as f:
+            for event in self.events:
+                f.write(json.dumps(event, default=str) + "\n")
+
+    def report(self, trace=None, summary=True, out=sys.stderr):
+        """
+        Stop collecting, write the trace file if given and print the
+        summary to out. Used by the CLI --profile options.
+        """
+
+        self.stop()
+
+        if trace:
+            self.write_trace(trace)
+
+        if summary:
+            print(self.summary(), file=out)
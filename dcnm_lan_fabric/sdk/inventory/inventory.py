@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Copyright (c) 2022 Cisco and/or its affiliates.
+
+This software is licensed to you under the terms of the Cisco Sample
+Code License, Version 1.1 (the "License"). You may obtain a copy of the
+License at
+
+               https://developer.cisco.com/docs/licenses
+
+All use of the material herein must be in accordance with the terms of
+the License. All rights not expressly granted by the License are
+reserved. Unless required by applicable law or agreed to separately in
+writing, software distributed under the License is distributed on an "AS
+IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+or implied.
+"""
+
+__author__ = "Dr Timothy E Miller <timmil@cisco.com>"
+__contributors__ = [
+]
+__copyright__ = "Copyright (c) 2022 Cisco and/or its affiliates."
+__license__ = "Cisco Sample Code License, Version 1.1"
+
+
+import json
+import time
+import itertools
+import threading
+from typing import List
+
+
+# Switch attributes kept by default
+INVENTORY_FIELDS = [
+    'serialNumber', 'logicalName', 'ipAddress', 'fabricName', 'switchRole',
+    'model', 'release', 'status', 'mode'
+]
+
+
+class inventory_store:
+    def __init__(self, api, fields=INVENTORY_FIELDS):
+        """
+        In-memory copy of the switch inventory indexed by serial number,
+        hostname, management IP, fabric and role.
+          - api: API object from session.api()
+          - fields: switch attributes kept, None keeps every attribute
+        """
+
+        self._api = api
+        self._fields = fields
+        self._lock = threading.RLock()
+
+        self._records = dict()
+        self._digests = dict()
+        self._by_name = dict()
+        self._by_ip = dict()
+        self._by_fabric = dict()
+        self._by_role = dict()
+
+        # Server order of each switch, so fabric() and role() sort only
+        # the switches they return
+        self._positions = dict()
+        self._counter = itertools.count()
+
+        # Epoch seconds of the last full refresh and per fabric refresh
+        self.refreshed = 0
+        self._fabric_refreshed = dict()
+
+    def __str__(self):
+        return f"dcnm/ndfc.inventory_store {len(self)} switches"
+
+    def __len__(self):
+        return len(self._records)
+
+    def __contains__(self, serial):
+        return serial in self._records
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._records.values()))
+
+    # Indexing
+    @staticmethod
+    def _role(record):
+        return record.get('switchRole', record.get('role'))
+
+    def _index(self, serial, record):
+        self._records[serial] = record
+        if serial not in self._positions:
+            self._positions[serial] = next(self._counter)
+        self._by_name[record.get('logicalName')] = serial
+        self._by_ip[record.get('ipAddress')] = serial
+        self._by_fabric.setdefault(record.get('fabricName'), set()).add(serial)
+        self._by_role.setdefault(self._role(record), set()).add(serial)
+
+    def _unindex(self, serial):
+        record = self._records.pop(serial)
+        self._digests.pop(serial, None)
+        self._positions.pop(serial, None)
+        self._unindex_keys(serial, record)
+
+    def _unindex_keys(self, serial, record):
+        if self._by_name.get(record.get('logicalName')) == serial:
+            del self._by_name[record.get('logicalName')]
+        if self._by_ip.get(record.get('ipAddress')) == serial:
+            del self._by_ip[record.get('ipAddress')]
+
+        self._by_fabric.get(record.get('fabricName'), set()).discard(serial)
+        self._by_role.get(self._role(record), set()).discard(serial)
+
+    # Refresh
+    def _fetch(self, fabric_name):
+        fields = self._fields
+
+        if fabric_name is None:
+            return list(self._api.get_switch_inventory(fields=fields))
+
+        if hasattr(self._api, 'get_fabric_inventory'):
+            # Imported here, requests is only loaded once a request is made
+            from requests.exceptions import HTTPError
+
+            try:
+                return [
+                    dict(sw, fabricName=sw.get('fabricName', fabric_name))
+                    for sw in self._api.get_fabric_inventory(
+                        fabric_name, fields=fields
+                    )
+                ]
+            except HTTPError as err:
+                if err.response is not None and \
+                        err.response.status_code == 404:
+                    raise Exception(f'Fabric {fabric_name} missing')
+                raise
+
+        return [
+            sw for sw in self._api.get_switch_inventory(fields=fields)
+            if sw.get('fabricName') == fabric_name
+        ]
+
+    def refresh(self, fabric_name=None):
+        """
+        refresh(fabric_name): pull the inventory, all switches or just
+        those of fabric_name, and apply the differences. Only added and
+        changed switches are re-indexed; switches no longer reported within
+        the refreshed scope are removed. DCNM/NDFC have no changed-since
+        query, so scoping the refresh to a fabric is what limits the pull.
+
+        Returns a dict with the added, changed and removed serial numbers.
+        """
+
+        records = self._fetch(fabric_name)
+
+        with self._lock:
+            if fabric_name is None:
+                scope = set(self._records)
+            else:
+                scope = set(self._by_fabric.get(fabric_name, set()))
+
+            report = {'added': [], 'changed': [], 'removed': []}
+
+            for record in records:
+                serial = record.get('serialNumber')
+                if serial is None:
+                    continue
+
+                scope.discard(serial)
+                digest = json.dumps(record, sort_keys=True)
+
+                if serial not in self._records:
+                    report['added'].append(serial)
+                elif self._digests.get(serial) != digest:
+                    report['changed'].append(serial)
+                    # Keeps its place in _records, so server order holds
+                    self._unindex_keys(serial, self._records[serial])
+                else:
+                    continue
+
+                self._index(serial, record)
+                self._digests[serial] = digest
+
+            for serial in scope:
+                self._unindex(serial)
+                report['removed'].append(serial)
+
+            if fabric_name is None:
+                # Switches are listed in the order the server reported them
+                self._records = {
+                    x['serialNumber']: self._records[x['serialNumber']]
+                    for x in records
+                    if x.get('serialNumber') in self._records
+                }
+                self._positions = {
+                    serial: n for n, serial in enumerate(self._records)
+                }
+                self._counter = itertools.count(len(self._positions))
+                self.refreshed = time.time()
+            else:
+                self._fabric_refreshed[fabric_name] = time.time()
+
+        return report
+
+    def ensure(self, fabric_name=None, ttl=None):
+        """
+        ensure(fabric_name, ttl): refresh the scope only if it was never
+        loaded, or was loaded more than ttl seconds ago
+        """
+
+        last = self.refreshed
+        if fabric_name is not None:
+            last = max(last, self._fabric_refreshed.get(fabric_name, 0))
+
+        if last == 0 or (ttl is not None and time.time() - last > ttl):
+            self.refresh(fabric_name)
+
+    def invalidate(self, fabric_name=None):
+        """
+        invalidate(fabric_name): mark the scope stale after a change, e.g.
+        switches registered, discovered or given a new role, so the next
+        ensure() pulls it again. The records are kept until then.
+        """
+
+        with self._lock:
+            if fabric_name is None:
+                self.refreshed = 0
+                self._fabric_refreshed.clear()
+                return
+
+            # The other fabrics stay as fresh as the last full refresh
+            if self.refreshed:
+                for fabric in self._by_fabric:
+                    self._fabric_refreshed[fabric] = max(
+                        self._fabric_refreshed.get(fabric, 0), self.refreshed
+                    )
+                self.refreshed = 0
+
+            self._fabric_refreshed.pop(fabric_name, None)
+
+    # Lookups
+    def _ordered(self, serials):
+        return [
+            self._records[x]
+            for x in sorted(serials, key=self._positions.__getitem__)
+        ]
+
+    def by_serial(self, serial):
+        return self._records.get(serial)
+
+    def by_name(self, name):
+        with self._lock:
+            return self._records.get(self._by_name.get(name))
+
+    def by_ip(self, ip):
+        with self._lock:
+            return self._records.get(self._by_ip.get(ip))
+
+    def fabric(self, fabric_name) -> List[dict]:
+        """
+        fabric(fabric_name): switches of the fabric, in server order
+        """
+
+        with self._lock:
+            serials = self._by_fabric.get(fabric_name, set())
+            return self._ordered(serials)
+
+    def role(self, role) -> List[dict]:
+        """
+        role(role): switches holding the role, in server order
+        """
+
+        with self._lock:
+            serials = self._by_role.get(role, set())
+            return self._ordered(serials)
+
+    def fabrics(self) -> List[str]:
+        with self._lock:
+            return sorted(k for k, v in self._by_fabric.items() if v and k)
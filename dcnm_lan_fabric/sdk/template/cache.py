@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Copyright (c) 2022 Cisco and/or its affiliates.
+
+This software is licensed to you under the terms of the Cisco Sample
+Code License, Version 1.1 (the "License"). You may obtain a copy of the
+License at
+
+               https://developer.cisco.com/docs/licenses
+
+All use of the material herein must be in accordance with the terms of
+the License. All rights not expressly granted by the License are
+reserved. Unless required by applicable law or agreed to separately in
+writing, software distributed under the License is distributed on an "AS
+IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+or implied.
+"""
+
+__author__ = "Dr Timothy E Miller <timmil@cisco.com>"
+__contributors__ = [
+]
+__copyright__ = "Copyright (c) 2022 Cisco and/or its affiliates."
+__license__ = "Cisco Sample Code License, Version 1.1"
+
+
+import os
+import json
+import time
+import hashlib
+
+from dcnm_lan_fabric.server.token_cache import default_cache_dir
+from dcnm_lan_fabric.server.token_cache import write_private
+
+
+class template_cache:
+    def __init__(self, path=None, ttl=300):
+        """
+        Initialize instance with the following information:
+          - path: cache directory, defaults to templates in the user cache
+            directory. Entries are kept per controller.
+          - ttl: seconds an entry is answered locally before it is
+            revalidated with the controller
+        """
+
+        if path is None:
+            path = os.path.join(default_cache_dir(), 'templates')
+
+        self.path = path
+        self.ttl = ttl
+
+    def __str__(self):
+        return f"dcnm/ndfc.template_cache {self.path}, ttl {self.ttl}"
+
+    def _fname(self, host, url):
+        host_dir = host.replace(':', '_').replace('/', '_')
+        digest = hashlib.sha1(url.encode()).hexdigest()
+
+        return os.path.join(self.path, host_dir, f"{digest}.json")
+
+    def _read(self, fname):
+        try:
+            with open(fname, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def fetch(self, api, url):
+        """
+        fetch(api, url): return the decoded response for url
+          - Within the TTL the cached copy is returned without contacting
+            the controller.
+          - After the TTL the entry is revalidated with a conditional GET
+            when the controller provided an ETag or Last-Modified header,
+            otherwise the response is fetched again.
+        """
+
+        fname = self._fname(api.host, url)
+        entry = self._read(fname)
+        now = time.time()
+
+        if entry is not None and now - entry['fetched'] < self.ttl:
+            return entry['data']
+
+        validators = entry['validators'] if entry is not None else None
+        data, validators = api.get_revalidate(url, validators)
+
+        if data is None:
+            # 304 Not Modified, cached copy is still current
+            data = entry['data']
+
+        entry = {
+            'url': url,
+            'fetched': now,
+            'validators': validators,
+            'data': data,
+        }
+
+        write_private(fname, json.dumps(entry))
+        return data
+
+    def invalidate(self, host, url=None):
+        """
+        invalidate(host, url): drop the entry for url, or every entry for
+        the controller if url is not given
+        """
+
+        if url is not None:
+            fnames = [self._fname(host, url)]
+        else:
+            host_dir = os.path.dirname(self._fname(host, ''))
+            try:
+                fnames = [
+                    os.path.join(host_dir, x) for x in os.listdir(host_dir)
+                ]
+            except OSError:
+                fnames = []
+
+        for fname in fnames:
+            try:
+                os.unlink(fname)
+            except OSError:
+                pass
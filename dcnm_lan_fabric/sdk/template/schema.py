@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Copyright (c) 2022 Cisco and/or its affiliates.
+
+This software is licensed to you under the terms of the Cisco Sample
+Code License, Version 1.1 (the "License"). You may obtain a copy of the
+License at
+
+               https://developer.cisco.com/docs/licenses
+
+All use of the material herein must be in accordance with the terms of
+the License. All rights not expressly granted by the License are
+reserved. Unless required by applicable law or agreed to separately in
+writing, software distributed under the License is distributed on an "AS
+IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+or implied.
+"""
+
+__author__ = "Dr Timothy E Miller <timmil@cisco.com>"
+__contributors__ = [
+]
+__copyright__ = "Copyright (c) 2022 Cisco and/or its affiliates."
+__license__ = "Cisco Sample Code License, Version 1.1"
+
+
+import re
+import ipaddress
+import threading
+
+from dcnm_lan_fabric import instrument
+
+
+class InvalidNvpairs(Exception):
+    def __init__(self, name, errors):
+        """
+        Initialize instance with the following information:
+          - name: template the payloads were checked against
+          - errors: {payload index: [error, ...]} of the invalid payloads
+        """
+
+        self.name = name
+        self.errors = errors
+
+        super().__init__(
+            f'{len(errors)} invalid nvPairs payloads for template {name}'
+        )
+
+
+# Converters per parameterType, raising ValueError for invalid values.
+# Numeric types return the numbers min/max are checked against.
+def _integer(value):
+    return [int(value)]
+
+
+def _float(value):
+    return [float(value)]
+
+
+def _integer_range(value):
+    numbers = list()
+
+    for part in value.split(','):
+        first, _, last = part.strip().partition('-')
+        first = int(first)
+        last = int(last) if last else first
+        if last < first:
+            raise ValueError(f'range {part} ends before it starts')
+        numbers += [first, last]
+
+    return numbers
+
+
+def _boolean(value):
+    if value.lower() not in ('true', 'false'):
+        raise ValueError('not true or false')
+
+
+def _interface(factory):
+    def convert(value):
+        if '/' not in value:
+            raise ValueError('missing prefix length')
+        factory(value)
+
+    return convert
+
+
+def _list(factory):
+    def convert(value):
+        for item in value.split(','):
+            factory(item.strip())
+
+    return convert
+
+
+_MAC = re.compile(
+    r'([0-9a-f]{2}[:-]){5}[0-9a-f]{2}|([0-9a-f]{4}\.){2}[0-9a-f]{4}', re.I
+)
+
+
+def _mac(value):
+    if not _MAC.fullmatch(value):
+        raise ValueError('not a MAC address')
+
+
+CONVERTERS = {
+    'integer': _integer,
+    'long': _integer,
+    'float': _float,
+    'integerRange': _integer_range,
+    'boolean': _boolean,
+    'ipAddress': ipaddress.ip_address,
+    'ipV4Address': ipaddress.IPv4Address,
+    'ipV6Address': ipaddress.IPv6Address,
+    'ipAddressWithSubnet': _interface(ipaddress.ip_interface),
+    'ipV4AddressWithSubnet': _interface(ipaddress.IPv4Interface),
+    'ipV6AddressWithSubnet': _interface(ipaddress.IPv6Interface),
+    'ipAddressList': _list(ipaddress.ip_address),
+    'ipV4AddressList': _list(ipaddress.IPv4Address),
+    'macAddress': _mac,
+}
+
+NUMERIC_TYPES = ('integer', 'long', 'float', 'integerRange')
+
+
+def _number(value):
+    try:
+        return float(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+class parameter_schema:
+    __slots__ = (
+        'name', 'type', 'default', 'required', 'description', 'minimum',
+        'maximum', 'min_length', 'max_length', 'choices', 'pattern',
+        '_convert'
+    )
+
+    def __init__(self, param):
+        """
+        Compile the checks of a template_parameter once, from its type,
+        metaProperties and annotations
+        """
+
+        meta = param.metaproperties or dict()
+
+        self.name, self.default, self.required, self.description = \
+            param.nvpair(verbose=True)
+        self.type = param.parameter_type
+
+        numeric = self.type in NUMERIC_TYPES
+        self.minimum = _number(meta.get('min')) if numeric else None
+        self.maximum = _number(meta.get('max')) if numeric else None
+        self.min_length = _number(meta.get('minLength'))
+        self.max_length = _number(meta.get('maxLength'))
+
+        valid = meta.get('validValues')
+        self.choices = frozenset(
+            x.strip() for x in valid.split(',')
+        ) if valid else None
+
+        # Controllers use Java patterns; skip the ones Python can't compile
+        try:
+            regex = meta.get('regularExpr')
+            self.pattern = re.compile(regex) if regex else None
+        except re.error:
+            self.pattern = None
+
+        self._convert = CONVERTERS.get(self.type)
+
+    def check(self, value):
+        """
+        check(value): reason value is invalid for the parameter, or None
+        """
+
+        if isinstance(value, bool):
+            value = 'true' if value else 'false'
+        elif not isinstance(value, str):
+            value = str(value)
+
+        if self.choices is not None and value not in self.choices:
+            return f'{value!r} not one of {", ".join(sorted(self.choices))}'
+
+        if self._convert is not None:
+            try:
+                numbers = self._convert(value)
+            except ValueError:
+                return f'{value!r} is not a valid {self.type}'
+
+            if self.minimum is not None and \
+                    any(x < self.minimum for x in numbers):
+                return f'{value!r} is below the minimum {self.minimum:g}'
+            if self.maximum is not None and \
+                    any(x > self.maximum for x in numbers):
+                return f'{value!r} is above the maximum {self.maximum:g}'
+
+        if self.min_length is not None and len(value) < self.min_length:
+            return f'{value!r} is shorter than {self.min_length:g}'
+        if self.max_length is not None and len(value) > self.max_length:
+            return f'{value!r} is longer than {self.max_length:g}'
+
+        if self.pattern is not None and not self.pattern.fullmatch(value):
+            return f'{value!r} does not match {self.pattern.pattern}'
+
+        return None
+
+
+class template_schema:
+    __slots__ = ('name', 'parameters', 'required')
+
+    def __init__(self, tmpl):
+        """
+        Compile the parameters of a template object:
+          - parameters: {name: parameter_schema}
+          - required: names of the mandatory parameters without a default
+        """
+
+        self.name = tmpl.name
+
+        with instrument.measure('build', endpoint='schema',
+                                count=len(tmpl.parameters)):
+            self.parameters = {
+                p.name: parameter_schema(p) for p in tmpl.parameters
+            }
+
+        self.required = frozenset(
+            name for name, p in self.parameters.items()
+            if p.required and p.default == ''
+        )
+
+    def __str__(self):
+        return f"dcnm/ndfc.template.schema {self.name}"
+
+    def defaults(self):
+        """
+        defaults(): nvPairs dict of the parameters that have a default
+        """
+
+        return {
+            name: p.default for name, p in self.parameters.items()
+            if p.default != ''
+        }
+
+    def errors(self, nvpairs, strict=True):
+        """
+        errors(nvpairs, strict): list of the problems of one nvPairs dict.
+        With strict, parameters the template does not have are errors.
+        """
+
+        output = [
+            f'{name}: required' for name in sorted(self.required)
+            if nvpairs.get(name) in (None, '')
+        ]
+
+        parameters = self.parameters
+        for name, value in nvpairs.items():
+            param = parameters.get(name)
+            if param is None:
+                if strict:
+                    output.append(f'{name}: not a parameter of {self.name}')
+                continue
+
+            # Empty optional values are left to the controller defaults
+            if value is None or value == '':
+                continue
+
+            reason = param.check(value)
+            if reason is not None:
+                output.append(f'{name}: {reason}')
+
+        return output
+
+    def validate(self, payloads, strict=True):
+        """
+        validate(payloads, strict): check an iterable of nvPairs dicts
+        locally. Returns {payload index: [error, ...]} of the invalid
+        payloads only, so an empty dict means all of them are valid.
+        """
+
+        invalid = dict()
+
+        with instrument.measure('validate', endpoint=self.name) as event:
+            count = 0
+            for idx, nvpairs in enumerate(payloads):
+                count += 1
+                if not isinstance(nvpairs, dict):
+                    invalid[idx] = ['not an nvPairs dict']
+                    continue
+
+                output = self.errors(nvpairs, strict)
+                if output:
+                    invalid[idx] = output
+
+            event['count'] = count
+
+        return invalid
+
+    def check(self, payloads, strict=True):
+        """
+        check(payloads, strict): validate() raising InvalidNvpairs if any
+        payload is invalid, before any of them reaches the controller
+        """
+
+        invalid = self.validate(payloads, strict)
+        if invalid:
+            raise InvalidNvpairs(self.name, invalid)
+
+
+# Compiled schemas per (controller host, template name)
+_schemas = dict()
+_schemas_lock = threading.Lock()
+
+
+def get_schema(tmpl, refresh=False):
+    """
+    Compiled template_schema of a template object, cached per controller
+    host and template name. Only templates fetched with populate=True
+    carry the metaProperties the constraints come from, schemas of other
+    templates are built but not cached. Pass refresh=True after the
+    template changed on the controller.
+    """
+
+    if not tmpl.populated:
+        return template_schema(tmpl)
+
+    key = (tmpl.host, tmpl.name)
+
+    with _schemas_lock:
+        schema = None if refresh else _schemas.get(key)
+
+    if schema is None:
+        schema = template_schema(tmpl)
+        with _schemas_lock:
+            _schemas[key] = schema
+
+    return schema
+
+
+def cached_schema(host, name):
+    """
+    Compiled template_schema of the template name on the controller host,
+    or None if not cached
+    """
+
+    with _schemas_lock:
+        return _schemas.get((host, name))
+
+
+def clear_schemas():
+    with _schemas_lock:
+        _schemas.clear()
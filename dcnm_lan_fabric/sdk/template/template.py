@@ -26,10 +26,25 @@ __license__ = "Cisco Sample Code License, Version 1.1"
 import json
 from typing import List, Any
 
+from dcnm_lan_fabric import instrument
+from dcnm_lan_fabric.sdk.template.schema import template_schema
+from dcnm_lan_fabric.sdk.template.schema import get_schema, cached_schema
+
+
+# Template attributes kept when the raw payload is dropped. Parameter lists
+# are the bulk of a template after its content, only requested on demand.
+TEMPLATE_FIELDS = [
+    'name', 'description', 'supportedPlatforms', 'templateType',
+    'templateSubType', 'contentType'
+]
+
 
 class template_parameter:
+    __slots__ = ('__data', '__nvpair')
+
     def __init__(self, param_data):
         self.__data = param_data  # noqa: F841
+        self.__nvpair = None
 
     @property
     def name(self):
@@ -39,6 +54,10 @@ class template_parameter:
     def description(self):
         return self.__data['description']
 
+    @property
+    def parameter_type(self):
+        return self.__data.get('parameterType', None)
+
     @property
     def metaproperties(self):
         return self.__data.get('metaProperties', None)
@@ -57,27 +76,53 @@ class template_parameter:
         return f"dcnm/ndfc.template.nvpair {self.name}"
 
     def nvpair(self, verbose=False):
-        meta = self.metaproperties
-        notes = self.annotations
+        # metaProperties and annotations are only parsed on the first call
+        if self.__nvpair is None:
+            meta = self.metaproperties
+            notes = self.annotations
 
-        if notes:
-            required = notes.get('IsMandatory', "false")
-            description = notes.get('Description', "")
-        else:
-            required = "false"
-            description = ""
-
-        return (
-            self.name,
-            meta.get('defaultValue', "") if meta else "",
-            True if required.lower() == "true" else False,
-            description if verbose else None
-        )
+            if notes:
+                required = notes.get('IsMandatory', "false")
+                description = notes.get('Description', "")
+            else:
+                required = "false"
+                description = ""
+
+            self.__nvpair = (
+                self.name,
+                meta.get('defaultValue', "") if meta else "",
+                True if required.lower() == "true" else False,
+                description
+            )
+
+        if verbose:
+            return self.__nvpair
+
+        return self.__nvpair[:3] + (None,)
 
 
 class template:
-    def __init__(self, tmpl_data):
-        self.__data = tmpl_data
+    __slots__ = (
+        '__data', '__params', '__parameters', 'name', 'description',
+        'supported_platforms', 'template_type', 'template_subtype',
+        'content_type', 'host', 'populated'
+    )
+
+    def __init__(self, tmpl_data, keep_raw=True, host=None, populated=False,
+                 parameters=False):
+        """
+        tmpl_data - template dict as returned by the API
+        keep_raw - retain the full dict for verbose(). Without it only the
+                   attributes below are kept.
+        parameters - keep the raw parameter list even without keep_raw
+        host - controller the template was fetched from
+        populated - fetched with populate=True, parameters then carry
+                    their metaProperties
+        """
+
+        self.__data = tmpl_data if keep_raw else None
+        self.host = host
+        self.populated = populated
         self.name = tmpl_data.get('name', 'Unknown')
         self.description = tmpl_data.get('description', 'Unknown')
         self.supported_platforms = tmpl_data.get('supportedPlatforms', 'Unknown')  # noqa:E501
@@ -85,11 +130,19 @@ class template:
         self.template_subtype = tmpl_data.get('templateSubType', 'Uknown')
         self.content_type = tmpl_data.get('contentType', 'Unknown')
 
-        parameters = tmpl_data.get('parameters', list())
-        self.parameters: List[template_parameter] = list()
+        # Parameter objects are only built when first needed
+        if keep_raw or parameters:
+            self.__params = tmpl_data.get('parameters') or list()
+        else:
+            self.__params = list()
+        self.__parameters = None
+
+    @property
+    def parameters(self) -> List[template_parameter]:
+        if self.__parameters is None:
+            self.__parameters = [template_parameter(p) for p in self.__params]
 
-        for p in parameters:
-            self.parameters.append(template_parameter(p))
+        return self.__parameters
 
     def __str__(self):
         return f"dcnm/ndfc.template {self.name}"
@@ -110,6 +163,9 @@ class template:
         return "\n".join(output)
 
     def verbose(self):
+        if self.__data is None:
+            raise Exception(f'Raw data for template {self.name} not kept')
+
         return json.dumps(self.__data, indent=4)
 
     def nvpairs(self, verbose=False):
@@ -120,17 +176,82 @@ class template:
 
         return sorted(pairs, key=lambda idx: idx[0])
 
+    def schema(self, refresh=False) -> template_schema:
+        """
+        Compiled parameter schema, cached per controller and template name
+        for populated templates. See template_schema.validate() to check
+        nvPairs payloads locally.
+        """
+
+        return get_schema(self, refresh)
+
+
+def get_all_templates(api, filter, cache=None, keep_raw=True,
+                      parameters=False):
+    """
+    Sorted list of template objects, optionally served from a
+    template_cache. Pass keep_raw=False when verbose() is not needed;
+    parameter lists are then only kept with parameters=True.
+    """
 
-def get_all_templates(api, filter):
-    list_of_templates = api.get_templates(filter)
+    fields = TEMPLATE_FIELDS + (['parameters'] if parameters else [])
+
+    if cache is not None:
+        list_of_templates = cache.fetch(api, api.templates_url(filter))
+    elif keep_raw:
+        list_of_templates = api.get_templates(filter)
+    else:
+        list_of_templates = api.get_templates(filter, fields=fields)
     sorted_list = sorted(list_of_templates, key=lambda tmpl: tmpl['name'])
 
     # Generate objects
-    list_of_templates = [template(tmpl) for tmpl in sorted_list]
+    with instrument.measure('build', endpoint='template',
+                            count=len(sorted_list)):
+        list_of_templates = [
+            template(tmpl, keep_raw, host=api.host, parameters=parameters)
+            for tmpl in sorted_list
+        ]
 
     return list_of_templates
 
 
-def get_template(api, name, populate=True):
-    tmpl_data = api.get_template_by_name(name, populate)
-    return template(tmpl_data)
+def iter_all_templates(api, filter, page_size=500, prefetch=0,
+                       parameters=False):
+    """
+    Template objects in server order, built as the pages of the template
+    list arrive, without the raw payload, and without the parameter lists
+    unless parameters=True. Stop iterating to stop fetching.
+    """
+
+    fields = TEMPLATE_FIELDS + (['parameters'] if parameters else [])
+
+    for tmpl in api.iter_templates(
+        filter, fields=fields, page_size=page_size, prefetch=prefetch
+    ):
+        yield template(
+            tmpl, keep_raw=False, host=api.host, parameters=parameters
+        )
+
+
+def get_template(api, name, populate=True, cache=None):
+    if cache is not None:
+        tmpl_data = cache.fetch(api, api.template_url(name, populate))
+    else:
+        tmpl_data = api.get_template_by_name(name, populate)
+
+    with instrument.measure('build', endpoint='template', count=1):
+        return template(tmpl_data, host=api.host, populated=populate)
+
+
+def get_template_schema(api, name, cache=None, refresh=False):
+    """
+    Compiled parameter schema of the template name on the controller of
+    api. The template is fetched, populated, only when its schema is not
+    cached yet, or with refresh.
+    """
+
+    schema = None if refresh else cached_schema(api.host, name)
+    if schema is None:
+        schema = get_template(api, name, True, cache).schema(refresh=True)
+
+    return schema
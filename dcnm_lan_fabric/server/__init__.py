@@ -23,5 +23,8 @@ __copyright__ = "Copyright (c) 2022 Cisco and/or its affiliates."
 __license__ = "Cisco Sample Code License, Version 1.1"
 
 # Remove one layer of repetition
-from .session import session     # noqa: F401
-from .utils import connect       # noqa: F401
+from .session import session                          # noqa: F401
+from .utils import connect                            # noqa: F401
+from .transport import transport_config, CircuitOpen  # noqa: F401
+from .aio import async_session                        # noqa: F401
+from .fleet import fleet                              # noqa: F401
@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+"""
+Copyright (c) 2022 Cisco and/or its affiliates.
+
+This software is licensed to you under the terms of the Cisco Sample
+Code License, Version 1.1 (the "License"). You may obtain a copy of the
+License at
+
+               https://developer.cisco.com/docs/licenses
+
+All use of the material herein must be in accordance with the terms of
+the License. All rights not expressly granted by the License are
+reserved. Unless required by applicable law or agreed to separately in
+writing, software distributed under the License is distributed on an "AS
+IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+or implied.
+"""
+
+__author__ = "Dr Timothy E Miller <timmil@cisco.com>"
+__contributors__ = [
+]
+__copyright__ = "Copyright (c) 2022 Cisco and/or its affiliates."
+__license__ = "Cisco Sample Code License, Version 1.1"
+
+
+import os
+import sys
+import json
+import time
+import socket
+import hashlib
+import argparse
+import threading
+import socketserver
+
+import requests
+
+import dcnm_lan_fabric.api
+from .session import session
+from .transport import transport_config
+from .capabilities import capabilities
+from .token_cache import default_cache_dir
+
+# Protocol: one connection per call. The client sends a JSON line with the
+# op and the connection data, the agent answers with a JSON header line and,
+# for requests, the response body until the connection is closed.
+
+CHUNK_SIZE = 64 * 1024
+
+# Request keyword arguments passed through the agent
+_KWARGS = ('params', 'data', 'json', 'headers')
+
+# Hop-by-hop or body encoding headers that no longer apply once the agent
+# has decoded the body
+_DROP_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding',
+                 'connection', 'keep-alive')
+
+
+def default_socket_path():
+    """
+    Agent socket in the per-user runtime directory, or in the cache
+    directory where XDG_RUNTIME_DIR is not set
+    """
+
+    base = os.environ.get('XDG_RUNTIME_DIR', '')
+    if base == '':
+        return os.path.join(default_cache_dir(), 'agent.sock')
+
+    return os.path.join(base, 'dcnm_lan_fabric', 'agent.sock')
+
+
+def agent_running(path=None):
+    """
+    True if an agent accepts connections on path
+    """
+
+    path = path or default_socket_path()
+    if not os.path.exists(path):
+        return False
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def _call(path, message):
+    """
+    Send message to the agent, returns the header and the open stream the
+    rest of the answer can be read from
+    """
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        sock.sendall(json.dumps(message).encode() + b'\n')
+        sock.shutdown(socket.SHUT_WR)
+        stream = sock.makefile('rb')
+    finally:
+        # The stream keeps the connection open until it is closed
+        sock.close()
+
+    line = stream.readline()
+    if not line:
+        stream.close()
+        raise requests.exceptions.ConnectionError(
+            f'Agent at {path} closed the connection'
+        )
+
+    header = json.loads(line)
+    if not header.get('ok'):
+        stream.close()
+        if header.get('type') in ('ConnectionError', 'Timeout',
+                                  'CircuitOpen'):
+            raise requests.exceptions.ConnectionError(header['error'])
+        raise Exception(header['error'])
+
+    return header, stream
+
+
+class agent_session:
+    def __init__(self, path, host, user, password, secure=True,
+                 version=None, token_cache=None, capability_cache=None,
+                 transport=None):
+        """
+        Client side stand-in for session, sending requests through the
+        agent listening on path. transport is a dict of transport_config
+        keyword arguments, used when the agent creates the session.
+        """
+
+        self.path = path or default_socket_path()
+
+        self._conn = {
+            'host': host,
+            'user': user,
+            'password': password,
+            'secure': secure,
+            'version': version,
+            'token_cache': token_cache,
+            'capability_cache': capability_cache,
+            'transport': transport,
+        }
+
+        self._capabilities = None
+        self._api = None
+
+    def __str__(self):
+        return f"ndfc.agent.Session: {self._conn['user']}@{self._conn['host']} via {self.path}"  # noqa:E501
+
+    @property
+    def host(self):
+        return self._conn['host']
+
+    def _call(self, op, **fields):
+        message = dict(fields, op=op, conn=self._conn)
+        return _call(self.path, message)
+
+    def _request(self, method, url, stream=False, **kwargs):
+        """
+        Internal method to send a request through the agent, returning a
+        requests.Response
+        """
+
+        kwargs = {k: v for k, v in kwargs.items() if k in _KWARGS}
+        header, body = self._call(
+            'request', method=method, url=url, kwargs=kwargs
+        )
+
+        response = requests.Response()
+        response.status_code = header['status']
+        response.reason = header['reason']
+        response.url = header['url']
+        response.encoding = header['encoding']
+        response.headers.update(header['headers'])
+
+        if stream:
+            # Read by iter_content straight from the agent connection
+            response.raw = body
+        else:
+            with body:
+                response._content = body.read()
+            response._content_consumed = True
+
+        return response
+
+    def get(self, url, **kwargs):
+        return self._request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self._request('POST', url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self._request('PUT', url, **kwargs)
+
+    @property
+    def capabilities(self):
+        if self._capabilities is None:
+            header, body = self._call('capabilities')
+            body.close()
+            self._capabilities = capabilities.fromdict(header['capabilities'])
+
+        return self._capabilities
+
+    def logon(self):
+        header, body = self._call('logon')
+        body.close()
+
+    def logout(self):
+        header, body = self._call('logout')
+        body.close()
+
+    def close(self):
+        pass
+
+    def api(self):
+        if self._api is None:
+            api_name = self.capabilities.api_name
+            self._api = getattr(dcnm_lan_fabric.api, api_name)(self)
+
+        return self._api
+
+
+class _output:
+    """
+    Wrapper of a handler's wfile recording whether anything was written
+    """
+
+    def __init__(self, wfile):
+        self._wfile = wfile
+        self.started = False
+
+    def write(self, data):
+        self.started = True
+        return self._wfile.write(data)
+
+
+class _handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            # Liveness check, see agent_running()
+            return
+
+        self.server.touch()
+
+        output = _output(self.wfile)
+        try:
+            message = json.loads(line)
+            getattr(self.server, 'op_' + message['op'])(message, output)
+        except Exception as err:
+            if output.started:
+                # Header and part of the body are out, an error line would
+                # corrupt the body: cut the connection so the client fails
+                self._abort()
+                return
+
+            self._write({
+                'ok': False, 'error': str(err), 'type': type(err).__name__
+            })
+
+    def _abort(self):
+        try:
+            self.connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def _write(self, header):
+        try:
+            self.wfile.write(json.dumps(header).encode() + b'\n')
+        except OSError:
+            pass
+
+
+class agent(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path=None, idle=3600):
+        """
+        Initialize instance with the following information:
+          - path: Unix socket to listen on, default_socket_path() if None
+          - idle: seconds without requests after which the agent exits,
+            never if None
+
+        Sessions are created on first use per connection data: host,
+        user, password, TLS setting, version, token and capability caches
+        and transport settings. They are kept logged on with their pooled
+        connections, discovered capabilities and tokens. The socket is
+        only accessible by the owner.
+        """
+
+        self.path = path or default_socket_path()
+        self.idle = idle
+        self.started = time.time()
+        self.last = self.started
+
+        self._sessions = dict()
+        self._lock = threading.Lock()
+
+        dirname = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(dirname, mode=0o700, exist_ok=True)
+
+        # Remove a socket left behind by an agent that did not clean up
+        if os.path.exists(self.path):
+            if agent_running(self.path):
+                raise Exception(f'Agent already running on {self.path}')
+            os.unlink(self.path)
+
+        umask = os.umask(0o177)
+        try:
+            socketserver.UnixStreamServer.__init__(self, self.path, _handler)
+        finally:
+            os.umask(umask)
+        os.chmod(self.path, 0o600)
+
+    def __str__(self):
+        return f"dcnm/ndfc.agent {self.path}, {len(self._sessions)} sessions"
+
+    def touch(self):
+        self.last = time.time()
+
+    def serve(self):
+        """
+        Serve until shutdown or idle for too long, then remove the socket
+        """
+
+        if self.idle:
+            threading.Thread(target=self._watch_idle, daemon=True).start()
+
+        try:
+            self.serve_forever()
+        finally:
+            self.server_close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+    def _watch_idle(self):
+        while True:
+            time.sleep(min(self.idle, 5))
+            if time.time() - self.last > self.idle:
+                self.shutdown()
+                return
+
+    def session(self, conn):
+        """
+        Warm session for the connection data sent by a client
+        """
+
+        key = hashlib.sha256(json.dumps(
+            [
+                conn['host'], conn['user'], conn['password'], conn['secure'],
+                conn.get('version'), conn.get('token_cache'),
+                conn.get('capability_cache'), conn.get('transport')
+            ],
+            sort_keys=True
+        ).encode()).hexdigest()
+
+        with self._lock:
+            if key not in self._sessions:
+                opts = dict(conn.get('transport') or {})
+                if isinstance(opts.get('timeout'), list):
+                    opts['timeout'] = tuple(opts['timeout'])
+
+                self._sessions[key] = session(
+                    conn['host'], conn['user'], conn['password'],
+                    secure=conn['secure'], version=conn['version'],
+                    token_cache=conn.get('token_cache'),
+                    capability_cache=conn.get('capability_cache'),
+                    transport=transport_config(**opts)
+                )
+
+            return self._sessions[key]
+
+    # Operations, op_<name>(message, wfile)
+    def op_request(self, message, wfile):
+        conn = self.session(message['conn'])
+
+        kwargs = {
+            k: v for k, v in message.get('kwargs', {}).items()
+            if k in _KWARGS
+        }
+        response = conn._request(
+            message['method'], message['url'], stream=True, **kwargs
+        )
+
+        try:
+            headers = {
+                k: v for k, v in response.headers.items()
+                if k.lower() not in _DROP_HEADERS
+            }
+
+            wfile.write(json.dumps({
+                'ok': True,
+                'status': response.status_code,
+                'reason': response.reason,
+                'url': response.url,
+                'encoding': response.encoding,
+                'headers': headers,
+            }).encode() + b'\n')
+
+            for chunk in response.iter_content(CHUNK_SIZE):
+                wfile.write(chunk)
+        finally:
+            response.close()
+
+    def op_capabilities(self, message, wfile):
+        conn = self.session(message['conn'])
+        caps = conn.capabilities.asdict()
+
+        wfile.write(json.dumps({
+            'ok': True, 'capabilities': caps
+        }).encode() + b'\n')
+
+    def op_logon(self, message, wfile):
+        self.session(message['conn']).logon()
+        wfile.write(b'{"ok": true}\n')
+
+    def op_logout(self, message, wfile):
+        self.session(message['conn']).logout()
+        wfile.write(b'{"ok": true}\n')
+
+    def op_status(self, message, wfile):
+        with self._lock:
+            sessions = [str(x) for x in self._sessions.values()]
+
+        wfile.write(json.dumps({
+            'ok': True,
+            'pid': os.getpid(),
+            'uptime': time.time() - self.started,
+            'idle': time.time() - self.last,
+            'sessions': sessions,
+        }).encode() + b'\n')
+
+    def op_shutdown(self, message, wfile):
+        wfile.write(b'{"ok": true}\n')
+        threading.Thread(target=self.shutdown, daemon=True).start()
+
+
+def agent_status(path=None):
+    header, body = _call(path or default_socket_path(), {'op': 'status'})
+    body.close()
+    return header
+
+
+def agent_stop(path=None):
+    header, body = _call(path or default_socket_path(), {'op': 'shutdown'})
+    body.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Agent keeping warm DCNM/NDFC sessions for dcnmctl'
+    )
+    parser.add_argument('--socket', default=None,
+                        help='Unix socket to listen on')
+    parser.add_argument('--idle', type=float, default=3600,
+                        help='seconds without requests before exiting, '
+                             '0 to run until stopped')
+    args = parser.parse_args()
+
+    try:
+        server = agent(args.socket, args.idle or None)
+    except Exception as err:
+        print(err, file=sys.stderr)
+        sys.exit(1)
+
+    server.serve()
+
+
+if __name__ == '__main__':
+    main()
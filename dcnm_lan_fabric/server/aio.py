@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Copyright (c) 2022 Cisco and/or its affiliates.
+
+This software is licensed to you under the terms of the Cisco Sample
+Code License, Version 1.1 (the "License"). You may obtain a copy of the
+License at
+
+               https://developer.cisco.com/docs/licenses
+
+All use of the material herein must be in accordance with the terms of
+the License. All rights not expressly granted by the License are
+reserved. Unless required by applicable law or agreed to separately in
+writing, software distributed under the License is distributed on an "AS
+IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+or implied.
+"""
+
+__author__ = "Dr Timothy E Miller <timmil@cisco.com>"
+__contributors__ = [
+]
+__copyright__ = "Copyright (c) 2022 Cisco and/or its affiliates."
+__license__ = "Cisco Sample Code License, Version 1.1"
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+import dcnm_lan_fabric.api.aio
+from .session import session
+from .transport import transport_config
+
+
+class async_session:
+    def __init__(self, host, user, password, secure=True, version=None,
+                 concurrency=10, **kwargs):
+        """
+        Initialize instance with the following information:
+          - host, user, password, secure, version: as for session
+          - concurrency: maximum number of controller calls in flight
+          - remaining keyword arguments are passed on to session
+
+        Requests are issued by a blocking session, shared with any
+        synchronous code that holds it, on a pool of concurrency worker
+        threads. The transport pool is sized to match unless a transport
+        is provided.
+        """
+
+        if kwargs.get('transport') is None:
+            kwargs['transport'] = transport_config(pool_size=concurrency)
+
+        self.session = session(host, user, password, secure, version, **kwargs)
+        self.concurrency = concurrency
+
+        self._executor = ThreadPoolExecutor(max_workers=concurrency)
+        self._semaphore = None
+        self._api = None
+
+    def __str__(self):
+        return f"async {self.session}, concurrency {self.concurrency}"
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    @property
+    def semaphore(self):
+        # Created on first use so it binds to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    async def run(self, func, *args, **kwargs):
+        """
+        Run the blocking func on the worker pool under the concurrency limit
+        """
+
+        async with self.semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, functools.partial(func, *args, **kwargs)
+            )
+
+    async def get(self, url, **kwargs):
+        return await self.run(self.session.get, url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.run(self.session.post, url, **kwargs)
+
+    async def put(self, url, **kwargs):
+        return await self.run(self.session.put, url, **kwargs)
+
+    async def logon(self):
+        return await self.run(self.session.logon)
+
+    async def logout(self):
+        return await self.run(self.session.logout)
+
+    async def api(self):
+        """
+        Async API object matching the server version, see session.api()
+        """
+
+        if self._api is None:
+            sync_api = await self.run(self.session.api)
+            api_name = self.session.capabilities.api_name
+
+            api_class = getattr(dcnm_lan_fabric.api.aio, api_name)
+            self._api = api_class(self, sync_api)
+
+        return self._api
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.session.close()
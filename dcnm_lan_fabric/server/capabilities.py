@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Copyright (c) 2022 Cisco and/or its affiliates.
+
+This software is licensed to you under the terms of the Cisco Sample
+Code License, Version 1.1 (the "License"). You may obtain a copy of the
+License at
+
+               https://developer.cisco.com/docs/licenses
+
+All use of the material herein must be in accordance with the terms of
+the License. All rights not expressly granted by the License are
+reserved. Unless required by applicable law or agreed to separately in
+writing, software distributed under the License is distributed on an "AS
+IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+or implied.
+"""
+
+__author__ = "Dr Timothy E Miller <timmil@cisco.com>"
+__contributors__ = [
+]
+__copyright__ = "Copyright (c) 2022 Cisco and/or its affiliates."
+__license__ = "Cisco Sample Code License, Version 1.1"
+
+import os
+import json
+import time
+import threading
+
+import requests
+
+import dcnm_lan_fabric.api
+from .token_cache import default_cache_dir, locked, write_private
+
+
+def api_family(version):
+    """
+    Map a DCNM/NDFC version string, e.g. 11.5(1) or 12.1.2e, to the name
+    of the API class in dcnm_lan_fabric.api that handles it. DCNM 11.x
+    is served by v11_5, NDFC 12.x and later by v12_0.
+    """
+
+    try:
+        major, minor = [int(x) for x in version.split('(')[0].split('.')[:2]]
+    except (AttributeError, ValueError):
+        raise Exception(f'Unsupported version: {version}')
+
+    if major == 11 and minor >= 3:
+        return 'v11_5'
+
+    if major >= 12:
+        return 'v12_0'
+
+    raise Exception(f'Unsupported version: {version}')
+
+
+def api_endpoints(family):
+    """
+    Names of the endpoint methods provided by the API class for family
+    """
+
+    api_class = getattr(dcnm_lan_fabric.api, family)
+    generic = set(dir(dcnm_lan_fabric.api.core))
+
+    return sorted(
+        name for name in dir(api_class)
+        if not name.startswith('_') and not name.endswith('_url')
+        and name not in generic and callable(getattr(api_class, name))
+    )
+
+
+class capabilities:
+    def __init__(self, host, version, endpoints=None, discovered=None,
+                 assumed=False):
+        """
+        Initialize instance with the following information:
+          - host: IP or FQDN of DCNM/NDFC server
+          - version: version reported by (or assumed for) the server
+          - endpoints: endpoint methods supported by the server's API class
+          - discovered: epoch seconds when the server was probed
+          - assumed: version was configured or guessed rather than reported
+            by the server, such results are never cached
+        """
+
+        self.host = host
+        self.version = version
+        self.api_name = api_family(version)
+
+        if endpoints is None:
+            endpoints = api_endpoints(self.api_name)
+        self.endpoints = list(endpoints)
+
+        self.discovered = time.time() if discovered is None else discovered
+        self.assumed = assumed
+
+    def __str__(self):
+        return f"dcnm/ndfc.capabilities {self.host}: {self.version}"
+
+    def __contains__(self, endpoint):
+        return endpoint in self.endpoints
+
+    def asdict(self):
+        return {
+            'host': self.host,
+            'version': self.version,
+            'endpoints': self.endpoints,
+            'discovered': self.discovered,
+        }
+
+    @classmethod
+    def fromdict(cls, data):
+        return cls(
+            data['host'], data['version'], data.get('endpoints'),
+            data.get('discovered')
+        )
+
+
+class capability_cache:
+    # Shared by every session in the process
+    _memory = dict()
+    _lock = threading.Lock()
+
+    def __init__(self, path=None, ttl=86400, persist=False):
+        """
+        Initialize instance with the following information:
+          - path: JSON file used when persist is set, defaults to
+            capabilities.json in the user cache directory
+          - ttl: seconds a discovery result is trusted before probing again
+          - persist: keep results on disk as well as in memory
+        """
+
+        if path is None:
+            path = os.path.join(default_cache_dir(), 'capabilities.json')
+
+        self.path = path
+        self.ttl = ttl
+        self.persist = persist
+
+    def _fresh(self, caps):
+        return caps is not None and time.time() - caps.discovered < self.ttl
+
+    def _read(self):
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        return data if isinstance(data, dict) else {}
+
+    def load(self, host):
+        """
+        load(host): return the capabilities for host if discovered within
+        the TTL, checking memory first and then the disk cache
+        """
+
+        with self._lock:
+            caps = self._memory.get(host)
+        if self._fresh(caps):
+            return caps
+
+        if not self.persist:
+            return None
+
+        entry = self._read().get(host)
+        try:
+            caps = capabilities.fromdict(entry) if entry else None
+        except Exception:
+            return None
+
+        if not self._fresh(caps):
+            return None
+
+        with self._lock:
+            self._memory[host] = caps
+        return caps
+
+    def store(self, caps):
+        if caps.assumed:
+            return
+
+        with self._lock:
+            self._memory[caps.host] = caps
+
+        if not self.persist:
+            return
+
+        with locked(self.path):
+            data = self._read()
+            data[caps.host] = caps.asdict()
+            write_private(self.path, json.dumps(data))
+
+    def invalidate(self, host):
+        with self._lock:
+            self._memory.pop(host, None)
+
+        if not self.persist:
+            return
+
+        with locked(self.path):
+            data = self._read()
+            if data.pop(host, None) is not None:
+                write_private(self.path, json.dumps(data))
+
+
+def _probe_dcnm(conn, base_url):
+    """
+    DCNM 11.x publishes its version without authentication
+    """
+
+    response = requests.Session.get(conn, base_url + '/rest/dcnm-version')
+    if response.status_code != 200:
+        return None
+
+    try:
+        return response.json().get('Dcnm-Version')
+    except ValueError:
+        return None
+
+
+def _probe_ndfc(conn, base_url):
+    """
+    NDFC 12.x publishes its version through the about API
+    """
+
+    url = base_url + '/appcenter/cisco/ndfc/api/about/version'
+
+    response = requests.Session.get(conn, url)
+    if response.status_code != 200:
+        return None
+
+    try:
+        return response.json().get('version')
+    except ValueError:
+        return None
+
+
+def discover(conn, host, base_url, hint):
+    """
+    discover(conn, host, base_url, hint): probe the server for its version
+    using the unauthenticated version endpoints, starting with the one for
+    the family of the hinted version. If the server answers without
+    reporting a version, the hint is trusted but marked as assumed so it is
+    not cached. If the server could not be reached at all, the network
+    error is raised rather than guessing.
+    """
+
+    probes = [_probe_dcnm, _probe_ndfc]
+    if api_family(hint) != 'v11_5':
+        probes.reverse()
+
+    error = None
+    answered = False
+    for probe in probes:
+        try:
+            version = probe(conn, base_url)
+        except requests.exceptions.RequestException as e:
+            error = e
+            continue
+
+        answered = True
+        if version:
+            try:
+                return capabilities(host, version)
+            except Exception:
+                continue
+
+    if not answered:
+        raise error
+
+    return capabilities(host, hint, assumed=True)
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Copyright (c) 2022 Cisco and/or its affiliates.
+
+This software is licensed to you under the terms of the Cisco Sample
+Code License, Version 1.1 (the "License"). You may obtain a copy of the
+License at
+
+               https://developer.cisco.com/docs/licenses
+
+All use of the material herein must be in accordance with the terms of
+the License. All rights not expressly granted by the License are
+reserved. Unless required by applicable law or agreed to separately in
+writing, software distributed under the License is distributed on an "AS
+IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+or implied.
+"""
+
+__author__ = "Dr Timothy E Miller <timmil@cisco.com>"
+__contributors__ = [
+]
+__copyright__ = "Copyright (c) 2022 Cisco and/or its affiliates."
+__license__ = "Cisco Sample Code License, Version 1.1"
+
+import os
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .session import session
+
+# String values accepted for DCNM_VERIFY, as for the CLI boolean flag
+_BOOLEANS = {
+    '1': True, 'true': True, 't': True, 'yes': True, 'y': True, 'on': True,
+    '0': False, 'false': False, 'f': False, 'no': False, 'n': False,
+    'off': False,
+}
+
+
+def _verify(name, value):
+    """
+    DCNM_VERIFY of controller name as a bool, from a JSON boolean or one
+    of the strings the CLI accepts, e.g. "false"
+    """
+
+    if isinstance(value, bool):
+        return value
+
+    if isinstance(value, str) and value.strip().lower() in _BOOLEANS:
+        return _BOOLEANS[value.strip().lower()]
+
+    raise Exception(
+        f'Fleet controller {name}: DCNM_VERIFY must be true or false'
+    )
+
+
+class fleet:
+    def __init__(self, controllers, secure=True, workers=None,
+                 **session_kwargs):
+        """
+        Initialize instance with the following information:
+          - controllers: dict of controller name to connection data using
+            the same keys as the connection file: DCNM_HOST, DCNM_USER,
+            DCNM_PASS and, optionally, DCNM_VERSION and DCNM_VERIFY
+          - secure: TLS validation for controllers without DCNM_VERIFY
+          - workers: controllers queried concurrently, all by default
+          - remaining keyword arguments are passed on to each session
+        """
+
+        keys = ['DCNM_HOST', 'DCNM_USER', 'DCNM_PASS']
+
+        for name, data in controllers.items():
+            for k in keys:
+                if k not in data:
+                    raise Exception(f'Fleet controller {name}: {k} missing')
+
+            if 'DCNM_VERIFY' in data:
+                _verify(name, data['DCNM_VERIFY'])
+
+        self._controllers = dict(controllers)
+        self._secure = secure
+        self._workers = workers
+        self._session_kwargs = session_kwargs
+
+        self._sessions = dict()
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return f"dcnm/ndfc.fleet {', '.join(self.names())}"
+
+    def __len__(self):
+        return len(self._controllers)
+
+    @classmethod
+    def load(cls, fleet_fname, secure=True, **kwargs):
+        """
+        Read the fleet definition, a JSON dict of controller name to
+        connection data, from fleet_fname
+        """
+
+        if not os.path.exists(fleet_fname):
+            raise Exception(f'Fleet file {fleet_fname} missing')
+
+        with open(fleet_fname, 'r') as f:
+            data = json.load(f)
+
+        return cls(data, secure=secure, **kwargs)
+
+    def names(self):
+        return sorted(self._controllers)
+
+    def session(self, name):
+        """
+        The one session kept per controller, created on first use
+        """
+
+        with self._lock:
+            if name not in self._sessions:
+                data = self._controllers[name]
+
+                kwargs = dict(self._session_kwargs)
+                if 'DCNM_VERSION' in data:
+                    kwargs['version'] = data['DCNM_VERSION']
+
+                secure = self._secure
+                if 'DCNM_VERIFY' in data:
+                    secure = _verify(name, data['DCNM_VERIFY'])
+
+                self._sessions[name] = session(
+                    data['DCNM_HOST'],
+                    data['DCNM_USER'],
+                    data['DCNM_PASS'],
+                    secure=secure,
+                    **kwargs
+                )
+
+            return self._sessions[name]
+
+    def run(self, func, *args, **kwargs):
+        """
+        run(func, *args, **kwargs): call func(conn, *args, **kwargs) for
+        every controller concurrently. Returns (results, errors), two dicts
+        keyed by controller name holding the return value or the exception
+        raised, so one failing controller does not hide the others.
+        """
+
+        names = self.names()
+        workers = self._workers or max(1, len(names))
+
+        def call(name):
+            try:
+                return name, func(self.session(name), *args, **kwargs), None
+            except Exception as err:
+                return name, None, err
+
+        results = dict()
+        errors = dict()
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for name, result, err in pool.map(call, names):
+                if err is not None:
+                    errors[name] = err
+                else:
+                    results[name] = result
+
+        return results, errors
+
+    def close(self):
+        with self._lock:
+            for conn in self._sessions.values():
+                conn.close()
+            self._sessions.clear()
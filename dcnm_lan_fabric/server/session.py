@@ -22,21 +22,47 @@ __contributors__ = [
 __copyright__ = "Copyright (c) 2022 Cisco and/or its affiliates."
 __license__ = "Cisco Sample Code License, Version 1.1"
 
+import time
+import threading
+
 import requests
 from urllib3.exceptions import InsecureRequestWarning
 
 import dcnm_lan_fabric.api
+from .token_cache import token_cache as _token_cache
+from .capabilities import api_family, discover
+from .capabilities import capabilities as _capabilities
+from .capabilities import capability_cache as _capability_cache
+from .transport import CircuitOpen, transport_config, transport_adapter
+from .transport import breaker_for, limiter_for
+from .. import instrument
 
 
 class session(requests.Session):
-    def __init__(self, host, user, password, secure=True, version='12.0'):
+    def __init__(self, host, user, password, secure=True, version=None,
+                 token_cache=None, lifetime=30, renew=5,
+                 capability_cache=None, transport=None):
         """
         Initialize instance with the following information:
-          - host: IP or FQDN of DCNM server
+          - host: IP or FQDN of DCNM server, or a URL such as
+            http://127.0.0.1:8080 for a local stand-in server
           - user, password: valid DCNM credentials with sufficient privileges
             to perform the desired tasks
           - secure: true if we need to validate the TLS/SSL certificates
-          - version: DCNM/NDFC version - examples 11.5(1) or 12.0(2f)
+          - version: DCNM/NDFC version - examples 11.5(1) or 12.0(2f).
+            A configured 12.x version is trusted as is, otherwise the
+            server is probed for its version, assuming 12.0 if not given
+          - token_cache: opt-in on-disk token cache shared across processes,
+            either a token_cache object, a file path or True for the default
+            location
+          - lifetime: requested DCNM 11.x token lifetime in seconds
+          - renew: seconds before token expiry at which to log on again
+          - capability_cache: where version discovery results are kept,
+            in memory by default, or also on disk when a file path or True
+            (default location) is given
+          - transport: transport_config with pool size, retry, timeout,
+            circuit breaker and rate/concurrency limit settings, defaults
+            if not provided
         """
 
         requests.Session.__init__(self)
@@ -46,13 +72,25 @@ class session(requests.Session):
         self.__password = password
         self.__secure = secure
 
-        self.__version = version
-        self.__base_url = f"https://{host}"
-
-        if self.__version[:2] == "11":
-            self.__url = f"{self.__base_url}/rest"
+        # HTTPS unless the host carries a scheme, e.g. a local test server
+        if '://' in host:
+            self.__base_url = host.rstrip('/')
         else:
-            self.__url = f"{self.__base_url}/appcenter/cisco/ndfc/api/v1"  # noqa:E501
+            self.__base_url = f"https://{host}"
+        self.__configured = version
+        self._apply_version(version or '12.0')
+
+        # Version and endpoints are discovered once per host
+        if capability_cache is None:
+            capability_cache = _capability_cache()
+        elif capability_cache is True:
+            capability_cache = _capability_cache(persist=True)
+        elif isinstance(capability_cache, str):
+            capability_cache = _capability_cache(
+                capability_cache, persist=True
+            )
+        self.__capability_cache = capability_cache
+        self.__capabilities = None
 
         # Validate SSL or not
         if not self.__secure:
@@ -61,6 +99,18 @@ class session(requests.Session):
         # If HTTP, ensure we always pass verify=False in session
         self.verify = self.__secure
 
+        # Pooled, retrying transport, the per-host circuit breaker and
+        # rate/concurrency limiter
+        if transport is None:
+            transport = transport_config()
+        self.__transport = transport
+        self.__breaker = breaker_for(host, transport)
+        self.__limiter = limiter_for(host, transport)
+
+        adapter = transport_adapter(transport)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
         # Update headers for JSON operations
         self.headers.update(
             {'Content-Type': 'application/json'}
@@ -68,6 +118,23 @@ class session(requests.Session):
 
         # Are we authenticated to DCNM/NDFC
         self.__authenticated = False
+        self.__lifetime = lifetime
+        self.__renew = renew
+        self.__expires = 0
+
+        # Bumped whenever a new token is applied, so threads whose request
+        # was rejected can tell whether another thread already renewed it
+        self.__generation = 0
+
+        # Serialize logon when the session is shared between threads
+        self.__logon_lock = threading.RLock()
+
+        # Optional token cache shared across processes
+        if token_cache is True:
+            token_cache = _token_cache()
+        elif isinstance(token_cache, str):
+            token_cache = _token_cache(token_cache)
+        self.__token_cache = token_cache or None
 
         # Provide caching of the api object, if needed.
         self._api = None
@@ -80,6 +147,112 @@ class session(requests.Session):
 
         return f"ndfc.requests.Session: {self.__user}@{self.__host}, status {self.__authenticated}"  # noqa:E501
 
+    def _request(self, method, url, **kwargs):
+        """
+        Internal method to issue a request against a DCNM API endpoint
+         - Ensures login credentials are fresh
+         - Replays the request once with a full logon if the token is
+           rejected by the server
+        """
+
+        self.logon()
+
+        url = self.__url + url
+        generation = self.__generation
+        response = self._send(method, url, **kwargs)
+
+        if response.status_code == 401:
+            response.close()
+
+            self.reauthenticate(generation)
+            response = self._send(method, url, **kwargs)
+
+        return response
+
+    def _send(self, method, url, **kwargs):
+        """
+        Internal method to send a request through the circuit breaker and
+        the rate/concurrency limiter.
+        Connection failures, timeouts and status_forcelist responses
+        remaining after the transport retries count against the breaker.
+        """
+
+        if not self.__breaker.allow():
+            raise CircuitOpen(f'Circuit open for {self.__host}, failing fast')
+
+        waited = self.__limiter.acquire()
+        if waited > 0.001:
+            instrument.emit('throttle', host=self.__host, elapsed=waited,
+                            limit=self.__limiter.limit)
+
+        start = time.perf_counter()
+        latency, overloaded = None, False
+        try:
+            response = requests.Session.request(self, method, url, **kwargs)
+        except (requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout) as e:
+            overloaded = True
+            self.__breaker.failure()
+            if instrument.enabled():
+                self._instrument(method, url, start, None, error=repr(e))
+            raise
+        except BaseException:
+            self.__breaker.abandon()
+            raise
+        else:
+            latency = time.perf_counter() - start
+
+            # Other errors, e.g. a 500 for a bad request, are the caller's
+            failed = response.status_code in self.__transport.status_forcelist
+
+            # Responses that needed transport retries also signal load
+            retries = getattr(response.raw, 'retries', None)
+            overloaded = failed or bool(retries and retries.history)
+        finally:
+            self.__limiter.release(latency, overloaded)
+
+        if failed:
+            self.__breaker.failure()
+        else:
+            self.__breaker.success()
+
+        if instrument.enabled():
+            self._instrument(method, url, start, response)
+
+        return response
+
+    def _instrument(self, method, url, start, response, **fields):
+        """
+        Internal method to emit a request event: endpoint without query
+        string, status, body bytes and the retries done by the transport
+        """
+
+        elapsed = time.perf_counter() - start
+        if url.startswith(self.__url):
+            endpoint = url[len(self.__url):]
+        else:
+            endpoint = url[len(self.__base_url):]
+        endpoint = endpoint.split('?', 1)[0]
+
+        if response is not None:
+            fields['status'] = response.status_code
+
+            # Streamed bodies are not read yet, rely on the header
+            if response._content_consumed:
+                fields['bytes'] = len(response.content)
+            else:
+                fields['bytes'] = int(
+                    response.headers.get('Content-Length', 0)
+                )
+
+            retries = getattr(response.raw, 'retries', None)
+            fields['retries'] = len(retries.history) if retries else 0
+
+        instrument.emit(
+            'request', host=self.__host, method=method, endpoint=endpoint,
+            elapsed=elapsed, **fields
+        )
+
     # Some light overloading to make the api calls here reflect
     # the API documentation (/logon)
     def get(self, url, **kwargs):
@@ -89,10 +262,7 @@ class session(requests.Session):
          - URL should be DCNM API endpoint
         """
 
-        self.logon()
-
-        url = self.__url + url
-        return requests.Session.get(self, url, **kwargs)
+        return self._request('GET', url, **kwargs)
 
     def post(self, url, **kwargs):
         """
@@ -101,33 +271,91 @@ class session(requests.Session):
          - URL should be DCNM API endpoint
         """
 
-        self.logon()
+        return self._request('POST', url, **kwargs)
 
-        url = self.__url + url
-        return requests.Session.post(self, url, **kwargs)
+    def put(self, url, **kwargs):
+        """
+        HTTP PUT method call
+         - Ensures login credentials are fresh
+         - URL should be DCNM API endpoint
+        """
+
+        return self._request('PUT', url, **kwargs)
+
+    @property
+    def host(self):
+        """
+        IP or FQDN of the DCNM/NDFC server
+        """
+
+        return self.__host
+
+    @property
+    def transport(self):
+        """
+        transport_config in use by this session
+        """
+
+        return self.__transport
+
+    @property
+    def expires(self):
+        """
+        Epoch seconds at which the current token expires, 0 if none
+        """
+
+        return self.__expires
+
+    def _apply_version(self, version):
+        """
+        Internal method to set the version and matching API base URL
+        """
+
+        self.__version = version
+
+        if api_family(version) == 'v11_5':
+            self.__url = f"{self.__base_url}/rest"
+        else:
+            self.__url = f"{self.__base_url}/appcenter/cisco/ndfc/api/v1"  # noqa:E501
+
+    @property
+    def capabilities(self):
+        """
+        Discovered version and endpoints of the server, probing the server
+        only if no fresh result is cached for this host
+        """
+
+        self._check_version()
+        return self.__capabilities
 
     def _check_version(self):
         """
         Internal method for this class to fetch DCNM service version
         """
 
-        # Not clear if NDFC actually has a version API any longer
-        if self.__version[:2] == "12":
+        if self.__capabilities is not None:
             return self.__version
 
-        # Remainder of code is for DCNM 11.x
-        url = self.__url + '/dcnm-version'
-
-        # Call parent class method because version doesn't require login
-        response = requests.Session.get(self, url)
-        response.raise_for_status()
+        configured = self.__configured
+        if configured and api_family(configured) != 'v11_5':
+            # NDFC needs no probe when its version is configured
+            caps = _capabilities(self.__host, configured, assumed=True)
+        else:
+            caps = self.__capability_cache.load(self.__host)
 
-        result = response.json()
-        if 'Dcnm-Version' not in result:
-            raise Exception('Version key not in {0}'.format(result.keys()))
+        if caps is None:
+            # Call discovery with parent class methods, no login required
+            with instrument.measure('version', host=self.__host) as event:
+                caps = discover(
+                    self, self.__host, self.__base_url, self.__version
+                )
+                event['version'] = caps.version
+            self.__capability_cache.store(caps)
 
         # Update the local value
-        self.__version = result['Dcnm-Version']
+        self.__capabilities = caps
+        self._apply_version(caps.version)
+
         return self.__version
 
     def logon(self):
@@ -137,25 +365,133 @@ class session(requests.Session):
         stores lifetime in seconds but DCNM requires values in milliseconds.
         """
 
-        if self.__authenticated:
+        if self._token_valid():
             return
 
+        with self.__logon_lock:
+            # Another thread may have renewed the token while we waited
+            if self._token_valid():
+                return
+
+            return self._logon()
+
+    def _token_valid(self):
+        """
+        Internal method, True if authenticated and not due for renewal
+        """
+
+        if not self.__authenticated:
+            return False
+
+        return time.time() < self.__expires - self.__renew
+
+    def _logon(self):
+        """
+        Internal method performing the logon, called with the lock held.
+        The new token replaces the header/cookie of the previous one, so
+        requests sent meanwhile never go out without a token.
+        """
+
         version = self._check_version()
 
-        if version[:4] == "11.5":
-            url = self.__base_url + '/rest/logon'
-            return dcnm_lan_fabric.api.dcnm_authenticate(
-                self, url, self.__user, self.__password
-            )
+        if self._restore_token():
+            instrument.emit('auth', host=self.__host, source='token_cache')
+            return True
+
+        with instrument.measure('auth', host=self.__host, source='logon'):
+            if api_family(version) == 'v11_5':
+                url = self.__base_url + '/rest/logon'
+                lifetime = dcnm_lan_fabric.api.dcnm_authenticate(
+                    self, url, self.__user, self.__password, self.__lifetime
+                )
+            else:
+                url = self.__base_url + '/login'
+                lifetime = dcnm_lan_fabric.api.ndfc_authenticate(
+                    self, url, self.__user, self.__password
+                )
+
+        self.__authenticated = True
+        self.__expires = time.time() + lifetime
+        self.__generation += 1
+        self._save_token()
+
+        return True
+
+    def reauthenticate(self, generation=None):
+        """
+        Replace the current token, e.g. after the server rejected it, by
+        logging on again. A token loaded from the token cache is
+        invalidated there as well so other processes stop using it.
+          - generation: token generation the rejected request was sent
+            with. If another thread renewed the token since, it is used
+            instead of logging on again.
+        """
 
-        if version[:4] == "12.0":
-            url = self.__base_url + '/login'
-            return dcnm_lan_fabric.api.ndfc_authenticate(
-                self, url, self.__user, self.__password
-            )
+        with self.__logon_lock:
+            if generation is not None and generation != self.__generation:
+                return True
+
+            if self.__token_cache is not None:
+                self.__token_cache.invalidate(self.__host, self.__user)
+
+            return self._logon()
 
-        # Probably should raise an exception here instead
-        return False
+    def _restore_token(self):
+        """
+        Internal method to load the Dcnm-Token header or NDFC cookies from
+        the token cache, if enabled. Returns True if a token was applied.
+        """
+
+        if self.__token_cache is None:
+            return False
+
+        entry = self.__token_cache.load(self.__host, self.__user)
+        if entry is None:
+            return False
+
+        # Not worth using if it is already due for renewal
+        if entry['expires'] - self.__renew <= time.time():
+            return False
+
+        self.headers.update(entry.get('headers', {}))
+        self.cookies.update(entry.get('cookies', {}))
+
+        self.__authenticated = True
+        self.__expires = entry['expires']
+        self.__generation += 1
+
+        return True
+
+    def _save_token(self):
+        """
+        Internal method to store the current token in the token cache
+        """
+
+        if self.__token_cache is None:
+            return
+
+        headers = {}
+        if 'Dcnm-Token' in self.headers:
+            headers['Dcnm-Token'] = self.headers['Dcnm-Token']
+
+        cookies = requests.utils.dict_from_cookiejar(self.cookies)
+
+        self.__token_cache.store(
+            self.__host, self.__user, headers, cookies, self.__expires
+        )
+
+    def _drop_token(self):
+        """
+        Internal method to forget the current token, header and cookies
+        """
+
+        if 'Dcnm-Token' in self.headers:
+            self.headers.pop('Dcnm-Token')
+
+        self.cookies.clear()
+
+        self.__authenticated = False
+        self.__expires = 0
 
     def logout(self):
         """
@@ -165,7 +501,7 @@ class session(requests.Session):
         """
 
         # Currently no logout option for NDFC?
-        if self.__version[:2] == "12":
+        if api_family(self.__version) != 'v11_5':
             return
 
         if self.__authenticated:
@@ -175,20 +511,20 @@ class session(requests.Session):
             response.raise_for_status()
 
         # Token is either invalidated or expired now
-        if 'Dcnm-Token' in self.headers:
-            self.headers.pop('Dcnm-Token')
+        if self.__token_cache is not None:
+            self.__token_cache.invalidate(self.__host, self.__user)
+
+        self._drop_token()
 
     def api(self):
         """
         Based on DCNM server version, generate the API object in order
-        to reference the correct methods/endpoints for this SDK.
+        to reference the correct methods/endpoints for this SDK. Logon is
+        deferred until the first request is sent.
         """
-        self.logon()
 
         if self._api is None:
-            if self.__version[:4] == '11.5':
-                self._api = dcnm_lan_fabric.api.v11_5(self)
-            if self.__version[:4] == '12.0':
-                self._api = dcnm_lan_fabric.api.v12_0(self)
+            api_name = self.capabilities.api_name
+            self._api = getattr(dcnm_lan_fabric.api, api_name)(self)
 
         return self._api
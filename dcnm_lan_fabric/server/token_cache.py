@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Copyright (c) 2022 Cisco and/or its affiliates.
+
+This software is licensed to you under the terms of the Cisco Sample
+Code License, Version 1.1 (the "License"). You may obtain a copy of the
+License at
+
+               https://developer.cisco.com/docs/licenses
+
+All use of the material herein must be in accordance with the terms of
+the License. All rights not expressly granted by the License are
+reserved. Unless required by applicable law or agreed to separately in
+writing, software distributed under the License is distributed on an "AS
+IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+or implied.
+"""
+
+__author__ = "Dr Timothy E Miller <timmil@cisco.com>"
+__contributors__ = [
+]
+__copyright__ = "Copyright (c) 2022 Cisco and/or its affiliates."
+__license__ = "Cisco Sample Code License, Version 1.1"
+
+import os
+import json
+import time
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows, updates are then not serialized
+    fcntl = None
+
+
+def default_cache_dir():
+    """
+    Directory used for on-disk caches unless the caller provides a path.
+    Honors XDG_CACHE_HOME, falling back to ~/.cache
+    """
+
+    base = os.environ.get('XDG_CACHE_HOME', '')
+    if base == '':
+        base = os.path.join(os.path.expanduser('~'), '.cache')
+
+    return os.path.join(base, 'dcnm_lan_fabric')
+
+
+def write_private(fname, data):
+    """
+    Atomically write data (str) to fname so only the owner can read it.
+    The parent directory is created, also owner-only, when missing.
+    """
+
+    dirname = os.path.dirname(os.path.abspath(fname))
+    os.makedirs(dirname, mode=0o700, exist_ok=True)
+
+    fd, tmp_name = tempfile.mkstemp(dir=dirname, prefix='.tmp-')
+    try:
+        os.chmod(tmp_name, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            f.write(data)
+        os.replace(tmp_name, fname)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+@contextmanager
+def locked(path):
+    """
+    Hold an exclusive lock on path + '.lock', so processes updating the
+    same cache file at the same time don't lose each other's entries
+    """
+
+    if fcntl is None:
+        yield
+        return
+
+    dirname = os.path.dirname(os.path.abspath(path))
+    os.makedirs(dirname, mode=0o700, exist_ok=True)
+
+    fd = os.open(path + '.lock', os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        # Closing the descriptor releases the lock
+        os.close(fd)
+
+
+class token_cache:
+    def __init__(self, path=None, skew=5):
+        """
+        Initialize instance with the following information:
+          - path: JSON file holding the cached tokens, defaults to
+            tokens.json in the user cache directory
+          - skew: seconds before expiry at which an entry is treated as
+            already expired
+        """
+
+        if path is None:
+            path = os.path.join(default_cache_dir(), 'tokens.json')
+
+        self.path = path
+        self.skew = skew
+
+    def __str__(self):
+        return f"dcnm/ndfc.token_cache {self.path}"
+
+    @staticmethod
+    def key(host, user):
+        return f"{user}@{host}"
+
+    def _read(self):
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        if not isinstance(data, dict):
+            return {}
+
+        return data
+
+    def _write(self, data):
+        # Drop anything that already expired while we are rewriting
+        now = time.time()
+        data = {
+            k: v for k, v in data.items() if v.get('expires', 0) > now
+        }
+
+        write_private(self.path, json.dumps(data))
+
+    def load(self, host, user):
+        """
+        load(host, user): return the cached entry, a dict with the headers,
+        cookies and expires (epoch seconds) keys, or None if there is no
+        entry or it is (about to be) expired.
+        """
+
+        entry = self._read().get(self.key(host, user))
+        if entry is None:
+            return None
+
+        if entry.get('expires', 0) - self.skew <= time.time():
+            return None
+
+        return entry
+
+    def store(self, host, user, headers, cookies, expires):
+        """
+        store(host, user, headers, cookies, expires): save the auth headers
+        and cookies for host/user until expires (epoch seconds)
+        """
+
+        with locked(self.path):
+            data = self._read()
+            data[self.key(host, user)] = {
+                'headers': dict(headers),
+                'cookies': dict(cookies),
+                'expires': expires,
+            }
+
+            self._write(data)
+
+    def invalidate(self, host, user):
+        """
+        invalidate(host, user): remove the entry, e.g. after the server
+        rejected the cached token
+        """
+
+        with locked(self.path):
+            data = self._read()
+            if data.pop(self.key(host, user), None) is not None:
+                self._write(data)
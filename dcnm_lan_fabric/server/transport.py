@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Copyright (c) 2022 Cisco and/or its affiliates.
+
+This software is licensed to you under the terms of the Cisco Sample
+Code License, Version 1.1 (the "License"). You may obtain a copy of the
+License at
+
+               https://developer.cisco.com/docs/licenses
+
+All use of the material herein must be in accordance with the terms of
+the License. All rights not expressly granted by the License are
+reserved. Unless required by applicable law or agreed to separately in
+writing, software distributed under the License is distributed on an "AS
+IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+or implied.
+"""
+
+__author__ = "Dr Timothy E Miller <timmil@cisco.com>"
+__contributors__ = [
+]
+__copyright__ = "Copyright (c) 2022 Cisco and/or its affiliates."
+__license__ = "Cisco Sample Code License, Version 1.1"
+
+import time
+import random
+import threading
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class CircuitOpen(Exception):
+    pass
+
+
+class transport_config:
+    def __init__(self, pool_size=10, retries=3, backoff=0.5, backoff_max=30,
+                 jitter=0.5, timeout=(10, 120),
+                 status_forcelist=(429, 502, 503, 504),
+                 breaker_threshold=5, breaker_reset=30, rate=None,
+                 burst=None, concurrency=None, min_concurrency=1,
+                 latency_factor=2.0, host_limits=None):
+        """
+        Initialize instance with the following information:
+          - pool_size: connections kept per host, match it to the number
+            of concurrent workers sharing a session
+          - retries: retries for idempotent requests (GET, PUT, ...)
+          - backoff, backoff_max: exponential backoff factor and ceiling
+            in seconds between retries
+          - jitter: fraction of the backoff added at random
+          - timeout: (connect, read) timeout in seconds, or a single value
+          - status_forcelist: response codes that are retried
+          - breaker_threshold: consecutive failures that open the circuit
+          - breaker_reset: seconds the circuit stays open before a trial
+            request is let through
+          - rate, burst: token bucket cap in requests per second and the
+            burst allowed above it, no cap if rate is None
+          - concurrency: ceiling of the adaptive in-flight request limit,
+            defaults to pool_size
+          - min_concurrency: floor the limit is cut down to under load
+          - latency_factor: the limit is cut when recent latency exceeds
+            the long-term average by this factor
+          - host_limits: per host overrides of the keys above, e.g.
+            {'ndfc1.example.com': {'rate': 5, 'concurrency': 4}}
+        """
+
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.timeout = timeout
+        self.status_forcelist = tuple(status_forcelist)
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self.min_concurrency = min_concurrency
+        self.latency_factor = latency_factor
+        self.host_limits = dict(host_limits or {})
+
+    def limits(self, host):
+        """
+        Rate and concurrency settings for host, host_limits applied
+        """
+
+        limits = {
+            'rate': self.rate,
+            'burst': self.burst,
+            'concurrency': self.concurrency or self.pool_size,
+            'min_concurrency': self.min_concurrency,
+            'latency_factor': self.latency_factor,
+        }
+        limits.update(self.host_limits.get(host, {}))
+        return limits
+
+    def __str__(self):
+        return f"dcnm/ndfc.transport_config pool {self.pool_size}, retries {self.retries}, timeout {self.timeout}"  # noqa:E501
+
+
+class jitter_retry(Retry):
+    """
+    urllib3 Retry with a ceiling on the backoff and random jitter added, so
+    many clients backing off at once do not retry in lockstep. Retry-After
+    headers on 429/503 responses take precedence over the backoff.
+    """
+
+    jitter = 0
+    backoff_max = Retry.BACKOFF_MAX
+
+    def new(self, **kw):
+        retry = Retry.new(self, **kw)
+        retry.jitter = self.jitter
+        retry.backoff_max = self.backoff_max
+        return retry
+
+    def get_backoff_time(self):
+        backoff = Retry.get_backoff_time(self)
+        if backoff <= 0:
+            return 0
+
+        backoff += random.uniform(0, self.jitter * backoff)
+        return min(self.backoff_max, backoff)
+
+
+def build_retry(config):
+    """
+    Retry policy for config. Only idempotent methods are retried, POST is
+    never replayed by the transport.
+    """
+
+    kwargs = dict(
+        total=config.retries,
+        connect=config.retries,
+        read=config.retries,
+        status=config.retries,
+        status_forcelist=config.status_forcelist,
+        backoff_factor=config.backoff,
+        raise_on_status=False,
+        respect_retry_after_header=True,
+    )
+
+    try:
+        retry = jitter_retry(allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+                             **kwargs)
+    except (AttributeError, TypeError):
+        # urllib3 before 1.26
+        retry = jitter_retry(method_whitelist=Retry.DEFAULT_METHOD_WHITELIST,
+                             **kwargs)
+
+    retry.jitter = config.jitter
+    retry.backoff_max = config.backoff_max
+    return retry
+
+
+class transport_adapter(HTTPAdapter):
+    def __init__(self, config):
+        """
+        HTTPAdapter sized, retried and timed out according to config
+        """
+
+        # HTTPAdapter keeps its own 'config' attribute
+        self.transport = config
+
+        HTTPAdapter.__init__(
+            self,
+            pool_connections=config.pool_size,
+            pool_maxsize=config.pool_size,
+            max_retries=build_retry(config)
+        )
+
+    def send(self, request, timeout=None, **kwargs):
+        if timeout is None:
+            timeout = self.transport.timeout
+
+        return HTTPAdapter.send(self, request, timeout=timeout, **kwargs)
+
+
+class circuit_breaker:
+    def __init__(self, threshold=5, reset=30):
+        """
+        Fail fast once a host returned threshold consecutive failures. After
+        reset seconds a single trial request is let through; success closes
+        the circuit, failure keeps it open for another reset period.
+        """
+
+        self.threshold = threshold
+        self.reset = reset
+
+        self._failures = 0
+        self._opened = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened is None:
+                return 'closed'
+            if time.time() - self._opened < self.reset:
+                return 'open'
+            return 'half-open'
+
+    def allow(self):
+        with self._lock:
+            if self._opened is None:
+                return True
+
+            if time.time() - self._opened < self.reset or self._trial:
+                return False
+
+            # Half-open, let exactly one request probe the server
+            self._trial = True
+            return True
+
+    def success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened = None
+            self._trial = False
+
+    def failure(self):
+        with self._lock:
+            self._failures += 1
+
+            if self._trial or self._failures >= self.threshold:
+                self._opened = time.time()
+                self._trial = False
+
+    def abandon(self):
+        """
+        Settle a request that failed for reasons unrelated to the host's
+        health, so a pending half-open trial doesn't block the host forever
+        """
+
+        with self._lock:
+            self._trial = False
+
+
+class token_bucket:
+    def __init__(self, rate, burst=None):
+        """
+        Allow rate requests per second on average and bursts of up to
+        burst requests, at least one
+        """
+
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst or rate))
+
+        self._tokens = self.burst
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Take a token, sleeping until one is available. Returns the seconds
+        waited.
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._stamp) * self.rate
+            )
+            self._stamp = now
+
+            # Reserve the token now, callers queue up in arrival order
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class adaptive_limiter:
+    # Weights of the recent and long-term latency averages
+    SHORT = 0.3
+    LONG = 0.05
+
+    def __init__(self, rate=None, burst=None, concurrency=10,
+                 min_concurrency=1, latency_factor=2.0):
+        """
+        Token bucket rate cap plus an AIMD limit on requests in flight.
+        The limit grows by one per limit successful requests, and is halved
+        on overload responses (status_forcelist), connection errors,
+        retried requests or when recent latency exceeds latency_factor
+        times the long-term average. Cuts are at most once per average
+        round trip, so requests in flight when the server slowed down count
+        as a single signal, and a latency rise cuts once before it becomes
+        the new baseline.
+        """
+
+        self.bucket = token_bucket(rate, burst) if rate else None
+        self.max_limit = max(1, int(concurrency))
+        self.min_limit = max(1, min(int(min_concurrency), self.max_limit))
+        self.latency_factor = latency_factor
+
+        self._limit = float(self.max_limit)
+        self._in_flight = 0
+        self._short = None
+        self._long = None
+        self._cut = 0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self):
+        return int(self._limit)
+
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+    def acquire(self):
+        """
+        Wait for the rate cap and a free slot. Returns the seconds waited.
+        """
+
+        start = time.monotonic()
+
+        if self.bucket is not None:
+            self.bucket.acquire()
+
+        with self._cond:
+            while self._in_flight >= int(self._limit):
+                self._cond.wait()
+            self._in_flight += 1
+
+        return time.monotonic() - start
+
+    def release(self, latency=None, overloaded=False):
+        """
+        Free the slot, adjusting the limit with the outcome of the request
+        """
+
+        with self._cond:
+            self._in_flight -= 1
+
+            if latency is not None:
+                if self._long is None:
+                    self._short = self._long = latency
+                else:
+                    self._short += self.SHORT * (latency - self._short)
+                    self._long += self.LONG * (latency - self._long)
+
+                slow = self._short > self.latency_factor * self._long
+            else:
+                slow = False
+
+            now = time.monotonic()
+            if overloaded or slow:
+                if now - self._cut > (self._long or 0):
+                    self._limit = max(self.min_limit, self._limit / 2)
+                    self._cut = now
+
+                    # One cut per latency rise, then it is the new normal
+                    if slow:
+                        self._long = self._short
+            else:
+                self._limit = min(
+                    self.max_limit, self._limit + 1 / self._limit
+                )
+
+            self._cond.notify_all()
+
+
+# One breaker and limiter per host and settings, shared by every session
+# in the process using the same settings. Sessions configured differently
+# for a host get their own, so the first session's thresholds and rates
+# never apply to the others.
+_breakers = dict()
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(host, config):
+    key = (host, config.breaker_threshold, config.breaker_reset)
+
+    with _breakers_lock:
+        if key not in _breakers:
+            _breakers[key] = circuit_breaker(
+                config.breaker_threshold, config.breaker_reset
+            )
+        return _breakers[key]
+
+
+_limiters = dict()
+_limiters_lock = threading.Lock()
+
+
+def limiter_for(host, config):
+    limits = config.limits(host)
+    key = (host,) + tuple(sorted(limits.items()))
+
+    with _limiters_lock:
+        if key not in _limiters:
+            _limiters[key] = adaptive_limiter(**limits)
+        return _limiters[key]
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+
+import threading
+
+from dcnm_lan_fabric.api.cache import response_cache
+from dcnm_lan_fabric.api.lan_fabric import api
+
+
+class response:
+    def __init__(self, data):
+        self.data = data
+        self.content = b''
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+class conn:
+    """
+    Stand-in session serving one resource, whose GETs can be held until
+    the test releases them
+    """
+
+    host = 'dcnm'
+
+    def __init__(self):
+        self.value = 'old'
+        self.gets = 0
+        self.sent = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def get(self, url, **kwargs):
+        self.gets += 1
+        value = self.value
+        self.sent.set()
+        self.release.wait(5)
+        return response({'value': value})
+
+    def post(self, url, **kwargs):
+        self.value = kwargs.get('data', 'new')
+        return response({})
+
+    put = post
+
+
+def test_get_cached():
+    c = conn()
+    a = api(c).use_cache(response_cache())
+
+    assert a.get('/fabrics/f1') == {'value': 'old'}
+    assert a.get('/fabrics/f1') == {'value': 'old'}
+    assert c.gets == 1
+
+
+def test_post_invalidates_path_and_parents():
+    c = conn()
+    cache = response_cache()
+    a = api(c).use_cache(cache)
+
+    a.get('/fabrics')
+    a.get('/fabrics/f1')
+    a.get('/fabrics/f1/switches')
+    a.get('/templates')
+
+    a.post('/fabrics/f1', data='new')
+
+    assert len(cache) == 1
+    assert a.get('/fabrics/f1/switches') == {'value': 'new'}
+
+
+def test_linked_paths_invalidated():
+    class linked(api):
+        cache_links = {'/fabrics': ['/inventory']}
+
+    c = conn()
+    cache = response_cache()
+    a = linked(c).use_cache(cache)
+
+    a.get('/inventory/switches')
+    a.get('/templates')
+    a.post('/fabrics/f1/switches', data='new')
+
+    assert len(cache) == 1
+    assert a.get('/inventory/switches') == {'value': 'new'}
+
+
+def test_get_in_flight_during_post_not_stored():
+    c = conn()
+    cache = response_cache()
+    a = api(c).use_cache(cache)
+
+    # Hold the GET after the server answered with the old value
+    c.release.clear()
+    result = {}
+    reader = threading.Thread(
+        target=lambda: result.update(first=a.get('/fabrics/f1'))
+    )
+    reader.start()
+    assert c.sent.wait(5)
+
+    a.post('/fabrics/f1', data='new')
+
+    c.release.set()
+    reader.join(5)
+
+    assert result['first'] == {'value': 'old'}
+    assert len(cache) == 0
+    assert a.get('/fabrics/f1') == {'value': 'new'}
+
+
+def test_ttl_zero_disables_prefix():
+    c = conn()
+    cache = response_cache(ttls={'/fabrics': 0})
+    a = api(c).use_cache(cache)
+
+    a.get('/fabrics/f1')
+    a.get('/fabrics/f1')
+    a.get('/templates')
+
+    assert c.gets == 3
+    assert len(cache) == 1
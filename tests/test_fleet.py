@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+import pytest
+
+from dcnm_lan_fabric.server.fleet import fleet
+
+
+def controller(**kwargs):
+    return dict(
+        DCNM_HOST='http://127.0.0.1:1', DCNM_USER='admin', DCNM_PASS='x',
+        DCNM_VERSION='12.0', **kwargs
+    )
+
+
+@pytest.mark.parametrize('value,secure', [
+    (False, False), (True, True), ('false', False), ('False', False),
+    ('0', False), ('no', False), ('true', True), ('1', True), ('on', True),
+])
+def test_verify_parsed(value, secure):
+    controllers = fleet({'c1': controller(DCNM_VERIFY=value)})
+
+    assert controllers.session('c1').verify is secure
+
+
+def test_verify_default():
+    controllers = fleet({'c1': controller()}, secure=False)
+
+    assert controllers.session('c1').verify is False
+
+
+@pytest.mark.parametrize('value', ['maybe', '', 0, None, []])
+def test_verify_rejected(value):
+    with pytest.raises(Exception, match='c1: DCNM_VERIFY must be'):
+        fleet({'c1': controller(DCNM_VERIFY=value)})
+
+
+def test_missing_key():
+    data = controller()
+    del data['DCNM_PASS']
+
+    with pytest.raises(Exception, match='c1: DCNM_PASS missing'):
+        fleet({'c1': data})
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+from dcnm_lan_fabric.sdk.inventory.inventory import inventory_store
+
+
+def switch(serial, fabric='f1', role='leaf', **kwargs):
+    return dict(
+        serialNumber=serial, logicalName=f'sw-{serial}', fabricName=fabric,
+        ipAddress=f'10.0.0.{serial}', switchRole=role, **kwargs
+    )
+
+
+class api:
+    """
+    Stand-in API serving the inventory in switches
+    """
+
+    def __init__(self, switches):
+        self.switches = switches
+
+    def get_switch_inventory(self, fields=None):
+        return list(self.switches)
+
+    def get_fabric_inventory(self, fabric_name, fields=None):
+        return [x for x in self.switches if x['fabricName'] == fabric_name]
+
+
+def serials(records):
+    return [x['serialNumber'] for x in records]
+
+
+def test_lookups_in_server_order():
+    source = api([switch(3), switch(1, 'f2'), switch(2, role='spine'),
+                  switch(4)])
+    store = inventory_store(source)
+    store.ensure()
+
+    assert serials(store.fabric('f1')) == [3, 2, 4]
+    assert serials(store.role('leaf')) == [3, 1, 4]
+    assert store.by_name('sw-2')['serialNumber'] == 2
+    assert store.by_ip('10.0.0.1')['fabricName'] == 'f2'
+    assert store.fabrics() == ['f1', 'f2']
+
+
+def test_changed_switch_keeps_position():
+    source = api([switch(1), switch(2), switch(3)])
+    store = inventory_store(source)
+    store.ensure()
+
+    source.switches[0] = switch(1, role='spine')
+    report = store.refresh('f1')
+
+    assert report == {'added': [], 'changed': [1], 'removed': []}
+    assert serials(store.fabric('f1')) == [1, 2, 3]
+    assert serials(store.role('spine')) == [1]
+    assert serials(store.role('leaf')) == [2, 3]
+
+
+def test_full_refresh_follows_server_order():
+    source = api([switch(1), switch(2), switch(3)])
+    store = inventory_store(source)
+    store.ensure()
+
+    source.switches = [switch(4), switch(3), switch(1)]
+    report = store.refresh()
+
+    assert report == {'added': [4], 'changed': [], 'removed': [2]}
+    assert serials(store.fabric('f1')) == [4, 3, 1]
+    assert serials(store) == [4, 3, 1]
+
+    # Switches added later are listed last
+    source.switches.append(switch(0))
+    store.refresh('f1')
+    assert serials(store.fabric('f1')) == [4, 3, 1, 0]
+
+
+def test_invalidate_marks_scope_stale():
+    source = api([switch(1), switch(2, 'f2')])
+    store = inventory_store(source)
+    store.ensure()
+
+    source.switches.append(switch(3))
+    store.ensure('f1')
+    assert len(store) == 2
+
+    store.invalidate('f1')
+    store.ensure('f2')
+    assert len(store) == 2
+    store.ensure('f1')
+    assert serials(store.fabric('f1')) == [1, 3]
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+import json
+
+from dcnm_lan_fabric.actions import core
+
+
+class api:
+    """
+    Stand-in API with a POAP list. The first post registers its first
+    switch and then fails, as a controller timing out half way would.
+    """
+
+    def __init__(self, serials):
+        self.poap = {x: {'model': 'N9K'} for x in serials}
+        self.posted = []
+        self.fail = 1
+
+    def get_bootstrap_devices(self, fabric_name):
+        return dict(self.poap)
+
+    def create_bootstrap_devices(self, fabric_name, data):
+        switches = json.loads(data)
+        self.posted.append([x['serialNumber'] for x in switches])
+
+        if self.fail:
+            self.fail -= 1
+            del self.poap[switches[0]['serialNumber']]
+            raise Exception('timeout')
+
+        for sw in switches:
+            del self.poap[sw['serialNumber']]
+        return {'status': 'Success'}
+
+
+class conn:
+    def __init__(self, api):
+        self._api = api
+
+    def api(self):
+        return self._api
+
+
+def switches(*serials):
+    return [
+        core.switch_info(x, f'sw-{x}', f'10.0.0.{n}', 'admin', 'x', 'leaf')
+        for n, x in enumerate(serials)
+    ]
+
+
+def test_retry_skips_switches_left_poap():
+    source = api(['S1', 'S2', 'S3'])
+
+    output = core.poap_register_switch(
+        conn(source), 'f1', switches('S1', 'S2', 'S3'), batch_size=3,
+        retries=1
+    )
+
+    assert source.posted == [['S1', 'S2', 'S3'], ['S2', 'S3']]
+    assert output['sw-S1'] == \
+        'Failed: timeout (no longer in POAP, not retried)'
+    assert output['sw-S2'] == output['sw-S3'] == 'Success'
+
+
+def test_status_per_chunk():
+    source = api(['S1', 'S2', 'S3'])
+    source.fail = 0
+
+    output = core.poap_register_switch(
+        conn(source), 'f1', switches('S1', 'S2', 'S3'), batch_size=2
+    )
+
+    assert source.posted == [['S1', 'S2'], ['S3']]
+    assert list(output) == ['sw-S1', 'sw-S2', 'sw-S3']
+    assert set(output.values()) == {'Success'}
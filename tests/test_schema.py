@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+from types import SimpleNamespace
+
+import pytest
+
+from dcnm_lan_fabric.sdk.template.schema import InvalidNvpairs
+from dcnm_lan_fabric.sdk.template.schema import parameter_schema
+from dcnm_lan_fabric.sdk.template.schema import template_schema
+from dcnm_lan_fabric.sdk.template.template import template_parameter
+
+
+def parameter(ptype, name='P', required=False, **meta):
+    return template_parameter({
+        'name': name,
+        'description': '',
+        'parameterType': ptype,
+        'metaProperties': {k: str(v) for k, v in meta.items()},
+        'annotations': {'IsMandatory': 'true' if required else 'false'},
+    })
+
+
+# parameterType, metaProperties, valid values, invalid values
+CASES = [
+    ('integer', {'min': 1, 'max': 10}, ['1', '10', 5],
+     ['0', '11', '1.5', 'x']),
+    ('long', {}, ['-5', '99999999999'], ['', '1e3']),
+    ('float', {'min': 0.5}, ['0.5', '2', 1.5], ['0.4', 'abc']),
+    ('integerRange', {'min': 1, 'max': 4094},
+     ['10', '10-20', '1, 5-7'], ['20-10', '0-5', '1-4095', 'a-b']),
+    ('boolean', {}, ['true', 'False', True, False], ['yes', '1']),
+    ('ipAddress', {}, ['10.0.0.1', 'fe80::1'], ['10.0.0.256', 'host']),
+    ('ipV4Address', {}, ['192.168.1.1'], ['fe80::1', '1.2.3']),
+    ('ipV6Address', {}, ['2001:db8::1'], ['10.0.0.1']),
+    ('ipAddressWithSubnet', {}, ['10.0.0.1/24', 'fe80::1/64'],
+     ['10.0.0.1', '10.0.0.1/33']),
+    ('ipV4AddressWithSubnet', {}, ['10.1.1.1/30'], ['fe80::1/64']),
+    ('ipV6AddressWithSubnet', {}, ['2001:db8::1/64'], ['10.1.1.1/30']),
+    ('ipAddressList', {}, ['10.0.0.1, fe80::1'], ['10.0.0.1, x']),
+    ('ipV4AddressList', {}, ['10.0.0.1,10.0.0.2'], ['10.0.0.1, fe80::1']),
+    ('macAddress', {}, ['00:11:22:aa:bb:cc', '0011.22aa.bbcc'],
+     ['00:11:22:aa:bb', 'zz:11:22:aa:bb:cc']),
+    ('string', {'minLength': 2, 'maxLength': 4}, ['ab', 'abcd'],
+     ['a', 'abcde']),
+    ('string', {'regularExpr': '[a-z]+[0-9]'}, ['vrf1'], ['vrf', '1vrf']),
+    ('enum', {'validValues': 'p2p, ipv4'}, ['p2p', 'ipv4'], ['P2P', '']),
+]
+
+
+@pytest.mark.parametrize('ptype,meta,valid,invalid', CASES)
+def test_check_per_type(ptype, meta, valid, invalid):
+    schema = parameter_schema(parameter(ptype, **meta))
+
+    for value in valid:
+        assert schema.check(value) is None, value
+    for value in invalid:
+        assert schema.check(value) is not None, value
+
+
+def test_unknown_type_and_bad_pattern_accept_anything():
+    schema = parameter_schema(
+        parameter('interfaceRange', regularExpr='(?<name>x)')
+    )
+
+    assert schema.pattern is None
+    assert schema.check('Ethernet1/1-4') is None
+
+
+def test_min_max_only_for_numbers():
+    schema = parameter_schema(parameter('string', min=5, max=6))
+
+    assert schema.check('abc') is None
+
+
+def template(*parameters):
+    return SimpleNamespace(name='T', parameters=list(parameters))
+
+
+def test_template_errors():
+    schema = template_schema(template(
+        parameter('integer', 'VLAN', required=True, min=2, max=4094),
+        parameter('string', 'NAME', required=True, defaultValue='x'),
+        parameter('boolean', 'ENABLE'),
+    ))
+
+    assert schema.required == {'VLAN'}
+    assert schema.defaults() == {'NAME': 'x'}
+
+    assert schema.errors({'VLAN': '10', 'ENABLE': ''}) == []
+    assert schema.errors({'ENABLE': 'yes', 'OTHER': 1}) == [
+        'VLAN: required',
+        "ENABLE: 'yes' is not a valid boolean",
+        'OTHER: not a parameter of T',
+    ]
+    assert schema.errors({'VLAN': 1, 'OTHER': 1}, strict=False) == [
+        "VLAN: '1' is below the minimum 2",
+    ]
+
+
+def test_template_check():
+    schema = template_schema(template(parameter('integer', 'VLAN')))
+
+    assert schema.validate([{'VLAN': 1}, 'bad', {'VLAN': 'x'}]) == {
+        1: ['not an nvPairs dict'],
+        2: ["VLAN: 'x' is not a valid integer"],
+    }
+    schema.check([{'VLAN': 1}])
+
+    with pytest.raises(InvalidNvpairs) as err:
+        schema.check([{'VLAN': 1}, {'VLAN': 'x'}])
+    assert err.value.errors == {1: ["VLAN: 'x' is not a valid integer"]}
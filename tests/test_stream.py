@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+import json
+
+import pytest
+
+from dcnm_lan_fabric.api.stream import iter_json_array, project
+
+RECORDS = [
+    {'name': 'leaf-ü', 'note': 'brackets ] [ and , inside', 'id': 1},
+    {'name': '主机', 'nested': {'list': [1, 2, ']'], 'emoji': '🚀'}},
+    'escaped \\"] quote',
+    12345,
+    -1.5e3,
+    True,
+    None,
+    [],
+    {},
+]
+
+
+def body(data, **kwargs):
+    return json.dumps(data, ensure_ascii=False, **kwargs).encode('utf-8')
+
+
+@pytest.mark.parametrize('indent', [None, 2])
+def test_every_split_offset(indent):
+    data = body(RECORDS, indent=indent)
+
+    # Splits land inside multibyte characters, strings and numbers
+    for offset in range(len(data) + 1):
+        chunks = [data[:offset], data[offset:]]
+        assert list(iter_json_array(chunks)) == RECORDS, offset
+
+
+def test_single_byte_chunks():
+    data = body(RECORDS)
+
+    chunks = [data[x:x + 1] for x in range(len(data))]
+    assert list(iter_json_array(chunks)) == RECORDS
+
+
+def test_empty_and_whitespace():
+    assert list(iter_json_array([])) == []
+    assert list(iter_json_array([b'  ', b'\n'])) == []
+    assert list(iter_json_array([b' [', b' ] '])) == []
+
+
+def test_not_an_array():
+    data = body({'error': 'Not found ]'})
+
+    for offset in range(len(data) + 1):
+        chunks = [data[:offset], data[offset:]]
+        assert list(iter_json_array(chunks)) == [{'error': 'Not found ]'}]
+
+
+def test_stops_early():
+    def chunks():
+        yield b'[{"a": 1}, '
+        raise AssertionError('read past the first record')
+
+    assert next(iter(iter_json_array(chunks()))) == {'a': 1}
+
+
+@pytest.mark.parametrize('data', [b'[1, 2', b'[1 2]', b'[{"a": 1]', b'["ab'])
+def test_malformed(data):
+    with pytest.raises(ValueError):
+        list(iter_json_array([data]))
+
+
+def test_project():
+    record = {'a': 1, 'b': 2}
+
+    assert project(record, ['a', 'c']) == {'a': 1}
+    assert project(record, None) is record
+    assert project('scalar', ['a']) == 'scalar'
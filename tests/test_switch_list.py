@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+import pytest
+import requests
+
+from dcnm_lan_fabric.actions import core
+
+SWITCHES = [
+    {'logicalName': 'leaf1', 'ipAddress': '10.0.0.1', 'fabricName': 'f1'},
+    {'logicalName': 'leaf2', 'ipAddress': '10.0.0.2', 'fabricName': 'f2'},
+]
+
+
+class api_v11:
+    def __init__(self):
+        self.full = 0
+
+    def get_switch_inventory(self, fields=None):
+        self.full += 1
+        return list(SWITCHES)
+
+
+class api_v12(api_v11):
+    def get_fabric_inventory(self, fabric_name, fields=None):
+        switches = [x for x in SWITCHES if x['fabricName'] == fabric_name]
+        if not switches:
+            response = requests.Response()
+            response.status_code = 404
+            raise requests.exceptions.HTTPError(response=response)
+        return switches
+
+
+class conn:
+    def __init__(self, api):
+        self._api = api
+
+    def api(self):
+        return self._api
+
+
+def test_scoped_endpoint_used():
+    api = api_v12()
+
+    switches = core.get_switch_list(conn(api), ['f1', 'f2'])
+
+    assert [x['name'] for x in switches] == ['leaf1', 'leaf2']
+    assert api.full == 0
+
+
+def test_unknown_fabric_reported():
+    api = api_v12()
+
+    with pytest.raises(Exception, match='Fabric typo missing'):
+        core.get_switch_list(conn(api), 'typo')
+    with pytest.raises(Exception, match='Fabric typo missing'):
+        list(core.iter_switch_list(conn(api), 'typo'))
+
+    # No fallback to the full inventory
+    assert api.full == 0
+
+
+def test_full_inventory_without_scoped_endpoint():
+    api = api_v11()
+
+    switches = core.get_switch_list(conn(api), 'f2')
+
+    assert switches == [{'name': 'leaf2', 'ip': '10.0.0.2', 'fabric': 'f2'}]
+    assert api.full == 1
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+
+import itertools
+import threading
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from dcnm_lan_fabric.server import session
+from dcnm_lan_fabric.server.transport import CircuitOpen, circuit_breaker
+from dcnm_lan_fabric.server.transport import adaptive_limiter, limiter_for
+from dcnm_lan_fabric.server.transport import transport_config
+
+
+def test_breaker_opens_after_threshold():
+    breaker = circuit_breaker(threshold=3, reset=60)
+
+    for _ in range(2):
+        breaker.failure()
+    assert breaker.state == 'closed'
+    assert breaker.allow()
+
+    breaker.failure()
+    assert breaker.state == 'open'
+    assert not breaker.allow()
+
+
+def test_breaker_success_resets_count():
+    breaker = circuit_breaker(threshold=2, reset=60)
+
+    breaker.failure()
+    breaker.success()
+    breaker.failure()
+
+    assert breaker.state == 'closed'
+
+
+def test_breaker_half_open_single_trial():
+    breaker = circuit_breaker(threshold=1, reset=0)
+    breaker.failure()
+    assert breaker.state == 'half-open'
+
+    # Exactly one request probes the server
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.success()
+    assert breaker.state == 'closed'
+    assert breaker.allow()
+    assert breaker.allow()
+
+
+def test_breaker_failed_trial_reopens():
+    breaker = circuit_breaker(threshold=5, reset=0)
+    for _ in range(5):
+        breaker.failure()
+
+    assert breaker.allow()
+    breaker.failure()
+
+    # A new period starts, then the next trial is let through
+    assert breaker.state == 'half-open'
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+def test_breaker_abandoned_trial_released():
+    breaker = circuit_breaker(threshold=1, reset=0)
+    breaker.failure()
+
+    assert breaker.allow()
+    breaker.abandon()
+
+    assert breaker.state == 'half-open'
+    assert breaker.allow()
+
+
+def request(limiter, latency=0.01, overloaded=False):
+    limiter.acquire()
+    limiter.release(latency, overloaded)
+
+
+def test_limiter_cut_on_overload():
+    limiter = adaptive_limiter(concurrency=8)
+
+    request(limiter, overloaded=True)
+    assert limiter.limit == 4
+
+    # Within a round trip of the last cut, the same overload counts once
+    limiter._long = 60
+    request(limiter, overloaded=True)
+    assert limiter.limit == 4
+
+    # Connection errors have no latency, each later one cuts again
+    limiter._long = 0
+    for _ in range(5):
+        request(limiter, latency=None, overloaded=True)
+    assert limiter.limit == 1
+    assert limiter.in_flight == 0
+
+
+def test_limiter_growth():
+    limiter = adaptive_limiter(concurrency=8)
+    request(limiter, overloaded=True)
+
+    # About one more slot per limit successful requests
+    for _ in range(4):
+        request(limiter)
+    assert limiter.limit == 4
+    request(limiter)
+    assert limiter.limit == 5
+
+    for _ in range(100):
+        request(limiter)
+    assert limiter.limit == 8
+
+
+def test_limiter_cut_on_latency_rise():
+    limiter = adaptive_limiter(concurrency=8)
+    for _ in range(20):
+        request(limiter, latency=0.01)
+    assert limiter.limit == 8
+
+    limiter._cut = 0
+    request(limiter, latency=1.0)
+    assert limiter.limit == 4
+
+    # The higher latency is the new baseline
+    request(limiter, latency=1.0)
+    assert limiter.limit == 4
+
+
+def test_limiter_blocks_at_limit():
+    limiter = adaptive_limiter(concurrency=2)
+
+    limiter.acquire()
+    limiter.acquire()
+    assert limiter.in_flight == 2
+
+    release = threading.Timer(0.05, limiter.release)
+    release.start()
+    assert limiter.acquire() >= 0.04
+    release.join()
+
+
+def test_limiter_per_settings():
+    fast = transport_config(rate=10)
+    slow = transport_config(rate=1)
+
+    assert limiter_for('limited', fast) is limiter_for('limited', fast)
+    assert limiter_for('limited', fast) is not limiter_for('limited', slow)
+
+
+class adapter(BaseAdapter):
+    """
+    Transport answering every request with the next of outcomes, a status
+    code or an exception to raise
+    """
+
+    def __init__(self, outcomes):
+        super().__init__()
+        self.outcomes = iter(outcomes)
+
+    def send(self, request, **kwargs):
+        outcome = next(self.outcomes)
+        if isinstance(outcome, BaseException):
+            raise outcome
+
+        response = requests.Response()
+        response.status_code = outcome
+        response.request = request
+        response.url = request.url
+        response._content = b'{}'
+        return response
+
+    def close(self):
+        pass
+
+
+_hosts = itertools.count()
+
+
+def connect(outcomes, threshold=2, reset=60):
+    # A host of its own, breakers are shared by host and settings
+    host = f'http://breaker-{next(_hosts)}'
+    config = transport_config(
+        retries=0, breaker_threshold=threshold, breaker_reset=reset
+    )
+
+    conn = session(host, 'admin', 'x', secure=False, version='12.0',
+                   transport=config)
+    conn.mount('http://', adapter(outcomes))
+    return conn, host + '/'
+
+
+def test_server_errors_do_not_trip_breaker():
+    conn, url = connect([500] * 5 + [200])
+
+    for _ in range(5):
+        assert conn._send('POST', url).status_code == 500
+    assert conn._send('GET', url).status_code == 200
+
+
+def test_overload_and_transport_errors_trip_breaker():
+    conn, url = connect([503, requests.exceptions.ConnectionError()])
+
+    assert conn._send('GET', url).status_code == 503
+    with pytest.raises(requests.exceptions.ConnectionError):
+        conn._send('GET', url)
+
+    with pytest.raises(CircuitOpen):
+        conn._send('GET', url)
+
+
+def test_trial_error_settles_breaker():
+    conn, url = connect(
+        [503, ValueError('bad trial'), 200], threshold=1, reset=0
+    )
+
+    conn._send('GET', url)
+    with pytest.raises(ValueError):
+        conn._send('GET', url)
+
+    # The host is not locked out by the trial that raised
+    assert conn._send('GET', url).status_code == 200